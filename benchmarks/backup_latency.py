@@ -0,0 +1,100 @@
+"""Measure handler latency while a snapshot of a large database is taken
+
+Builds a state database of the requested size, then runs a handler-like load
+on the event loop (track_user write, profile read, bot list read) at a fixed
+rate: first alone, then while db_backup.create() copies, compresses and
+rotates a snapshot in its worker thread. Reports latency percentiles for both
+phases and the backup's duration and size.
+
+Usage: python benchmarks/backup_latency.py [size_mb] [handlers_per_second]
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+
+directory = tempfile.mkdtemp()
+Config.DATABASE_PATH = os.path.join(directory, 'users.db')
+Config.HISTORY_DATABASE_PATH = os.path.join(directory, 'history.db')
+Config.BACKUP_DIR = os.path.join(directory, 'backups')
+
+from database import db
+from utils.db_backup import db_backup
+
+USERS = 100000
+WORDS = "import asyncio telegram bot handler error traceback module install running stopped".split()
+
+def build(size_mb: int):
+    """Users plus hosted bots with ~1KB of error text each, until the file reaches size_mb"""
+    now = datetime.now().isoformat()
+    rng = random.Random(1)
+    with db.get_connection() as conn:
+        conn.executemany('INSERT INTO users (user_id, first_name, joined_date) VALUES (?, ?, ?)',
+                         [(i, f"User {i}", now) for i in range(1, USERS + 1)])
+
+    bot_id = 0
+    while os.path.getsize(db.db_path) < size_mb * 1024 * 1024:
+        rows = []
+        for _ in range(20000):
+            bot_id += 1
+            errors = ' '.join(rng.choice(WORDS) for _ in range(120)) + f" {rng.getrandbits(64):x}"
+            rows.append((rng.randint(1, USERS), f"bot{bot_id}", f"bot{bot_id}.py", 'python', 'stopped', errors, now))
+        with db.get_connection() as conn:
+            conn.executemany('''
+                INSERT INTO hosted_bots (user_id, bot_name, file_name, file_type, status, errors, created_date)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+
+async def handler(rng):
+    user_id = rng.randint(1, USERS)
+    db.add_user(user_id, f"user{user_id}", f"User {user_id}", None)
+    db.get_user(user_id)
+    db.get_user_bots(user_id)
+
+async def load(rate: float, until) -> list:
+    """Run handlers at a fixed rate until until() is true; returns their latencies"""
+    rng = random.Random()
+    latencies = []
+    interval = 1 / rate
+    next_at = time.perf_counter()
+    while not until():
+        start = time.perf_counter()
+        await handler(rng)
+        latencies.append(time.perf_counter() - start)
+        next_at += interval
+        await asyncio.sleep(max(0, next_at - time.perf_counter()))
+    return sorted(latencies)
+
+def report(name: str, latencies: list):
+    pick = lambda q: latencies[min(int(len(latencies) * q), len(latencies) - 1)] * 1000
+    print(f"{name:<15} {len(latencies):6} handlers   p50 {pick(0.5):6.2f}ms   p95 {pick(0.95):6.2f}ms   "
+          f"p99 {pick(0.99):6.2f}ms   max {latencies[-1] * 1000:7.2f}ms")
+
+async def run(rate: float):
+    deadline = time.monotonic() + 10
+    report('idle', await load(rate, lambda: time.monotonic() > deadline))
+
+    backup = asyncio.create_task(db_backup.create())
+    during = await load(rate, backup.done)
+    snapshot = backup.result()
+    report('during backup', during)
+    print(f"snapshot {snapshot['name']}: {snapshot['size'] / 1024 / 1024:.1f}MB compressed in {snapshot['seconds']:.1f}s")
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 200
+    start = time.perf_counter()
+    build(size_mb)
+    print(f"built {os.path.getsize(db.db_path) / 1024 / 1024:.0f}MB state database in {time.perf_counter() - start:.0f}s, "
+          f"{rate:.0f} handlers/s")
+    asyncio.run(run(rate))
+
+if __name__ == '__main__':
+    main()
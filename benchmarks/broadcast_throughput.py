@@ -0,0 +1,120 @@
+"""Benchmark broadcast delivery against a local fake Bot API server
+
+The fake server enforces a global messages-per-second limit (answering 429 with
+retry_after like Telegram does), adds per-request latency and rejects a share
+of chats with 403 to simulate users who blocked the bot.
+
+Usage: python benchmarks/broadcast_throughput.py [recipients] [latency_ms]
+"""
+import os
+import sys
+import time
+import asyncio
+from collections import deque
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telegram import Bot
+from telegram.request import HTTPXRequest
+from utils.broadcaster import Broadcaster
+
+TOKEN = "123456:FAKE"
+SERVER_LIMIT = 30      # Messages per second before the server answers 429
+BLOCKED_EVERY = 50     # Every Nth chat has blocked the bot
+
+class FakeBotAPI:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.window = deque()
+        self.delivered = set()
+        self.flood_replies = 0
+
+    async def handle(self, request):
+        method = request.match_info['method']
+        await asyncio.sleep(self.latency)
+
+        if method == 'getMe':
+            return web.json_response({'ok': True, 'result': {
+                'id': 1, 'is_bot': True, 'first_name': 'Fake', 'username': 'fake_bot',
+                'can_join_groups': True, 'can_read_all_group_messages': False, 'supports_inline_queries': False
+            }})
+
+        data = await request.post() if request.content_type != 'application/json' else await request.json()
+        chat_id = int(data['chat_id'])
+
+        now = time.monotonic()
+        while self.window and now - self.window[0] > 1:
+            self.window.popleft()
+        if len(self.window) >= SERVER_LIMIT:
+            self.flood_replies += 1
+            return web.json_response({
+                'ok': False, 'error_code': 429, 'description': 'Too Many Requests: retry after 1',
+                'parameters': {'retry_after': 1}
+            }, status=429)
+        self.window.append(now)
+
+        if chat_id % BLOCKED_EVERY == 0:
+            return web.json_response({
+                'ok': False, 'error_code': 403, 'description': 'Forbidden: bot was blocked by the user'
+            }, status=403)
+
+        self.delivered.add(chat_id)
+        return web.json_response({'ok': True, 'result': {
+            'message_id': len(self.delivered), 'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'}, 'text': data.get('text', '')
+        }})
+
+async def start_server(api: FakeBotAPI):
+    app = web.Application()
+    app.router.add_post('/bot{token}/{method}', api.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/bot"
+
+async def run_serial(bot, chat_ids):
+    """The old broadcast loop: one send at a time, failures dropped"""
+    sent = failed = 0
+    for chat_id in chat_ids:
+        try:
+            await bot.send_message(chat_id=chat_id, text="hello")
+            sent += 1
+        except Exception:
+            failed += 1
+    return sent, failed
+
+async def run(recipients: int, latency: float):
+    chat_ids = list(range(1, recipients + 1))
+    reachable = sum(1 for chat_id in chat_ids if chat_id % BLOCKED_EVERY)
+
+    for name in ('serial', 'engine'):
+        api = FakeBotAPI(latency)
+        runner, base_url = await start_server(api)
+        bot = Bot(TOKEN, base_url=base_url, request=HTTPXRequest(connection_pool_size=32))
+
+        async with bot:
+            start = time.perf_counter()
+            if name == 'serial':
+                sent, failed = await run_serial(bot, chat_ids)
+            else:
+                stats = await Broadcaster(progress_interval=3600).send(bot, chat_ids, "hello", parse_mode=None)
+                sent, failed = stats['sent'], stats['failed'] + stats['unreachable']
+            elapsed = time.perf_counter() - start
+
+        await runner.cleanup()
+        lost = reachable - len(api.delivered)
+        print(f"{name:<7} {sent / elapsed:7.1f} msg/s   sent {sent:<6} failed {failed:<6} "
+              f"lost {lost:<6} 429s {api.flood_replies:<5} {elapsed:6.1f}s")
+
+def main():
+    recipients = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    latency = (int(sys.argv[2]) if len(sys.argv) > 2 else 80) / 1000
+    print(f"{recipients} recipients, {latency * 1000:.0f}ms API latency, server limit {SERVER_LIMIT} msg/s")
+    asyncio.run(run(recipients, latency))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Benchmark granting premium to many users: per-user calls vs. the bulk path
+
+The per-user path is what /addpremium did for each ID (get_user, add_premium,
+add_admin_log, get_user again, every call on its own connection). The bulk
+path resolves all targets in one query and applies the update and its admin
+log rows with executemany in a single transaction.
+
+Usage: python benchmarks/bulk_premium.py [users]
+"""
+import os
+import sys
+import time
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage.sqlite_storage import SQLiteStorage
+
+ADMIN_ID = 1
+DAYS = 30
+
+def make_db(users: int):
+    directory = tempfile.mkdtemp()
+    database = SQLiteStorage(os.path.join(directory, 'bench.db'), os.path.join(directory, 'history.db'))
+    now = datetime.now().isoformat()
+    with database.get_connection() as conn:
+        conn.executemany('''
+            INSERT INTO users (user_id, username, first_name, joined_date, last_active)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(100000 + i, f"user{i}", f"User {i}", now, now) for i in range(users)])
+    return database
+
+def run_per_user(database, user_ids):
+    for user_id in user_ids:
+        user = database.get_user(user_id)
+        if not user:
+            continue
+        database.add_premium(user_id, DAYS)
+        database.add_admin_log(ADMIN_ID, 'add_premium', user_id, f"Added {DAYS} days premium")
+        database.get_user(user_id)
+
+def run_bulk(database, user_ids):
+    users = database.get_target_users(user_ids)
+    target_ids = [user['user_id'] for user in users]
+    database.bulk_add_premium(target_ids, DAYS, ADMIN_ID, dict.fromkeys(target_ids, f"Added {DAYS} days premium"))
+
+def count(database, sql):
+    with database.get_connection(attach_history=True) as conn:
+        return conn.execute(sql).fetchone()[0]
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    user_ids = [100000 + i for i in range(users)]
+    print(f"granting {DAYS} days premium to {users} users")
+
+    for name, run in (('per-user', run_per_user), ('bulk', run_bulk)):
+        database = make_db(users)
+        start = time.perf_counter()
+        run(database, user_ids)
+        elapsed = time.perf_counter() - start
+
+        premium = count(database, 'SELECT COUNT(*) FROM users WHERE is_premium = 1')
+        logs = count(database, 'SELECT COUNT(*) FROM history.admin_logs')
+        print(f"{name:<9} {elapsed:7.2f}s  {users / elapsed:9.0f} users/s   premium {premium}  log rows {logs}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""Benchmark lock contention under mixed load: one SQLite file vs. state + history
+
+Threads run the bot's common writes side by side for a fixed time:
+track_user (add_user), audit inserts (add_admin_log), bot status updates and
+profile reads. "single" is the old layout: every table in one file with the
+default rollback journal. "split" is the SQLite storage backend as shipped: state and
+history files, both in WAL mode with their own pragmas. Op latency is almost
+entirely time spent waiting for the file lock.
+
+Usage: python benchmarks/db_contention.py [seconds]
+"""
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage.sqlite_storage import SQLiteStorage
+
+USERS = 10000
+BOTS = 2000
+THREADS = {'track_user': 4, 'audit_log': 2, 'bot_status': 2, 'read': 2}
+
+class SingleFile:
+    """The pre-split storage: plain connections to one file, same statements"""
+
+    def __init__(self, path):
+        self.path = path
+        with self.connect() as conn:
+            conn.executescript('''
+                CREATE TABLE users (user_id INTEGER PRIMARY KEY, username TEXT, first_name TEXT,
+                    last_name TEXT, joined_date TEXT, last_active TEXT);
+                CREATE TABLE hosted_bots (bot_id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER,
+                    bot_name TEXT, status TEXT, process_id INTEGER, last_started TEXT);
+                CREATE TABLE admin_logs (log_id INTEGER PRIMARY KEY AUTOINCREMENT, admin_id INTEGER,
+                    action_type TEXT, target_user_id INTEGER, details TEXT, timestamp TEXT);
+            ''')
+
+    def connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def run(self, sql_list):
+        conn = self.connect()
+        try:
+            for sql, params in sql_list:
+                conn.execute(sql, params).fetchall()
+            conn.commit()
+        finally:
+            conn.close()
+
+    def add_user(self, user_id, username, first_name, last_name):
+        now = datetime.now().isoformat()
+        self.run([
+            ('INSERT OR IGNORE INTO users (user_id, username, first_name, last_name, joined_date, last_active) '
+             'VALUES (?, ?, ?, ?, ?, ?)', (user_id, username, first_name, last_name, now, now)),
+            ('UPDATE users SET last_active = ? WHERE user_id = ?', (now, user_id)),
+        ])
+
+    def add_admin_log(self, admin_id, action_type, target_user_id, details):
+        self.run([('INSERT INTO admin_logs (admin_id, action_type, target_user_id, details, timestamp) '
+                   'VALUES (?, ?, ?, ?, ?)', (admin_id, action_type, target_user_id, details,
+                                              datetime.now().isoformat()))])
+
+    def update_bot_status(self, bot_id, status, process_id=None):
+        self.run([('UPDATE hosted_bots SET status = ?, process_id = ?, last_started = ? WHERE bot_id = ?',
+                   (status, process_id, datetime.now().isoformat(), bot_id))])
+
+    def read_profile(self, user_id):
+        self.run([('SELECT * FROM users WHERE user_id = ?', (user_id,)),
+                  ('SELECT * FROM hosted_bots WHERE user_id = ?', (user_id,))])
+
+    def seed(self):
+        with self.connect() as conn:
+            conn.executemany('INSERT INTO users (user_id, first_name) VALUES (?, ?)',
+                             [(i, f"User {i}") for i in range(1, USERS + 1)])
+            conn.executemany('INSERT INTO hosted_bots (user_id, bot_name, status) VALUES (?, ?, ?)',
+                             [(i % USERS + 1, f"bot{i}", 'stopped') for i in range(BOTS)])
+
+class Split(SQLiteStorage):
+    def read_profile(self, user_id):
+        self.get_user(user_id)
+        self.get_user_bots(user_id)
+
+    def seed(self):
+        now = datetime.now().isoformat()
+        with self.get_connection() as conn:
+            conn.executemany('INSERT INTO users (user_id, first_name, joined_date) VALUES (?, ?, ?)',
+                             [(i, f"User {i}", now) for i in range(1, USERS + 1)])
+            conn.executemany('INSERT INTO hosted_bots (user_id, bot_name, status) VALUES (?, ?, ?)',
+                             [(i % USERS + 1, f"bot{i}", 'stopped') for i in range(BOTS)])
+
+def worker(store, kind, deadline, results):
+    rng = random.Random()
+    latencies, errors = [], 0
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            if kind == 'track_user':
+                user_id = rng.randint(1, USERS)
+                store.add_user(user_id, f"user{user_id}", f"User {user_id}", None)
+            elif kind == 'audit_log':
+                store.add_admin_log(1, 'bot_stop', rng.randint(1, USERS), "benchmark")
+            elif kind == 'bot_status':
+                store.update_bot_status(rng.randint(1, BOTS), rng.choice(('running', 'stopped')), 1234)
+            else:
+                store.read_profile(rng.randint(1, USERS))
+        except sqlite3.OperationalError:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    results.append((kind, latencies, errors))
+
+def run(name, store, seconds):
+    store.seed()
+    results = []
+    deadline = time.monotonic() + seconds
+    threads = [threading.Thread(target=worker, args=(store, kind, deadline, results))
+               for kind, count in THREADS.items() for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(f"-- {name} --")
+    total_ops = 0
+    for kind in THREADS:
+        latencies = sorted(l for k, ls, _ in results if k == kind for l in ls)
+        errors = sum(e for k, _, e in results if k == kind)
+        total_ops += len(latencies)
+        print(f"{kind:<11} {len(latencies) / seconds:8.0f} ops/s   p50 {latencies[len(latencies) // 2] * 1000:6.2f}ms   "
+              f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:7.2f}ms   "
+              f"mean {sum(latencies) / len(latencies) * 1000:6.2f}ms   locked errors {errors}")
+    print(f"{'all':<11} {total_ops / seconds:8.0f} ops/s")
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{sum(THREADS.values())} threads for {seconds:.0f}s each: {THREADS}")
+    directory = tempfile.mkdtemp()
+    run('single file, rollback journal', SingleFile(os.path.join(directory, 'single.db')), seconds)
+    run('split state + history, WAL', Split(os.path.join(directory, 'users.db'),
+                                            os.path.join(directory, 'history.db')), seconds)
+
+if __name__ == '__main__':
+    main()
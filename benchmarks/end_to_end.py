@@ -0,0 +1,145 @@
+"""Benchmark the whole bot, from update to reply, with no network and no disk
+
+Builds the real application (every handler, decorator, cache and the outbox)
+on an offline Bot whose Bot API calls are answered locally, seeds the storage
+backend with users and hosted bots, then pushes a mix of user commands, /mybots
+refreshes and owner /stats_admin calls through the update queue. Reports
+throughput and per-update handling time. The memory backend keeps everything
+off disk, so the numbers are the bot's own overhead; pass "sqlite" to run the
+same load against SQLite files in a temporary directory.
+
+Usage: python benchmarks/end_to_end.py [updates] [memory|sqlite]
+"""
+import os
+import sys
+import json
+import time
+import logging
+import random
+import asyncio
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telegram import Bot, Update
+from telegram.ext import TypeHandler
+from telegram.request import BaseRequest
+
+from config import Config
+from database import db
+from storage.memory_storage import MemoryStorage
+from storage.sqlite_storage import SQLiteStorage
+from main import build_application
+
+USERS = 5000
+BOTS_PER_USER = 2
+BOT_USER = {'id': 1, 'is_bot': True, 'first_name': 'Bench', 'username': 'bench_bot'}
+MIX = (('/start', 3), ('/profile', 3), ('/mybots', 3), ('/help', 1), ('my_bots', 3), ('/stats_admin', 1))
+
+class OfflineRequest(BaseRequest):
+    """Answers every Bot API call locally; counts calls per method"""
+
+    def __init__(self):
+        self.calls = {}
+        self.message_id = 0
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def do_request(self, url, method, request_data=None, read_timeout=None,
+                         write_timeout=None, connect_timeout=None, pool_timeout=None):
+        api_method = url.rsplit('/', 1)[-1]
+        self.calls[api_method] = self.calls.get(api_method, 0) + 1
+        params = request_data.parameters if request_data else {}
+
+        if api_method == 'getMe':
+            result = BOT_USER
+        elif api_method in ('sendMessage', 'editMessageText', 'sendDocument'):
+            self.message_id += 1
+            result = {
+                'message_id': params.get('message_id', self.message_id), 'date': int(time.time()),
+                'chat': {'id': params.get('chat_id', 0), 'type': 'private'},
+                'from': BOT_USER, 'text': params.get('text', ''),
+            }
+        else:
+            result = True
+        return 200, json.dumps({'ok': True, 'result': result}).encode()
+
+def seed(storage):
+    for user_id in range(1000, 1000 + USERS):
+        storage.add_user(user_id, f"user{user_id}", f"User {user_id}", None)
+        for number in range(BOTS_PER_USER):
+            storage.add_hosted_bot(user_id, f"bot{number}", 'bot.py', f"/tmp/{user_id}/bot.py", 'python', 1024)
+
+def make_update(update_id, user_id, action):
+    user = {'id': user_id, 'is_bot': False, 'first_name': f"User {user_id}", 'username': f"user{user_id}"}
+    message = {'message_id': update_id, 'date': int(time.time()),
+               'chat': {'id': user_id, 'type': 'private'}, 'from': user, 'text': action}
+    if action.startswith('/'):
+        message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(action)}]
+        return {'update_id': update_id, 'message': message}
+    message['from'] = BOT_USER
+    return {'update_id': update_id, 'callback_query': {
+        'id': str(update_id), 'from': user, 'chat_instance': str(user_id), 'data': action, 'message': message,
+    }}
+
+async def run(count: int):
+    request = OfflineRequest()
+    application = build_application(bot=Bot("1:offline", request=request, get_updates_request=OfflineRequest()))
+
+    started, handled = {}, []
+    async def mark_start(update, context):
+        started[update.update_id] = time.perf_counter()
+    async def mark_done(update, context):
+        handled.append(time.perf_counter() - started.pop(update.update_id))
+    application.add_handler(TypeHandler(Update, mark_start), group=-100)
+    application.add_handler(TypeHandler(Update, mark_done), group=100)
+
+    rng = random.Random(1)
+    actions = [action for action, weight in MIX for _ in range(weight)]
+    updates = []
+    for update_id in range(1, count + 1):
+        action = rng.choice(actions)
+        user_id = Config.OWNER_ID if action == '/stats_admin' else rng.randrange(1000, 1000 + USERS)
+        updates.append(Update.de_json(make_update(update_id, user_id, action), application.bot))
+
+    async with application:
+        await application.post_init(application)
+        await application.start()
+
+        start = time.perf_counter()
+        for update in updates:
+            await application.update_queue.put(update)
+        await application.update_queue.join()
+        elapsed = time.perf_counter() - start
+
+        await application.stop()
+        await application.post_shutdown(application)
+
+    handled.sort()
+    pick = lambda q: handled[min(int(len(handled) * q), len(handled) - 1)] * 1000
+    print(f"{count} updates in {elapsed:.2f}s: {count / elapsed:.0f} updates/s   "
+          f"handling p50 {pick(0.5):.2f}ms  p99 {pick(0.99):.2f}ms  max {handled[-1] * 1000:.2f}ms")
+    print(f"Bot API calls: {dict(sorted(request.calls.items()))}")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    backend = sys.argv[2] if len(sys.argv) > 2 else 'memory'
+    if backend == 'sqlite':
+        directory = tempfile.mkdtemp()
+        storage = SQLiteStorage(os.path.join(directory, 'users.db'), os.path.join(directory, 'history.db'))
+    else:
+        storage = MemoryStorage()
+    db.use(storage)
+    logging.disable(logging.WARNING)
+
+    start = time.perf_counter()
+    seed(storage)
+    print(f"{backend}: seeded {USERS} users, {USERS * BOTS_PER_USER} bots in {time.perf_counter() - start:.1f}s")
+    asyncio.run(run(count))
+
+if __name__ == '__main__':
+    main()
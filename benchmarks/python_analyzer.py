@@ -0,0 +1,62 @@
+"""Benchmark the single-pass analyzer against the old parse + py_compile + substring scan
+
+Usage: python benchmarks/python_analyzer.py [functions]
+"""
+import os
+import sys
+import time
+import ast
+import py_compile
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.code_validator import CodeValidator
+
+def make_source(functions: int) -> str:
+    parts = ["import os\nimport time\nimport requests\n"]
+    for i in range(functions):
+        parts.append(
+            f"async def handler_{i}(update, context):\n"
+            f"    data = {{'id': {i}, 'items': [x * {i} for x in range(10)]}}\n"
+            f"    if data['id'] % 7 == 0:\n"
+            f"        await context.bot.send_message(chat_id=update.id, text=str(data))\n"
+            f"    return data\n\n"
+        )
+    parts.append("if __name__ == '__main__':\n    app.run_polling()\n")
+    return ''.join(parts)
+
+def old_validate(code: str):
+    errors = []
+    ast.parse(code)
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
+        f.write(code)
+        temp_file = f.name
+    try:
+        py_compile.compile(temp_file, doraise=True)
+    finally:
+        os.unlink(temp_file)
+    for dangerous in ['os.system', 'subprocess', 'eval', 'exec', '__import__']:
+        if dangerous in code:
+            errors.append(dangerous)
+    return errors
+
+def bench(func, code, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(code)
+    return (time.perf_counter() - start) / rounds
+
+def main():
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    code = make_source(functions)
+    rounds = 3
+    print(f"source: {len(code) / (1024 * 1024):.1f}MB, {code.count(chr(10))} lines")
+
+    old = bench(old_validate, code, rounds)
+    new = bench(lambda c: CodeValidator.validate(c, 'python'), code, rounds)
+    print(f"parse + py_compile + substring scan: {old * 1000:8.0f}ms")
+    print(f"single-pass analyzer:                {new * 1000:8.0f}ms  ({old / new:.2f}x)")
+
+if __name__ == '__main__':
+    main()
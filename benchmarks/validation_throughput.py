@@ -0,0 +1,56 @@
+"""Benchmark concurrent upload validation: inline vs. the worker pool
+
+Usage: python benchmarks/validation_throughput.py [uploads] [lines_per_file]
+"""
+import os
+import sys
+import time
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.code_validator import CodeValidator
+from utils.validation_pool import ValidationPool, PRIORITY_PREMIUM, PRIORITY_FREE
+
+def make_source(index: int, lines: int) -> str:
+    body = "\n".join(f"    total += {i} * x  # line {i}" for i in range(lines))
+    return f"import os\n\ndef handler_{index}(x):\n    total = 0\n{body}\n    return total\n"
+
+async def run_pool(sources, workers):
+    pool = ValidationPool(workers=workers)
+    start = time.perf_counter()
+    latencies = []
+
+    async def one(i, data):
+        t0 = time.perf_counter()
+        await pool.validate_source(data, 'python', PRIORITY_PREMIUM if i % 5 == 0 else PRIORITY_FREE)
+        latencies.append(time.perf_counter() - t0)
+
+    await asyncio.gather(*(one(i, data) for i, data in enumerate(sources)))
+    elapsed = time.perf_counter() - start
+    pool.shutdown()
+    return elapsed, sorted(latencies)
+
+def run_inline(sources):
+    start = time.perf_counter()
+    for data in sources:
+        CodeValidator.validate(data.decode('utf-8'), 'python')
+    return time.perf_counter() - start
+
+def main():
+    uploads = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    lines = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+
+    sources = [make_source(i, lines).encode('utf-8') for i in range(uploads)]
+    print(f"{uploads} uploads of ~{len(sources[0]) // 1024}KB each")
+
+    elapsed = run_inline(sources)
+    print(f"inline (blocks event loop): {uploads / elapsed:8.1f} uploads/s")
+
+    for workers in (1, 2, 4, os.cpu_count() or 4):
+        elapsed, latencies = asyncio.run(run_pool(sources, workers))
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(f"pool workers={workers:<3}        {uploads / elapsed:8.1f} uploads/s   p99 {p99 * 1000:.0f}ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""Load-test webhook intake: post synthetic updates to the local webhook endpoint
+
+Runs the same Application setup as main.py (bounded update queue, secret token,
+keyed update processor) against a fake Bot API, posts messages concurrently and
+reports accepted updates/sec, the p50/p99 time from POST to handler completion
+and whether any user's updates were handled out of order. Sequential processing
+is run first for comparison.
+
+Usage: python benchmarks/webhook_load.py [updates] [concurrency] [handler_ms]
+"""
+import os
+import sys
+import time
+import json
+import asyncio
+
+import aiohttp
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telegram import Update
+from telegram.ext import Application, MessageHandler, SimpleUpdateProcessor, filters
+from utils.update_processor import KeyedUpdateProcessor
+
+TOKEN = "123456:FAKE"
+SECRET = "load-test-secret"
+QUEUE_SIZE = 1000
+
+async def fake_bot_api(request):
+    method = request.match_info['method']
+    if method == 'getMe':
+        return web.json_response({'ok': True, 'result': {
+            'id': 1, 'is_bot': True, 'first_name': 'Fake', 'username': 'fake_bot',
+            'can_join_groups': True, 'can_read_all_group_messages': False, 'supports_inline_queries': False
+        }})
+    return web.json_response({'ok': True, 'result': True})
+
+async def start_fake_api():
+    app = web.Application()
+    app.router.add_post('/bot{token}/{method}', fake_bot_api)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/bot"
+
+def make_update(update_id: int) -> bytes:
+    return json.dumps({
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': 1000 + update_id % 500, 'type': 'private'},
+            'from': {'id': 1000 + update_id % 500, 'is_bot': False, 'first_name': 'Load'},
+            'text': str(time.perf_counter())
+        }
+    }).encode()
+
+async def run(updates: int, concurrency: int, handler_delay: float, concurrent: bool):
+    api_runner, base_url = await start_fake_api()
+    latencies = []
+    done = asyncio.Event()
+    processor = KeyedUpdateProcessor(user_queue_limit=updates) if concurrent else SimpleUpdateProcessor(1)
+    last_seen = {}
+    out_of_order = 0
+
+    async def on_message(update: Update, context):
+        nonlocal out_of_order
+        user_id = update.effective_user.id
+        if update.update_id < last_seen.get(user_id, 0):
+            out_of_order += 1
+        last_seen[user_id] = update.update_id
+        await asyncio.sleep(handler_delay)
+        latencies.append(time.perf_counter() - float(update.message.text))
+        if len(latencies) == updates:
+            done.set()
+
+    application = (
+        Application.builder()
+        .token(TOKEN)
+        .base_url(base_url)
+        .update_queue(asyncio.Queue(maxsize=QUEUE_SIZE))
+        .concurrent_updates(processor)
+        .build()
+    )
+    application.add_handler(MessageHandler(filters.TEXT, on_message))
+
+    port = 18443
+    url = f"http://127.0.0.1:{port}/telegram"
+    await application.initialize()
+    await application.start()
+    await application.updater.start_webhook(
+        listen='127.0.0.1', port=port, url_path='telegram', webhook_url=url, secret_token=SECRET
+    )
+
+    headers = {'Content-Type': 'application/json', 'X-Telegram-Bot-Api-Secret-Token': SECRET}
+    async with aiohttp.ClientSession() as session:
+        async with session.post(url, data=make_update(0), headers={'Content-Type': 'application/json'}) as response:
+            print(f"request without secret token -> HTTP {response.status}")
+
+        counter = iter(range(1, updates + 1))
+
+        async def client():
+            for update_id in counter:
+                async with session.post(url, data=make_update(update_id), headers=headers) as response:
+                    response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        accepted = time.perf_counter() - start
+        await asyncio.wait_for(done.wait(), 120)
+        handled = time.perf_counter() - start
+
+    await application.updater.stop()
+    await application.stop()
+    await application.shutdown()
+    await api_runner.cleanup()
+
+    latencies.sort()
+    print(f"-- {'keyed concurrent' if concurrent else 'sequential'} processing --")
+    print(f"accepted {updates} updates in {accepted:.2f}s ({updates / accepted:.0f} updates/s)")
+    print(f"handled  {updates} updates in {handled:.2f}s ({updates / handled:.0f} updates/s)")
+    print(f"latency  p50 {latencies[len(latencies) // 2] * 1000:.1f}ms   "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f}ms   "
+          f"out of order per user: {out_of_order}")
+
+def main():
+    updates = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    handler_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 0
+    print(f"{updates} updates, {concurrency} concurrent connections, {handler_ms:.0f}ms handler, queue size {QUEUE_SIZE}")
+    for concurrent in (False, True):
+        asyncio.run(run(updates, concurrency, handler_ms / 1000, concurrent))
+
+if __name__ == '__main__':
+    main()
@@ -13,8 +13,23 @@ class Config:
     # Admin Group (notifications পাঠানোর জন্য)
     ADMIN_GROUP_ID = 7857957075  # Your admin group ID
     
+    # Update delivery
+    UPDATE_MODE = "polling"           # "polling" or "webhook"
+    UPDATE_QUEUE_SIZE = 1000          # Updates buffered before intake blocks (backpressure)
+    UPDATE_CONCURRENCY = 32           # Handlers running at once (across users)
+    UPDATE_MAX_PENDING = 512          # Updates being processed or waiting for their user's turn
+    UPDATE_USER_QUEUE_LIMIT = 10      # Updates one user may have waiting before extras are dropped
+    WEBHOOK_URL = ""                  # Public HTTPS URL Telegram posts to, e.g. https://example.com/telegram
+    WEBHOOK_LISTEN = "127.0.0.1"      # Local listener (put a TLS reverse proxy in front)
+    WEBHOOK_PORT = 8443
+    WEBHOOK_PATH = "telegram"
+    WEBHOOK_SECRET = ""               # X-Telegram-Bot-Api-Secret-Token; random per start if empty
+    WEBHOOK_MAX_CONNECTIONS = 40      # Concurrent connections Telegram may open
+    
     # Database
-    DATABASE_PATH = "data/users.db"
+    STORAGE_BACKEND = "sqlite"                  # "sqlite", or "memory" (nothing persisted; benchmarks, tests)
+    DATABASE_PATH = "data/users.db"             # Hot state: users, bots, jobs
+    HISTORY_DATABASE_PATH = "data/history.db"   # Append-only: admin logs, statistics
     
     # File Limits
     MAX_FILE_SIZE_FREE = 5 * 1024 * 1024      # 5MB for free users
@@ -22,8 +37,108 @@ class Config:
     MAX_BOTS_FREE = 2
     MAX_BOTS_PREMIUM = 10
     
+    # Per-user rate limiting (token buckets)
+    RATE_LIMIT_COSTS = {
+        'menu': 1,         # Buttons and Refresh taps
+        'command': 2,      # Plain commands
+        'bot_action': 4,   # Start/stop/restart/delete (spawns or kills processes)
+        'upload': 10,      # File upload + validation
+        'install': 10,     # pip install
+    }
+    RATE_LIMIT_BUDGETS = {
+        # tier: (bucket size, tokens refilled per second)
+        'free': (30, 0.5),
+        'premium': (60, 1.0),
+        'admin': (120, 4.0),
+        'owner': (0, 0),   # Not limited
+    }
+    RATE_LIMIT_WARN_COOLDOWN = 10      # Seconds between "slow down" replies
+    RATE_LIMIT_CLEANUP_INTERVAL = 600  # Seconds between dropping idle buckets
+    
+    # ZIP Limits (zip bomb protection)
+    MAX_ZIP_UNCOMPRESSED_SIZE = 200 * 1024 * 1024  # 200MB total after extraction
+    MAX_ZIP_RATIO = 100                             # Max compression ratio per entry
+    MAX_ZIP_FILES = 1000                            # Max entries in one archive
+    
+    # Validation workers
+    VALIDATION_WORKERS = 2
+    VALIDATION_TIMEOUT = 30                          # Seconds per job (wall clock)
+    VALIDATION_CPU_SECONDS = 20                      # CPU time per job
+    VALIDATION_MEMORY_LIMIT = 1024 * 1024 * 1024     # Address space per worker
+    
+    # JavaScript validation
+    JS_NODE_CHECK = True        # Also syntax-check with node when it is installed
+    JS_NODE_CHECK_TIMEOUT = 10  # Seconds per source
+    
+    # Validation cache
+    VALIDATION_CACHE_MAX_ENTRIES = 50000
+    VALIDATION_CACHE_MAX_AGE_DAYS = 30
+    
+    # Admin fleet browser
+    ADMIN_BOTS_PAGE_SIZE = 10
+    USAGE_SNAPSHOT_TTL = 10  # Seconds live CPU/memory figures are reused when sorting
+    
+    # Admin user search
+    USER_SEARCH_PAGE_SIZE = 10
+    
+    # Admin audit log
+    AUDIT_LOG_PAGE_SIZE = 15
+    AUDIT_LOG_RETENTION_DAYS = 180     # Older rows move to compressed monthly archives
+    AUDIT_ARCHIVE_DIR = "data/audit_archive"
+    AUDIT_ARCHIVE_BATCH = 5000         # Rows archived and deleted per transaction
+    AUDIT_ARCHIVE_INTERVAL = 86400     # Seconds between retention runs
+    
+    # Database snapshots
+    BACKUP_DIR = "data/backups"
+    BACKUP_INTERVAL = 6 * 3600         # Seconds between scheduled snapshots
+    BACKUP_KEEP = 8                    # Snapshots kept (oldest removed first)
+    BACKUP_PAGES_PER_STEP = 1024       # Pages copied per backup step (4MB with 4KB pages)
+    BACKUP_STEP_SLEEP = 0.005          # Seconds between steps
+    
+    # Rendered /mybots views kept in memory
+    VIEW_CACHE_MAX_USERS = 5000
+    
+    # Owner upload notifications
+    UPLOAD_DIGEST_INTERVAL = 900  # Seconds between digests in digest mode
+    
+    # Outbound message queue
+    OUTBOX_GLOBAL_RATE = 25           # Messages per second for the whole bot (Bot API allows ~30)
+    OUTBOX_CHAT_INTERVAL = 1          # Seconds between messages to one private chat
+    OUTBOX_GROUP_INTERVAL = 3         # Seconds between messages to one group (20/minute)
+    OUTBOX_MAX_SIZE = 5000            # Queued messages before new ones are dropped
+    OUTBOX_MAX_RETRIES = 3            # Retries per message on network errors
+    OUTBOX_DRAIN_TIMEOUT = 5          # Seconds to flush the queue on shutdown
+    
+    # Broadcast
+    BROADCAST_RATE = 20               # Messages per second, leaving room for the outbox
+    BROADCAST_CONCURRENCY = 8         # Concurrent senders
+    BROADCAST_MAX_RETRIES = 3         # Retries per chat on network errors
+    BROADCAST_PROGRESS_INTERVAL = 5   # Seconds between status message edits
+    BROADCAST_FLUSH_SIZE = 50         # Delivery results written to the DB per batch
+    
+    # Bulk admin actions
+    BULK_TARGETS_MAX_FILE_SIZE = 5 * 1024 * 1024  # Replied-to file of user IDs
+    BULK_NOTIFY_DIRECT_LIMIT = 50                 # Above this, affected users are notified by a broadcast job
+    
+    # Bot start admission (host capacity)
+    ADMISSION_MAX_RUNNING_BOTS = 500      # Running bots on this host
+    ADMISSION_MAX_CPU_PERCENT = 85        # Host CPU above this queues new starts
+    ADMISSION_MAX_MEMORY_PERCENT = 85     # Host memory above this queues new starts
+    ADMISSION_SAMPLE_INTERVAL = 5         # Seconds between CPU/memory samples
+    ADMISSION_MAX_BURST = 10              # Starts per sample (a new bot's load shows up later)
+    ADMISSION_MAX_QUEUE = 1000            # Queued starts before new ones are turned away
+    ADMISSION_RETRY_INTERVAL = 5          # Seconds between attempts to start queued bots
+    
+    # Hosted bot exits
+    BOT_EXIT_NOTIFY = True            # Tell a bot's owner when it exits without being stopped
+    BOT_EXIT_STDERR_TAIL = 1500       # Bytes of the dead process's stderr kept in the bot's errors
+    
     # Paths
     HOSTED_BOTS_DIR = "data/hosted_bots"
+    BLOBS_DIR = "data/blobs"  # Content-addressed upload storage
+    UPLOAD_LEASE_HOURS = 1  # How long an upload waiting for its bot name keeps its blob
+    HOST_SESSION_TIMEOUT = 1800  # Seconds a /host conversation may wait for the file or bot name
+    KEEP_RELEASES = 3  # ZIP releases kept per bot (including the active one)
     
     # Emojis for beautiful design
     EMOJI = {
@@ -69,3 +184,4 @@ class Config:
     # Create directories
     os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
     os.makedirs(HOSTED_BOTS_DIR, exist_ok=True)
+    os.makedirs(BLOBS_DIR, exist_ok=True)
@@ -1,9 +1,21 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
+from telegram.error import BadRequest
+from telegram.helpers import escape_markdown
 from config import Config
 from database import db
-from utils.decorators import admin_only, owner_only
-from datetime import datetime
+from utils.decorators import admin_only, owner_only, rate_limiter
+from utils.blob_store import blob_store
+from utils.validation_cache import validation_cache
+from utils.upload_notifier import upload_notifier, MODES
+from utils.broadcaster import broadcaster
+from utils.outbox import outbox, PRIORITY_HIGH, PRIORITY_NORMAL
+from utils.update_processor import update_processor
+from utils.process_manager import process_manager
+from utils.admission import admission
+from utils.db_backup import db_backup
+import re
+from datetime import datetime, timedelta
 
 E = Config.EMOJI
 
@@ -29,21 +41,33 @@ async def admin_panel_command(update: Update, context: ContextTypes.DEFAULT_TYPE
 ├ /addadmin <user_id> - Grant admin
 ├ /removeadmin <user_id> - Remove admin
 ├ /adminlist - View all admins
+├ /finduser <name|@username> - Search users
+├ /auditlog [admin:<id>] [action:<type>] [since:7d] - Admin actions
 ├ /ban <user_id> - Ban user
 ├ /unban <user_id> - Unban user
-└ /userinfo <user_id> - User details
+├ /userinfo <user_id> - User details
+└ Bulk: `111,222`, `100-200` or reply to an ID file
 
 **Premium Management:**
 ├ /addpremium <user_id> <days> - Grant premium
 ├ /removepremium <user_id> - Remove premium
 └ /premiumlist - View premium users
 
+**Notifications:**
+└ /uploadnotify <instant|digest|off> - Upload alerts
+
 **Broadcast:**
 ├ /broadcast <message> - Send to all users
+├ /broadcast_status [id] - Broadcast progress
 └ /broadcast_premium <message> - Send to premium
 
+**Hosted Bots:**
+└ /bots [running|stopped|error] [python|javascript] [errors] [user:<id>] [sort:cpu|mem] - Browse all bots
+
 **Statistics:**
-└ /stats_admin - Detailed statistics
+├ /stats_admin - Detailed statistics
+├ /diskusage - Upload storage report
+└ /backup [list] - Database snapshot (owner)
 
 ━━━━━━━━━━━━━━━━━━━━
     """
@@ -63,26 +87,102 @@ async def admin_panel_command(update: Update, context: ContextTypes.DEFAULT_TYPE
     
     await update.message.reply_text(admin_text, parse_mode='Markdown', reply_markup=reply_markup)
 
+TARGET_PATTERN = re.compile(r'^(\d+)(?:-(\d+))?$')
+
+def parse_targets(text: str, strict: bool = True) -> tuple:
+    """
+    User IDs and inclusive ID ranges from text like `111,222 300-400`
+    With strict off (ID files) anything that is not an ID or range is ignored
+    """
+    user_ids, ranges = set(), []
+    for token in re.split(r'[\s,;]+' if strict else r'[^\d-]+', text):
+        if not token:
+            continue
+        match = TARGET_PATTERN.match(token)
+        if not match:
+            if strict:
+                raise ValueError("Invalid user ID!")
+            continue
+        start, end = match.groups()
+        if end is None:
+            user_ids.add(int(start))
+        else:
+            ranges.append(tuple(sorted((int(start), int(end)))))
+    return user_ids, ranges
+
+async def resolve_targets(update: Update, args: list):
+    """
+    Users targeted by an admin command: IDs/ranges in args plus the IDs in a
+    replied-to document. Returns (users, not_found_count), or None without targets
+    """
+    user_ids, ranges = parse_targets(' '.join(args))
+    
+    reply = update.message.reply_to_message
+    if reply and reply.document:
+        if (reply.document.file_size or 0) > Config.BULK_TARGETS_MAX_FILE_SIZE:
+            raise ValueError(f"ID file is too large (max {Config.BULK_TARGETS_MAX_FILE_SIZE // (1024 * 1024)}MB)!")
+        file = await reply.document.get_file()
+        content = await file.download_as_bytearray()
+        file_ids, file_ranges = parse_targets(content.decode('utf-8', errors='ignore'), strict=False)
+        user_ids |= file_ids
+        ranges += file_ranges
+    
+    if not user_ids and not ranges:
+        return None
+    
+    users = db.get_target_users(user_ids, ranges)
+    found = {user['user_id'] for user in users}
+    return users, len(user_ids - found)
+
+def notify_users(context: ContextTypes.DEFAULT_TYPE, admin_id: int, user_ids: list, text: str):
+    """
+    Tell affected users about a change: a few go straight to the outbox, more
+    become a broadcast job. Returns the broadcast ID, if one was started
+    """
+    if len(user_ids) <= Config.BULK_NOTIFY_DIRECT_LIMIT:
+        for user_id in user_ids:
+            outbox.send(user_id, text, priority=PRIORITY_HIGH)
+        return None
+    
+    broadcast_id = db.create_broadcast(admin_id, text, user_ids)
+    context.application.create_task(broadcaster.run_job(context.bot, broadcast_id))
+    return broadcast_id
+
+def bulk_result_text(title: str, applied: int, not_found: int, skipped: int = 0,
+                     skip_reason: str = None, broadcast_id=None) -> str:
+    text = f"{E['check']} **{title}**\n\n├ Applied: {applied}\n"
+    if skip_reason:
+        text += f"├ Skipped ({skip_reason}): {skipped}\n"
+    text += f"└ Not found: {not_found}"
+    if broadcast_id:
+        text += f"\n\n{E['bell']} Notifying users: `/broadcast_status {broadcast_id}`"
+    return text
+
+TARGETS_HELP = (
+    "Targets: one ID, a list (`111,222`), a range (`100-200`), "
+    "or reply to a file of IDs"
+)
+
 @admin_only
 async def add_admin_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Add admin"""
-    if not context.args:
+    """Add admins"""
+    try:
+        resolved = await resolve_targets(update, context.args)
+    except ValueError as e:
+        await update.message.reply_text(f"{E['cross']} {e}", parse_mode='Markdown')
+        return
+    
+    if resolved is None:
         await update.message.reply_text(
-            f"{E['info']} **Usage:** `/addadmin <user_id>`\n\n"
-            f"Example: `/addadmin 123456789`",
+            f"{E['info']} **Usage:** `/addadmin <targets>`\n\n"
+            f"Example: `/addadmin 123456789`\n"
+            f"{TARGETS_HELP}",
             parse_mode='Markdown'
         )
         return
     
-    try:
-        target_user_id = int(context.args[0])
-    except ValueError:
-        await update.message.reply_text(f"{E['cross']} Invalid user ID!", parse_mode='Markdown')
-        return
-    
-    # Check if user exists
-    user = db.get_user(target_user_id)
-    if not user:
+    users, not_found = resolved
+    if not users:
         await update.message.reply_text(
             f"{E['cross']} User not found!\n\n"
             f"User must start the bot first.",
@@ -90,30 +190,53 @@ async def add_admin_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return
     
-    # Check if already admin
-    if db.is_admin(target_user_id):
+    single = len(users) == 1 and not not_found
+    targets = [user for user in users if not user['is_admin']]
+    if single and not targets:
         await update.message.reply_text(
             f"{E['info']} User is already an admin!",
             parse_mode='Markdown'
         )
         return
     
-    # Add admin
-    db.add_admin(target_user_id)
-    
-    # Log action
-    db.add_admin_log(
+    # Add admins and log them in one transaction
+    target_ids = [user['user_id'] for user in targets]
+    db.bulk_set_admin(
+        target_ids, True,
         admin_id=update.effective_user.id,
-        action_type='add_admin',
-        target_user_id=target_user_id,
-        details=f"Added admin: {user['first_name']}"
+        details={user['user_id']: f"Added admin: {user['first_name']}" for user in targets}
     )
+    for user_id in target_ids:
+        rate_limiter.reset(user_id)  # New tier applies to the next request
+    
+    broadcast_id = notify_users(
+        context, update.effective_user.id, target_ids,
+        f"{E['party']} **Congratulations!** {E['party']}\n\n"
+        f"You have been promoted to **Administrator**!\n\n"
+        f"Use /admin to access the admin panel."
+    )
+    
+    if not single:
+        await update.message.reply_text(
+            bulk_result_text("Admins Added", len(targets), not_found, len(users) - len(targets),
+                             "already admin", broadcast_id),
+            parse_mode='Markdown'
+        )
+        if targets:
+            outbox.send(
+                Config.ADMIN_GROUP_ID,
+                f"{E['bell']} **{len(targets)} New Admins Added!**\n\n"
+                f"By: {escape_markdown(update.effective_user.first_name, version=1)}",
+                priority=PRIORITY_NORMAL
+            )
+        return
     
+    user = targets[0]
     success_text = f"""
 {E['check']} **Admin Added Successfully!**
 
 {E['user']} **User Details:**
-├ ID: `{target_user_id}`
+├ ID: `{user['user_id']}`
 ├ Name: {user['first_name']} {user['last_name'] or ''}
 └ Username: @{user['username'] or 'No username'}
 
@@ -123,89 +246,78 @@ async def add_admin_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(success_text, parse_mode='Markdown')
     
     # Notify admin group
-    try:
-        await context.bot.send_message(
-            chat_id=Config.ADMIN_GROUP_ID,
-            text=f"{E['bell']} **New Admin Added!**\n\n"
-                 f"User: {user['first_name']} (@{user['username'] or target_user_id})\n"
-                 f"By: {update.effective_user.first_name}",
-            parse_mode='Markdown'
-        )
-    except:
-        pass
-    
-    # Notify user
-    try:
-        await context.bot.send_message(
-            chat_id=target_user_id,
-            text=f"{E['party']} **Congratulations!** {E['party']}\n\n"
-                 f"You have been promoted to **Administrator**!\n\n"
-                 f"Use /admin to access the admin panel.",
-            parse_mode='Markdown'
-        )
-    except:
-        pass
+    outbox.send(
+        Config.ADMIN_GROUP_ID,
+        f"{E['bell']} **New Admin Added!**\n\n"
+        f"User: {escape_markdown(user['first_name'] or '', version=1)} (@{escape_markdown(user['username'] or str(user['user_id']), version=1)})\n"
+        f"By: {escape_markdown(update.effective_user.first_name, version=1)}",
+        priority=PRIORITY_NORMAL
+    )
 
 @admin_only
 async def remove_admin_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Remove admin"""
-    if not context.args:
+    """Remove admins"""
+    try:
+        resolved = await resolve_targets(update, context.args)
+    except ValueError as e:
+        await update.message.reply_text(f"{E['cross']} {e}", parse_mode='Markdown')
+        return
+    
+    if resolved is None:
         await update.message.reply_text(
-            f"{E['info']} **Usage:** `/removeadmin <user_id>`",
+            f"{E['info']} **Usage:** `/removeadmin <targets>`\n\n"
+            f"{TARGETS_HELP}",
             parse_mode='Markdown'
         )
         return
     
-    try:
-        target_user_id = int(context.args[0])
-    except ValueError:
-        await update.message.reply_text(f"{E['cross']} Invalid user ID!", parse_mode='Markdown')
-        return
+    users, not_found = resolved
+    single = len(users) == 1 and not not_found
     
     # Can't remove owner
-    if target_user_id == Config.OWNER_ID:
+    if single and users[0]['user_id'] == Config.OWNER_ID:
         await update.message.reply_text(
             f"{E['cross']} Cannot remove the owner!",
             parse_mode='Markdown'
         )
         return
     
-    # Check if admin
-    if not db.is_admin(target_user_id):
+    targets = [user for user in users if user['is_admin'] and user['user_id'] != Config.OWNER_ID]
+    if (single or not users) and not targets:
         await update.message.reply_text(
             f"{E['info']} User is not an admin!",
             parse_mode='Markdown'
         )
         return
     
-    # Remove admin
-    db.remove_admin(target_user_id)
-    
-    user = db.get_user(target_user_id)
-    
-    # Log action
-    db.add_admin_log(
+    # Remove admins and log them in one transaction
+    target_ids = [user['user_id'] for user in targets]
+    db.bulk_set_admin(
+        target_ids, False,
         admin_id=update.effective_user.id,
-        action_type='remove_admin',
-        target_user_id=target_user_id,
-        details=f"Removed admin: {user['first_name']}"
+        details={user['user_id']: f"Removed admin: {user['first_name']}" for user in targets}
     )
+    for user_id in target_ids:
+        rate_limiter.reset(user_id)
     
-    await update.message.reply_text(
-        f"{E['check']} **Admin Removed**\n\n"
-        f"User `{target_user_id}` is no longer an administrator.",
-        parse_mode='Markdown'
+    broadcast_id = notify_users(
+        context, update.effective_user.id, target_ids,
+        f"{E['info']} You have been removed from administrators."
     )
     
-    # Notify user
-    try:
-        await context.bot.send_message(
-            chat_id=target_user_id,
-            text=f"{E['info']} You have been removed from administrators.",
+    if not single:
+        await update.message.reply_text(
+            bulk_result_text("Admins Removed", len(targets), not_found, len(users) - len(targets),
+                             "not admin or owner", broadcast_id),
             parse_mode='Markdown'
         )
-    except:
-        pass
+        return
+    
+    await update.message.reply_text(
+        f"{E['check']} **Admin Removed**\n\n"
+        f"User `{target_ids[0]}` is no longer an administrator.",
+        parse_mode='Markdown'
+    )
 
 @admin_only
 async def admin_list_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -231,18 +343,19 @@ async def admin_list_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
 @admin_only
 async def add_premium_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Add premium to user"""
-    if len(context.args) < 2:
-        await update.message.reply_text(
-            f"{E['info']} **Usage:** `/addpremium <user_id> <days>`\n\n"
-            f"Example: `/addpremium 123456789 30`",
-            parse_mode='Markdown'
-        )
+    """Add premium to users"""
+    usage = (
+        f"{E['info']} **Usage:** `/addpremium <targets> <days>`\n\n"
+        f"Example: `/addpremium 123456789 30`\n"
+        f"{TARGETS_HELP}"
+    )
+    if not context.args:
+        await update.message.reply_text(usage, parse_mode='Markdown')
         return
     
     try:
-        target_user_id = int(context.args[0])
-        days = int(context.args[1])
+        days = int(context.args[-1])
+        resolved = await resolve_targets(update, context.args[:-1])
     except ValueError:
         await update.message.reply_text(
             f"{E['cross']} Invalid parameters!",
@@ -250,6 +363,10 @@ async def add_premium_command(update: Update, context: ContextTypes.DEFAULT_TYPE
         )
         return
     
+    if resolved is None:
+        await update.message.reply_text(usage, parse_mode='Markdown')
+        return
+    
     if days < 1 or days > 3650:
         await update.message.reply_text(
             f"{E['cross']} Days must be between 1-3650!",
@@ -257,33 +374,59 @@ async def add_premium_command(update: Update, context: ContextTypes.DEFAULT_TYPE
         )
         return
     
-    # Check if user exists
-    user = db.get_user(target_user_id)
-    if not user:
+    users, not_found = resolved
+    if not users:
         await update.message.reply_text(
             f"{E['cross']} User not found!",
             parse_mode='Markdown'
         )
         return
     
-    # Add premium
-    db.add_premium(target_user_id, days)
-    
-    # Log action
-    db.add_admin_log(
+    # Add premium and log it in one transaction
+    target_ids = [user['user_id'] for user in users]
+    premium_until = db.bulk_add_premium(
+        target_ids, days,
         admin_id=update.effective_user.id,
-        action_type='add_premium',
-        target_user_id=target_user_id,
-        details=f"Added {days} days premium"
+        details=dict.fromkeys(target_ids, f"Added {days} days premium")
+    )
+    for user_id in target_ids:
+        rate_limiter.reset(user_id)
+    
+    broadcast_id = notify_users(
+        context, update.effective_user.id, target_ids,
+        f"{E['party']} **Congratulations!** {E['party']}\n\n"
+        f"You have been granted **Premium Membership**!\n\n"
+        f"{E['crown']} **Benefits:**\n"
+        f"• Host up to 10 bots\n"
+        f"• 50MB file size limit\n"
+        f"• Priority support\n\n"
+        f"{E['calendar']} **Duration:** {days} days\n"
+        f"{E['time']} **Valid Until:** {premium_until[:10]}\n\n"
+        f"Enjoy your premium features! {E['fire']}"
     )
     
-    premium_until = db.get_user(target_user_id)['premium_until']
+    if len(users) > 1 or not_found:
+        await update.message.reply_text(
+            bulk_result_text(f"Premium Granted ({days} days)", len(users), not_found,
+                             broadcast_id=broadcast_id),
+            parse_mode='Markdown'
+        )
+        outbox.send(
+            Config.ADMIN_GROUP_ID,
+            f"{E['bell']} **Premium Granted!**\n\n"
+            f"Users: {len(users)}\n"
+            f"Duration: {days} days\n"
+            f"By: {escape_markdown(update.effective_user.first_name, version=1)}",
+            priority=PRIORITY_NORMAL
+        )
+        return
     
+    user = users[0]
     success_text = f"""
 {E['check']} **Premium Granted!** {E['diamond']}
 
 {E['user']} **User Details:**
-├ ID: `{target_user_id}`
+├ ID: `{user['user_id']}`
 ├ Name: {user['first_name']}
 └ Username: @{user['username'] or 'None'}
 
@@ -297,90 +440,72 @@ User notified via DM!
     await update.message.reply_text(success_text, parse_mode='Markdown')
     
     # Notify admin group
-    try:
-        await context.bot.send_message(
-            chat_id=Config.ADMIN_GROUP_ID,
-            text=f"{E['bell']} **Premium Granted!**\n\n"
-                 f"User: {user['first_name']}\n"
-                 f"Duration: {days} days\n"
-                 f"By: {update.effective_user.first_name}",
-            parse_mode='Markdown'
-        )
-    except:
-        pass
-    
-    # Notify user
-    try:
-        await context.bot.send_message(
-            chat_id=target_user_id,
-            text=f"{E['party']} **Congratulations!** {E['party']}\n\n"
-                 f"You have been granted **Premium Membership**!\n\n"
-                 f"{E['crown']} **Benefits:**\n"
-                 f"• Host up to 10 bots\n"
-                 f"• 50MB file size limit\n"
-                 f"• Priority support\n\n"
-                 f"{E['calendar']} **Duration:** {days} days\n"
-                 f"{E['time']} **Valid Until:** {premium_until[:10]}\n\n"
-                 f"Enjoy your premium features! {E['fire']}",
-            parse_mode='Markdown'
-        )
-    except:
-        pass
+    outbox.send(
+        Config.ADMIN_GROUP_ID,
+        f"{E['bell']} **Premium Granted!**\n\n"
+        f"User: {escape_markdown(user['first_name'] or '', version=1)}\n"
+        f"Duration: {days} days\n"
+        f"By: {escape_markdown(update.effective_user.first_name, version=1)}",
+        priority=PRIORITY_NORMAL
+    )
 
 @admin_only
 async def remove_premium_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Remove premium from user"""
-    if not context.args:
+    """Remove premium from users"""
+    try:
+        resolved = await resolve_targets(update, context.args)
+    except ValueError as e:
+        await update.message.reply_text(f"{E['cross']} {e}", parse_mode='Markdown')
+        return
+    
+    if resolved is None:
         await update.message.reply_text(
-            f"{E['info']} **Usage:** `/removepremium <user_id>`",
+            f"{E['info']} **Usage:** `/removepremium <targets>`\n\n"
+            f"{TARGETS_HELP}",
             parse_mode='Markdown'
         )
         return
     
-    try:
-        target_user_id = int(context.args[0])
-    except ValueError:
-        await update.message.reply_text(f"{E['cross']} Invalid user ID!", parse_mode='Markdown')
-        return
-    
-    # Check if premium
-    if not db.is_premium(target_user_id):
+    users, not_found = resolved
+    single = len(users) == 1 and not not_found
+    targets = [user for user in users if user['is_premium']]
+    if (single or not users) and not targets:
         await update.message.reply_text(
             f"{E['info']} User doesn't have premium!",
             parse_mode='Markdown'
         )
         return
     
-    # Remove premium
-    db.remove_premium(target_user_id)
-    
-    user = db.get_user(target_user_id)
-    
-    # Log action
-    db.add_admin_log(
+    # Remove premium and log it in one transaction
+    target_ids = [user['user_id'] for user in targets]
+    db.bulk_remove_premium(
+        target_ids,
         admin_id=update.effective_user.id,
-        action_type='remove_premium',
-        target_user_id=target_user_id,
-        details=f"Removed premium from {user['first_name']}"
+        details={user['user_id']: f"Removed premium from {user['first_name']}" for user in targets}
+    )
+    for user_id in target_ids:
+        rate_limiter.reset(user_id)
+    
+    broadcast_id = notify_users(
+        context, update.effective_user.id, target_ids,
+        f"{E['info']} Your premium membership has expired or been removed.\n\n"
+        f"You are now on the free plan.\n\n"
+        f"Contact @shuvohassan00 to renew premium."
     )
     
+    if not single:
+        await update.message.reply_text(
+            bulk_result_text("Premium Removed", len(targets), not_found, len(users) - len(targets),
+                             "not premium", broadcast_id),
+            parse_mode='Markdown'
+        )
+        return
+    
     await update.message.reply_text(
         f"{E['check']} **Premium Removed**\n\n"
-        f"User `{target_user_id}` is now a free user.",
+        f"User `{target_ids[0]}` is now a free user.",
         parse_mode='Markdown'
     )
-    
-    # Notify user
-    try:
-        await context.bot.send_message(
-            chat_id=target_user_id,
-            text=f"{E['info']} Your premium membership has expired or been removed.\n\n"
-                 f"You are now on the free plan.\n\n"
-                 f"Contact @shuvohassan00 to renew premium.",
-            parse_mode='Markdown'
-        )
-    except:
-        pass
 
 @admin_only
 async def premium_list_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -410,82 +535,187 @@ async def premium_list_command(update: Update, context: ContextTypes.DEFAULT_TYP
 
 @admin_only
 async def ban_user_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Ban a user"""
-    if not context.args:
+    """Ban users"""
+    try:
+        resolved = await resolve_targets(update, context.args)
+    except ValueError as e:
+        await update.message.reply_text(f"{E['cross']} {e}", parse_mode='Markdown')
+        return
+    
+    if resolved is None:
         await update.message.reply_text(
-            f"{E['info']} **Usage:** `/ban <user_id>`",
+            f"{E['info']} **Usage:** `/ban <targets>`\n\n"
+            f"{TARGETS_HELP}",
             parse_mode='Markdown'
         )
         return
     
-    try:
-        target_user_id = int(context.args[0])
-    except ValueError:
-        await update.message.reply_text(f"{E['cross']} Invalid user ID!", parse_mode='Markdown')
-        return
+    users, not_found = resolved
+    single = len(users) == 1 and not not_found
     
     # Can't ban owner or admins
-    if target_user_id == Config.OWNER_ID or db.is_admin(target_user_id):
+    banable = [user for user in users if user['user_id'] != Config.OWNER_ID and not user['is_admin']]
+    if single and not banable:
         await update.message.reply_text(
             f"{E['cross']} Cannot ban owner or admins!",
             parse_mode='Markdown'
         )
         return
     
-    # Ban user
-    db.ban_user(target_user_id)
-    
-    user = db.get_user(target_user_id)
+    if not users:
+        await update.message.reply_text(f"{E['cross']} User not found!", parse_mode='Markdown')
+        return
     
-    # Log action
-    db.add_admin_log(
+    # Ban users and log them in one transaction
+    targets = [user for user in banable if not user['is_banned']]
+    db.bulk_set_banned(
+        [user['user_id'] for user in targets], True,
         admin_id=update.effective_user.id,
-        action_type='ban_user',
-        target_user_id=target_user_id,
-        details=f"Banned user: {user['first_name']}"
+        details={user['user_id']: f"Banned user: {user['first_name']}" for user in targets}
     )
     
+    if not single:
+        await update.message.reply_text(
+            bulk_result_text("Users Banned", len(targets), not_found, len(users) - len(targets),
+                             "owner, admin or already banned"),
+            parse_mode='Markdown'
+        )
+        return
+    
     await update.message.reply_text(
         f"{E['check']} **User Banned**\n\n"
-        f"User `{target_user_id}` has been banned.",
+        f"User `{users[0]['user_id']}` has been banned.",
         parse_mode='Markdown'
     )
 
 @admin_only
 async def unban_user_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Unban a user"""
-    if not context.args:
+    """Unban users"""
+    try:
+        resolved = await resolve_targets(update, context.args)
+    except ValueError as e:
+        await update.message.reply_text(f"{E['cross']} {e}", parse_mode='Markdown')
+        return
+    
+    if resolved is None:
         await update.message.reply_text(
-            f"{E['info']} **Usage:** `/unban <user_id>`",
+            f"{E['info']} **Usage:** `/unban <targets>`\n\n"
+            f"{TARGETS_HELP}",
             parse_mode='Markdown'
         )
         return
     
-    try:
-        target_user_id = int(context.args[0])
-    except ValueError:
-        await update.message.reply_text(f"{E['cross']} Invalid user ID!", parse_mode='Markdown')
+    users, not_found = resolved
+    if not users:
+        await update.message.reply_text(f"{E['cross']} User not found!", parse_mode='Markdown')
         return
     
-    # Unban user
-    db.unban_user(target_user_id)
-    
-    user = db.get_user(target_user_id)
-    
-    # Log action
-    db.add_admin_log(
+    # Unban users and log them in one transaction
+    targets = [user for user in users if user['is_banned']]
+    db.bulk_set_banned(
+        [user['user_id'] for user in targets], False,
         admin_id=update.effective_user.id,
-        action_type='unban_user',
-        target_user_id=target_user_id,
-        details=f"Unbanned user: {user['first_name']}"
+        details={user['user_id']: f"Unbanned user: {user['first_name']}" for user in targets}
     )
     
+    if len(users) > 1 or not_found:
+        await update.message.reply_text(
+            bulk_result_text("Users Unbanned", len(targets), not_found, len(users) - len(targets),
+                             "not banned"),
+            parse_mode='Markdown'
+        )
+        return
+    
     await update.message.reply_text(
         f"{E['check']} **User Unbanned**\n\n"
-        f"User `{target_user_id}` can now use the bot.",
+        f"User `{users[0]['user_id']}` can now use the bot.",
         parse_mode='Markdown'
     )
 
+def render_user_search(search: dict) -> tuple:
+    """One page of /finduser results, keyset paged on (matching name, user_id)"""
+    size = Config.USER_SEARCH_PAGE_SIZE
+    rows = db.search_users(search['query'], search['pages'][-1], size, search['columns'])
+    has_more = len(rows) > size
+    rows = rows[:size]
+    
+    text = f"{E['search']} **Users matching** `{search['query']}` (page {len(search['pages'])})\n\n"
+    if not rows:
+        text += "No users found."
+    
+    seen = set()
+    for row in rows:
+        if row['user_id'] in seen:
+            continue
+        seen.add(row['user_id'])
+        
+        badges = ''.join(badge for flag, badge in (
+            (row['is_admin'], E['admin']), (row['is_premium'], E['crown']), (row['is_banned'], '🚫')
+        ) if flag)
+        name = escape_markdown(f"{row['first_name'] or ''} {row['last_name'] or ''}".strip(), version=1)
+        username = f" @{escape_markdown(row['username'], version=1)}" if row['username'] else ''
+        text += f"`{row['user_id']}` — {name}{username} {badges}".rstrip() + "\n"
+    
+    search['next'] = (rows[-1]['match_key'], rows[-1]['user_id']) if rows else None
+    
+    nav = []
+    if len(search['pages']) > 1:
+        nav.append(InlineKeyboardButton("◀️ Prev", callback_data="admu:prev"))
+    if has_more:
+        nav.append(InlineKeyboardButton("Next ▶️", callback_data="admu:next"))
+    
+    return text, InlineKeyboardMarkup([nav]) if nav else None
+
+@admin_only
+async def find_user_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Find users by the start of their username or first/last name"""
+    query = ' '.join(context.args).replace('`', '').strip()[:64]
+    columns = db.SEARCH_COLUMNS
+    if query.startswith('@'):
+        query, columns = query[1:], ('username',)
+    
+    if not query:
+        await update.message.reply_text(
+            f"{E['info']} **Usage:** `/finduser <name or @username>`\n\n"
+            f"Matches the start of the username, first or last name (any case).",
+            parse_mode='Markdown'
+        )
+        return
+    
+    search = {'query': query, 'columns': columns, 'pages': [None]}
+    context.user_data['user_search'] = search
+    
+    text, reply_markup = render_user_search(search)
+    await update.message.reply_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+
+async def find_user_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Paging buttons of /finduser"""
+    query = update.callback_query
+    admin_id = update.effective_user.id
+    
+    if admin_id != Config.OWNER_ID and not db.is_admin(admin_id):
+        await query.answer(f"{E['cross']} Access denied")
+        return
+    
+    search = context.user_data.get('user_search')
+    if not search:
+        await query.answer("Session expired, run /finduser again")
+        return
+    
+    if query.data == 'admu:next' and search.get('next'):
+        search['pages'].append(search['next'])
+    elif query.data == 'admu:prev' and len(search['pages']) > 1:
+        search['pages'].pop()
+    await query.answer()
+    
+    text, reply_markup = render_user_search(search)
+    try:
+        await query.edit_message_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+    except BadRequest as e:
+        # Only an unchanged page is expected; anything else is a real failure
+        if 'not modified' not in str(e).lower():
+            raise
+
 @owner_only
 async def broadcast_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Broadcast message to all users"""
@@ -498,17 +728,15 @@ async def broadcast_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     
     message = ' '.join(context.args)
-    all_users = db.get_all_users()
+    # Users who blocked the bot are skipped without a network call
+    user_ids = db.get_reachable_user_ids()
     
     status_msg = await update.message.reply_text(
         f"{E['gear']} **Broadcasting...**\n\n"
-        f"Total users: {len(all_users)}",
+        f"Total users: {len(user_ids)}",
         parse_mode='Markdown'
     )
     
-    success_count = 0
-    failed_count = 0
-    
     broadcast_text = f"""
 {E['bell']} **Broadcast Message**
 
@@ -518,30 +746,62 @@ async def broadcast_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 From: Bot Administration
     """
     
-    for user in all_users:
+    broadcast_id = db.create_broadcast(
+        update.effective_user.id,
+        broadcast_text,
+        user_ids,
+        status_chat_id=status_msg.chat_id,
+        status_message_id=status_msg.message_id
+    )
+    
+    # Run in the background so the bot keeps answering other updates
+    context.application.create_task(broadcaster.run_job(context.bot, broadcast_id))
+
+@admin_only
+async def broadcast_status_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show progress of a broadcast, or the most recent ones"""
+    if context.args:
         try:
-            await context.bot.send_message(
-                chat_id=user['user_id'],
-                text=broadcast_text,
-                parse_mode='Markdown'
-            )
-            success_count += 1
-        except:
-            failed_count += 1
+            broadcast = db.get_broadcast(int(context.args[0]))
+        except ValueError:
+            await update.message.reply_text(f"{E['cross']} Invalid broadcast ID!")
+            return
+        
+        if not broadcast:
+            await update.message.reply_text(f"{E['cross']} Broadcast not found!")
+            return
+        
+        await update.message.reply_text(broadcaster.format_status(broadcast), parse_mode='Markdown')
+        return
     
-    await status_msg.edit_text(
-        f"{E['check']} **Broadcast Complete!**\n\n"
-        f"✅ Sent: {success_count}\n"
-        f"❌ Failed: {failed_count}\n"
-        f"📊 Total: {len(all_users)}",
-        parse_mode='Markdown'
-    )
+    broadcasts = db.get_recent_broadcasts()
+    if not broadcasts:
+        await update.message.reply_text(f"{E['info']} No broadcasts yet.")
+        return
+    
+    status_text = f"{E['bell']} **Recent Broadcasts**\n\n"
+    for broadcast in broadcasts:
+        done = broadcast['sent'] + broadcast['failed'] + broadcast['unreachable']
+        icon = E['check'] if broadcast['status'] == 'completed' else E['gear']
+        status_text += (f"{icon} `#{broadcast['broadcast_id']}` — {done}/{broadcast['total']} "
+                        f"({broadcast['created_date'][:16].replace('T', ' ')})\n")
+    status_text += f"\nDetails: `/broadcast_status <id>`"
+    
+    await update.message.reply_text(status_text, parse_mode='Markdown')
 
 @admin_only
 async def stats_admin_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show detailed statistics"""
     stats = db.get_statistics()
     all_users = db.get_all_users()
+    cache_stats = validation_cache.get_stats()
+    outbox_stats = outbox.get_stats()
+    update_stats = update_processor.get_stats()
+    limiter_stats = rate_limiter.get_stats()
+    admission_stats = admission.get_stats()
+    limiter_breakdown = ', '.join(f"{action}: {count}" for action, count in limiter_stats['rejected_by_action'].items())
+    if limiter_breakdown:
+        limiter_breakdown = f"({limiter_breakdown})"
     
     # Calculate additional stats
     active_today = sum(1 for user in all_users 
@@ -564,6 +824,38 @@ async def stats_admin_command(update: Update, context: ContextTypes.DEFAULT_TYPE
 ├ Stopped: {stats['total_bots'] - stats['active_bots']}
 └ Total Uploads: {stats['total_uploads']}
 
+{E['gear']} **Host Capacity:**
+├ CPU: {admission_stats['cpu_percent']:.0f}% / {Config.ADMISSION_MAX_CPU_PERCENT}%
+├ Memory: {admission_stats['memory_percent']:.0f}% / {Config.ADMISSION_MAX_MEMORY_PERCENT}%
+├ Running Limit: {Config.ADMISSION_MAX_RUNNING_BOTS}
+├ Start Queue: {admission_stats['queued']} ({admission_stats['queued_premium']} premium)
+└ Started From Queue: {admission_stats['started_from_queue']} (turned away: {admission_stats['rejected']})
+
+{E['lightning']} **Validation Cache:**
+├ Entries: {cache_stats['entries']}
+├ Hit Rate: {cache_stats['hit_rate']:.1f}% ({cache_stats['hits']}/{cache_stats['hits'] + cache_stats['misses']})
+├ Lifetime Hits: {cache_stats['total_hits']}
+└ Evicted: {cache_stats['evicted']}
+
+{E['bell']} **Outbound Queue:**
+├ Queued Now: {outbox_stats['depth']} ({outbox_stats['chats']} chats)
+├ Sent: {outbox_stats['sent']}
+├ Merged: {outbox_stats['coalesced']}
+├ Retried: {outbox_stats['retried']}
+├ Failed: {outbox_stats['failed']}
+└ Dropped: {outbox_stats['dropped']}
+
+{E['lightning']} **Update Processing:**
+├ Running Now: {update_stats['active']}
+├ Users Waiting: {update_stats['users_waiting']}
+├ Processed: {update_stats['processed']}
+└ Dropped (flooding): {update_stats['rejected']}
+
+{E['shield']} **Rate Limiting:**
+├ Tracked Users: {limiter_stats['tracked_users']}
+├ Allowed: {limiter_stats['allowed']}
+└ Rejected: {limiter_stats['rejected']} {limiter_breakdown}
+
 {E['calendar']} **Report Date:**
 └ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
@@ -571,3 +863,438 @@ async def stats_admin_command(update: Update, context: ContextTypes.DEFAULT_TYPE
     """
     
     await update.message.reply_text(stats_text, parse_mode='Markdown')
+
+@admin_only
+async def disk_usage_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show upload storage and deduplication report"""
+    usage = db.get_blob_usage()
+    seen = set()
+    blob_bytes = blob_store.disk_usage(seen)
+    bot_bytes = blob_store.directory_usage(Config.HOSTED_BOTS_DIR, seen)
+    # Only reflinked bot files share space with their blob; plain copies are real bytes
+    saved_bytes = usage['cloned_bytes']
+    footprint = max(blob_bytes + bot_bytes - saved_bytes, 0)
+    saved_percent = (saved_bytes / (footprint + saved_bytes) * 100) if footprint + saved_bytes else 0
+    
+    mb = 1024 * 1024
+    usage_text = f"""
+{E['folder']} **Upload Storage Report**
+
+{E['package']} **Blob Store:**
+├ Unique Files: {usage['blobs']}
+├ Bot References: {usage['refs']}
+└ On Disk: {blob_bytes / mb:.2f}MB
+
+{E['robot']} **Bot Directories:**
+└ Files: {bot_bytes / mb:.2f}MB
+
+{E['chart']} **Total Footprint:** {footprint / mb:.2f}MB
+└ Saved by reflinks: {saved_bytes / mb:.2f}MB ({saved_percent:.1f}%)
+{'' if saved_bytes or not usage['refs'] else '(The filesystem has no reflinks, so bots hold full copies)'}
+
+━━━━━━━━━━━━━━━━━━━━
+    """
+    
+    await update.message.reply_text(usage_text, parse_mode='Markdown')
+
+@owner_only
+async def upload_notify_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Choose how the owner hears about uploads"""
+    if not context.args or context.args[0].lower() not in MODES:
+        await update.message.reply_text(
+            f"{E['info']} **Usage:** `/uploadnotify <instant|digest|off>`\n\n"
+            f"Current mode: `{upload_notifier.get_mode()}`\n\n"
+            f"├ instant - Message + file for every upload\n"
+            f"├ digest - One summary every {Config.UPLOAD_DIGEST_INTERVAL // 60} minutes\n"
+            f"└ off - No upload notifications",
+            parse_mode='Markdown'
+        )
+        return
+    
+    mode = context.args[0].lower()
+    upload_notifier.set_mode(mode)
+    
+    # Don't leave collected uploads behind when leaving digest mode
+    if mode != 'digest':
+        await upload_notifier.flush_digest()
+    
+    await update.message.reply_text(
+        f"{E['check']} Upload notifications set to `{mode}`.",
+        parse_mode='Markdown'
+    )
+
+@owner_only
+async def backup_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Take a database snapshot now, or list the kept snapshots"""
+    mb = 1024 * 1024
+    
+    if not db_backup.database_paths():
+        await update.message.reply_text(f"{E['info']} Snapshots need the SQLite storage backend.")
+        return
+    
+    if context.args and context.args[0].lower() == 'list':
+        snapshots = db_backup.list_snapshots()
+        if not snapshots:
+            await update.message.reply_text(f"{E['info']} No snapshots yet.")
+            return
+        
+        backup_text = f"{E['folder']} **Database Snapshots** ({len(snapshots)}/{Config.BACKUP_KEEP})\n\n"
+        for name in snapshots:
+            backup_text += f"├ `{name}` — {db_backup.snapshot_size(name) / mb:.2f}MB\n"
+        backup_text += f"\nRestore: `/restore <name>`"
+        await update.message.reply_text(backup_text, parse_mode='Markdown')
+        return
+    
+    if db_backup.lock.locked():
+        await update.message.reply_text(f"{E['info']} A backup or restore is already running.")
+        return
+    
+    status_msg = await update.message.reply_text(
+        f"{E['gear']} **Backing up...**\n\nThe bot keeps serving users meanwhile.",
+        parse_mode='Markdown'
+    )
+    
+    snapshot = await db_backup.create()
+    
+    await status_msg.edit_text(
+        f"{E['check']} **Snapshot Created**\n\n"
+        f"├ Name: `{snapshot['name']}`\n"
+        f"├ Size: {snapshot['size'] / mb:.2f}MB (compressed)\n"
+        f"└ Took: {snapshot['seconds']:.1f}s\n\n"
+        f"Keeping the newest {Config.BACKUP_KEEP}. List: `/backup list`",
+        parse_mode='Markdown'
+    )
+
+@owner_only
+async def restore_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Replace the databases with a snapshot"""
+    if not db_backup.database_paths():
+        await update.message.reply_text(f"{E['info']} Snapshots need the SQLite storage backend.")
+        return
+    
+    snapshots = db_backup.list_snapshots()
+    
+    if not context.args or context.args[0] not in snapshots:
+        await update.message.reply_text(
+            f"{E['info']} **Usage:** `/restore <name> confirm`\n\n"
+            f"Snapshots: {', '.join(f'`{name}`' for name in snapshots[:5]) or 'none'}",
+            parse_mode='Markdown'
+        )
+        return
+    
+    name = context.args[0]
+    if len(context.args) < 2 or context.args[1].lower() != 'confirm':
+        await update.message.reply_text(
+            f"{E['warning']} **Restore `{name}`?**\n\n"
+            f"All users, bots and logs are replaced with the snapshot's data. "
+            f"The current data is snapshotted first.\n\n"
+            f"Send `/restore {name} confirm` to continue.",
+            parse_mode='Markdown'
+        )
+        return
+    
+    if db_backup.lock.locked():
+        await update.message.reply_text(f"{E['info']} A backup or restore is already running.")
+        return
+    
+    status_msg = await update.message.reply_text(f"{E['gear']} **Restoring `{name}`...**", parse_mode='Markdown')
+    
+    safety = await db_backup.restore(name)
+    
+    await status_msg.edit_text(
+        f"{E['check']} **Restored `{name}`**\n\n"
+        f"Previous data saved as `{safety['name']}`.\n\n"
+        f"{E['warning']} Hosted bot processes were not touched. Restart the bot so "
+        f"running bots and caches match the restored data.",
+        parse_mode='Markdown'
+    )
+
+BOT_STATUSES = ('running', 'stopped', 'error')
+BOT_TYPES = {'python': 'python', 'py': 'python', 'javascript': 'javascript', 'js': 'javascript'}
+
+def render_bots_page(browser: dict) -> tuple:
+    """One page of the fleet browser: keyset pages by bot_id, or offset pages when sorted by usage"""
+    filters = browser['filters']
+    page = browser['page']
+    size = Config.ADMIN_BOTS_PAGE_SIZE
+    nav = []
+    
+    if browser['sort']:
+        pids = db.get_running_bot_pids(filters['user_id'], filters['file_type'], filters['has_errors'])
+        usage = process_manager.get_usage_snapshot(pids)
+        metric = 'cpu_percent' if browser['sort'] == 'cpu' else 'memory_mb'
+        ordered = sorted(usage, key=lambda bot_id: usage[bot_id][metric], reverse=True)
+        
+        offset = page.get('offset', 0)
+        page_ids = ordered[offset:offset + size]
+        rows = sorted(db.get_bots_by_ids(page_ids), key=lambda row: page_ids.index(row['bot_id']))
+        
+        if offset > 0:
+            nav.append(InlineKeyboardButton("◀️ Prev", callback_data=f"admb:off:{max(offset - size, 0)}"))
+        if offset + size < len(ordered):
+            nav.append(InlineKeyboardButton("Next ▶️", callback_data=f"admb:off:{offset + size}"))
+        header = f"sorted by {'CPU' if browser['sort'] == 'cpu' else 'memory'}, {len(ordered)} running"
+    else:
+        rows = db.browse_bots(**filters, before_id=page.get('before'), after_id=page.get('after'), limit=size)
+        has_more = len(rows) > size
+        rows = rows[:size]
+        
+        has_newer = has_more if 'after' in page else 'before' in page
+        has_older = True if 'after' in page else has_more
+        
+        if rows and has_newer:
+            nav.append(InlineKeyboardButton("◀️ Newer", callback_data=f"admb:newer:{rows[0]['bot_id']}"))
+        if rows and has_older:
+            nav.append(InlineKeyboardButton("Older ▶️", callback_data=f"admb:older:{rows[-1]['bot_id']}"))
+        
+        running = {row['bot_id']: row['process_id'] for row in rows if row['status'] == 'running'}
+        usage = process_manager.get_usage_snapshot(running) if running else {}
+        header = "newest first"
+    
+    active_filters = [
+        value for value in (
+            filters['status'],
+            filters['file_type'],
+            'errors' if filters['has_errors'] else None,
+            f"user {filters['user_id']}" if filters['user_id'] else None
+        ) if value
+    ]
+    
+    text = f"{E['robot']} **Hosted Bots** ({header})\n"
+    if active_filters:
+        text += f"Filters: {', '.join(active_filters)}\n"
+    text += "\n"
+    
+    keyboard = []
+    if not rows:
+        text += "No bots match."
+    
+    for row in rows:
+        status_emoji = {'running': '🟢', 'stopped': '🔴', 'error': '⚠️'}.get(row['status'], '⚪')
+        text += f"{status_emoji} `#{row['bot_id']}` **{escape_markdown(row['bot_name'] or '', version=1)}** — 👤 `{row['user_id']}` — {row['file_type'][:2].upper()}"
+        if row['bot_id'] in usage:
+            text += f" — {usage[row['bot_id']]['cpu_percent']:.1f}% / {usage[row['bot_id']]['memory_mb']:.0f}MB"
+        if row['errors']:
+            text += " ❗"
+        text += "\n"
+        
+        buttons = []
+        if row['status'] == 'running':
+            buttons.append(InlineKeyboardButton(f"⏹️ Stop #{row['bot_id']}", callback_data=f"admb:stop:{row['bot_id']}"))
+        buttons.append(InlineKeyboardButton(f"🔄 Restart #{row['bot_id']}", callback_data=f"admb:restart:{row['bot_id']}"))
+        keyboard.append(buttons)
+    
+    if nav:
+        keyboard.append(nav)
+    keyboard.append([InlineKeyboardButton("⏮️ First page", callback_data="admb:first")])
+    
+    return text, InlineKeyboardMarkup(keyboard)
+
+@admin_only
+async def bots_browser_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Browse every hosted bot with filters, paging and stop/restart buttons"""
+    filters = {'status': None, 'user_id': None, 'file_type': None, 'has_errors': False}
+    sort = None
+    
+    for arg in (arg.lower() for arg in context.args):
+        if arg in BOT_STATUSES:
+            filters['status'] = arg
+        elif arg in BOT_TYPES:
+            filters['file_type'] = BOT_TYPES[arg]
+        elif arg == 'errors':
+            filters['has_errors'] = True
+        elif arg.startswith('user:') and arg[5:].isdigit():
+            filters['user_id'] = int(arg[5:])
+        elif arg.isdigit():
+            filters['user_id'] = int(arg)
+        elif arg in ('sort:cpu', 'sort:mem'):
+            sort = arg[5:]
+        else:
+            await update.message.reply_text(
+                f"{E['info']} **Usage:** `/bots [running|stopped|error] [python|javascript] "
+                f"[errors] [user:<id>] [sort:cpu|mem]`\n\n"
+                f"Example: `/bots running python sort:mem`",
+                parse_mode='Markdown'
+            )
+            return
+    
+    browser = {'filters': filters, 'sort': sort, 'page': {}}
+    context.user_data['bots_browser'] = browser
+    
+    text, reply_markup = render_bots_page(browser)
+    await update.message.reply_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+
+async def bots_browser_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Paging and stop/restart buttons of /bots"""
+    query = update.callback_query
+    admin_id = update.effective_user.id
+    
+    if admin_id != Config.OWNER_ID and not db.is_admin(admin_id):
+        await query.answer(f"{E['cross']} Access denied")
+        return
+    
+    browser = context.user_data.get('bots_browser')
+    if not browser:
+        await query.answer("Session expired, run /bots again")
+        return
+    
+    _, action, value = (query.data.split(':') + [''])[:3]
+    
+    if action == 'first':
+        browser['page'] = {}
+    elif action == 'older':
+        browser['page'] = {'before': int(value)}
+    elif action == 'newer':
+        browser['page'] = {'after': int(value)}
+    elif action == 'off':
+        browser['page'] = {'offset': int(value)}
+    elif action in ('stop', 'restart'):
+        bot = db.get_bot(int(value))
+        if not bot:
+            await query.answer(f"{E['cross']} Bot not found")
+            return
+        
+        if action == 'stop':
+            success, message = process_manager.stop_bot(bot['bot_id'], bot['process_id'])
+            if success:
+                db.update_bot_status(bot['bot_id'], 'stopped')
+        else:
+            success, message, process_id = process_manager.restart_bot(
+                bot['bot_id'], bot['process_id'], bot['file_path'], bot['file_type']
+            )
+            if success:
+                db.update_bot_status(bot['bot_id'], 'running', process_id)
+        
+        db.add_admin_log(
+            admin_id=admin_id,
+            action_type=f'bot_{action}',
+            target_user_id=bot['user_id'],
+            details=f"Bot #{bot['bot_id']} ({bot['bot_name']}): {'ok' if success else 'failed'}"
+        )
+        await query.answer(message.replace('*', '')[:200])
+    
+    if action not in ('stop', 'restart'):
+        await query.answer()
+    
+    text, reply_markup = render_bots_page(browser)
+    try:
+        await query.edit_message_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+    except BadRequest as e:
+        # Only an unchanged page is expected; anything else is a real failure
+        if 'not modified' not in str(e).lower():
+            raise
+
+AUDIT_TIME_UNITS = {'m': 'minutes', 'h': 'hours', 'd': 'days'}
+
+def parse_audit_time(value: str) -> str:
+    """`30m`, `12h` or `7d` ago, or a date/time like `2024-05-01`, as an ISO timestamp"""
+    unit = AUDIT_TIME_UNITS.get(value[-1:].lower())
+    if unit and value[:-1].isdigit():
+        return (datetime.now() - timedelta(**{unit: int(value[:-1])})).isoformat()
+    return datetime.fromisoformat(value).isoformat()
+
+def render_audit_page(audit: dict) -> tuple:
+    """One page of the audit log: keyset pages by log_id, newest first"""
+    page = audit['page']
+    size = Config.AUDIT_LOG_PAGE_SIZE
+    rows = db.browse_admin_logs(**audit['filters'], before_id=page.get('before'),
+                                after_id=page.get('after'), limit=size)
+    has_more = len(rows) > size
+    rows = rows[:size]
+    
+    has_newer = has_more if 'after' in page else 'before' in page
+    has_older = True if 'after' in page else has_more
+    
+    text = f"{E['shield']} **Audit Log** (newest first)\n"
+    if audit['labels']:
+        text += f"Filters: {escape_markdown(', '.join(audit['labels']), version=1)}\n"
+    text += "\n"
+    
+    if not rows:
+        text += "No entries match."
+    
+    for row in rows:
+        text += (f"`#{row['log_id']}` {(row['timestamp'] or '')[:16].replace('T', ' ')} — "
+                 f"{E['admin']} `{row['admin_id']}` `{row['action_type']}`")
+        if row['target_user_id']:
+            text += f" → `{row['target_user_id']}`"
+        if row['details']:
+            text += f"\n    {escape_markdown(row['details'][:100], version=1)}"
+        text += "\n"
+    
+    nav = []
+    if rows and has_newer:
+        nav.append(InlineKeyboardButton("◀️ Newer", callback_data=f"adml:newer:{rows[0]['log_id']}"))
+    if rows and has_older:
+        nav.append(InlineKeyboardButton("Older ▶️", callback_data=f"adml:older:{rows[-1]['log_id']}"))
+    
+    keyboard = [nav] if nav else []
+    keyboard.append([InlineKeyboardButton("⏮️ Newest", callback_data="adml:first")])
+    return text, InlineKeyboardMarkup(keyboard)
+
+@admin_only
+async def audit_log_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Browse the admin audit log by admin, action, target and time window"""
+    filters = {'admin_id': None, 'action_type': None, 'target_user_id': None, 'since': None, 'until': None}
+    labels = []
+    
+    try:
+        for arg in context.args:
+            name, _, value = arg.partition(':')
+            name = name.lower()
+            if name == 'admin' and value.isdigit():
+                filters['admin_id'] = int(value)
+            elif name == 'action' and value:
+                filters['action_type'] = value.lower()
+            elif name in ('target', 'user') and value.isdigit():
+                filters['target_user_id'] = int(value)
+            elif name in ('since', 'until') and value:
+                filters[name] = parse_audit_time(value)
+            else:
+                raise ValueError(arg)
+            labels.append(arg)
+    except ValueError:
+        await update.message.reply_text(
+            f"{E['info']} **Usage:** `/auditlog [admin:<id>] [action:<type>] [target:<id>] "
+            f"[since:<7d|12h|date>] [until:<7d|12h|date>]`\n\n"
+            f"Example: `/auditlog action:ban_user since:7d`",
+            parse_mode='Markdown'
+        )
+        return
+    
+    audit = {'filters': filters, 'labels': labels, 'page': {}}
+    context.user_data['audit_log'] = audit
+    
+    text, reply_markup = render_audit_page(audit)
+    await update.message.reply_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+
+async def audit_log_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Paging buttons of /auditlog"""
+    query = update.callback_query
+    admin_id = update.effective_user.id
+    
+    if admin_id != Config.OWNER_ID and not db.is_admin(admin_id):
+        await query.answer(f"{E['cross']} Access denied")
+        return
+    
+    audit = context.user_data.get('audit_log')
+    if not audit:
+        await query.answer("Session expired, run /auditlog again")
+        return
+    
+    _, action, value = (query.data.split(':') + [''])[:3]
+    if action == 'older':
+        audit['page'] = {'before': int(value)}
+    elif action == 'newer':
+        audit['page'] = {'after': int(value)}
+    else:
+        audit['page'] = {}
+    await query.answer()
+    
+    text, reply_markup = render_audit_page(audit)
+    try:
+        await query.edit_message_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+    except BadRequest as e:
+        # Only an unchanged page is expected; anything else is a real failure
+        if 'not modified' not in str(e).lower():
+            raise
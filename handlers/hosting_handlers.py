@@ -1,24 +1,46 @@
 import os
-import zipfile
-import tempfile
+import logging
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, ConversationHandler
+from telegram.error import TelegramError
+from telegram.helpers import escape_markdown
 from config import Config
 from database import db
-from utils.decorators import track_user, check_banned
+from utils.decorators import track_user, check_banned, rate_limit
+from utils.view_cache import bots_view_cache
 from utils.code_validator import CodeValidator
 from utils.process_manager import process_manager
+from utils.admission import admission
+from utils.deployer import zip_deployer
+from utils.blob_store import blob_store
+from utils.ingestion import upload_ingestor, UploadRejected
+from utils.upload_notifier import upload_notifier
+from utils.validation_cache import validation_cache
+from utils.validation_pool import validation_pool, PRIORITY_PREMIUM, PRIORITY_FREE
+
+logger = logging.getLogger(__name__)
 
 E = Config.EMOJI
 
 # Conversation states
 WAITING_FOR_FILE, WAITING_FOR_BOT_NAME, WAITING_FOR_MODULE_NAME = range(3)
 
+@rate_limit('command')
 @track_user
 @check_banned
 async def mybots_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show user's hosted bots"""
-    user_id = update.effective_user.id
+    view = render_bots_view(update.effective_user.id)
+    message = await update.message.reply_text(view['text'], parse_mode='Markdown', reply_markup=view['markup'])
+    context.user_data['bots_view_shown'] = (message.message_id, view['version'])
+
+def render_bots_view(user_id: int) -> dict:
+    """Text and keyboard of the /mybots view, served from cache until the user's bots change"""
+    view = bots_view_cache.get(user_id)
+    if view:
+        return view
+    
+    version = bots_view_cache.version(user_id)
     user_bots = db.get_user_bots(user_id)
     
     if not user_bots:
@@ -38,57 +60,54 @@ Or use /host command to start.
         keyboard = [[
             InlineKeyboardButton(f"{E['upload']} Host New Bot", callback_data="host_new_bot")
         ]]
+    else:
+        text = f"{E['robot']} **Your Hosted Bots** ({len(user_bots)})\n\n"
         
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await update.message.reply_text(text, parse_mode='Markdown', reply_markup=reply_markup)
-        return
-    
-    text = f"{E['robot']} **Your Hosted Bots** ({len(user_bots)})\n\n"
-    
-    keyboard = []
-    
-    for i, bot in enumerate(user_bots, 1):
-        status_emoji = {
-            'running': '🟢',
-            'stopped': '🔴',
-            'error': '⚠️'
-        }.get(bot['status'], '⚪')
+        keyboard = []
         
-        text += f"{i}. {status_emoji} **{bot['bot_name']}**\n"
-        text += f"   ├ File: `{bot['file_name']}`\n"
-        text += f"   ├ Type: {bot['file_type'].upper()}\n"
-        text += f"   ├ Status: {bot['status'].title()}\n"
-        text += f"   └ Created: {bot['created_date'][:10]}\n\n"
+        for i, bot in enumerate(user_bots, 1):
+            status_emoji = {
+                'running': '🟢',
+                'stopped': '🔴',
+                'error': '⚠️'
+            }.get(bot['status'], '⚪')
+            
+            text += f"{i}. {status_emoji} **{bot['bot_name']}** (#{bot['bot_id']})\n"
+            text += f"   ├ File: `{bot['file_name']}`\n"
+            text += f"   ├ Type: {bot['file_type'].upper()}\n"
+            text += f"   ├ Status: {bot['status'].title()}\n"
+            text += f"   └ Created: {bot['created_date'][:10]}\n\n"
+            
+            # Add control buttons for each bot
+            keyboard.append([
+                InlineKeyboardButton(
+                    f"{'⏹️ Stop' if bot['status'] == 'running' else '▶️ Start'} #{i}",
+                    callback_data=f"bot_toggle_{bot['bot_id']}"
+                ),
+                InlineKeyboardButton(f"🔄 Restart #{i}", callback_data=f"bot_restart_{bot['bot_id']}"),
+            ])
+            keyboard.append([
+                InlineKeyboardButton(f"📊 Status #{i}", callback_data=f"bot_status_{bot['bot_id']}"),
+                InlineKeyboardButton(f"📝 Logs #{i}", callback_data=f"bot_logs_{bot['bot_id']}"),
+                InlineKeyboardButton(f"🗑️ Delete #{i}", callback_data=f"bot_delete_{bot['bot_id']}")
+            ])
         
-        # Add control buttons for each bot
         keyboard.append([
-            InlineKeyboardButton(
-                f"{'⏹️ Stop' if bot['status'] == 'running' else '▶️ Start'} #{i}",
-                callback_data=f"bot_toggle_{bot['bot_id']}"
-            ),
-            InlineKeyboardButton(f"🔄 Restart #{i}", callback_data=f"bot_restart_{bot['bot_id']}"),
+            InlineKeyboardButton(f"{E['upload']} Host New Bot", callback_data="host_new_bot"),
+            InlineKeyboardButton(f"🔄 Refresh", callback_data="my_bots")
         ])
-        keyboard.append([
-            InlineKeyboardButton(f"📊 Status #{i}", callback_data=f"bot_status_{bot['bot_id']}"),
-            InlineKeyboardButton(f"📝 Logs #{i}", callback_data=f"bot_logs_{bot['bot_id']}"),
-            InlineKeyboardButton(f"🗑️ Delete #{i}", callback_data=f"bot_delete_{bot['bot_id']}")
-        ])
-    
-    keyboard.append([
-        InlineKeyboardButton(f"{E['upload']} Host New Bot", callback_data="host_new_bot"),
-        InlineKeyboardButton(f"🔄 Refresh", callback_data="my_bots")
-    ])
-    
-    reply_markup = InlineKeyboardMarkup(keyboard)
     
-    await update.message.reply_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+    view = {'text': text, 'markup': InlineKeyboardMarkup(keyboard), 'version': version}
+    bots_view_cache.put(user_id, view)
+    return view
 
+@rate_limit('command')
 @track_user
 @check_banned
 async def host_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Start bot hosting conversation"""
     user_id = update.effective_user.id
+    context.user_data.pop('update_bot_id', None)
     user_bots = db.get_user_bots(user_id)
     is_premium = db.is_premium(user_id)
     
@@ -130,6 +149,7 @@ Send your file now or /cancel to abort.
     
     return WAITING_FOR_FILE
 
+@rate_limit('upload')
 async def receive_file(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle received file for hosting"""
     user_id = update.effective_user.id
@@ -145,10 +165,10 @@ async def receive_file(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return WAITING_FOR_FILE
     
-    # Check file size
+    # Check declared file size (enforced again while streaming)
     max_size = Config.MAX_FILE_SIZE_PREMIUM if is_premium else Config.MAX_FILE_SIZE_FREE
     
-    if file.file_size > max_size:
+    if file.file_size and file.file_size > max_size:
         await update.message.reply_text(
             f"{E['cross']} **File Too Large!**\n\n"
             f"Your file: {file.file_size // (1024*1024)}MB\n"
@@ -171,6 +191,19 @@ async def receive_file(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return WAITING_FOR_FILE
     
+    # A new version must be the same kind of file as the one it replaces
+    update_bot_id = context.user_data.get('update_bot_id')
+    if update_bot_id:
+        bot = db.get_bot(update_bot_id)
+        expected_ext = bot['file_name'].split('.')[-1].lower() if bot else None
+        if file_ext != expected_ext:
+            await update.message.reply_text(
+                f"{E['cross']} **Wrong File Type!**\n\n"
+                f"This bot was hosted from a .{expected_ext} file, send a new .{expected_ext} file or /cancel",
+                parse_mode='Markdown'
+            )
+            return WAITING_FOR_FILE
+    
     # Show processing message
     processing_msg = await update.message.reply_text(
         f"{E['gear']} **Processing your file...**\n\n"
@@ -184,25 +217,23 @@ async def receive_file(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # Download file
         file_obj = await context.bot.get_file(file.file_id)
         
-        # Create user directory
-        user_dir = os.path.join(Config.HOSTED_BOTS_DIR, str(user_id))
-        os.makedirs(user_dir, exist_ok=True)
+        # Stream into the blob store: hashed, size-checked and buffered in one pass
+        try:
+            upload = await upload_ingestor.ingest(file_obj, max_size, require_utf8=file_ext != 'zip')
+        except UploadRejected as e:
+            await processing_msg.edit_text(e.message, parse_mode='Markdown')
+            return WAITING_FOR_FILE
         
-        # Save file
-        file_path = os.path.join(user_dir, file_name)
-        await file_obj.download_to_drive(file_path)
+        content_hash, file_path = upload['content_hash'], upload['blob_path']
+        # Lease the blob until the bot is created, so cleanup and other bots' deletes leave it alone
+        db.add_blob(content_hash, upload['size'])
+        context.user_data['blob_lease'] = content_hash
         
-        # Validate code
-        if file_ext == 'zip':
-            # Extract and validate zip
-            validation_result = await validate_zip_file(file_path)
-        else:
-            # Validate single file
-            with open(file_path, 'r', encoding='utf-8') as f:
-                code = f.read()
-            
-            file_type = 'python' if file_ext == 'py' else 'javascript'
-            validation_result = CodeValidator.get_detailed_error_report(code, file_type)
+        # Validate code straight from the buffered bytes
+        result = await validate_upload(upload['data'], file_ext, content_hash, is_premium)
+        validation_result = result.get('report') or CodeValidator.format_report(
+            result['is_valid'], result['errors'], result.get('warnings')
+        )
         
         await processing_msg.edit_text(
             f"{E['check']} **Validation Complete!**\n\n{validation_result}",
@@ -211,6 +242,7 @@ async def receive_file(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         # If validation failed, stop here
         if '❌' in validation_result:
+            release_upload(context)
             # Notify owner about failed upload
             await notify_owner_file_upload(context, update.effective_user, file_name, False, validation_result)
             return ConversationHandler.END
@@ -219,10 +251,16 @@ async def receive_file(update: Update, context: ContextTypes.DEFAULT_TYPE):
         context.user_data['file_info'] = {
             'file_name': file_name,
             'file_path': file_path,
-            'file_type': file_type if file_ext != 'zip' else 'python',
-            'file_size': file.file_size
+            'file_type': result['file_type'],
+            'file_size': upload['size'],
+            'file_id': file.file_id,
+            'content_hash': content_hash,
+            'main_file': result['entry_point']
         }
         
+        if update_bot_id:
+            return await redeploy_bot(update, context, update_bot_id)
+        
         # Ask for bot name
         await update.message.reply_text(
             f"{E['robot']} **Give your bot a name:**\n\n"
@@ -234,45 +272,38 @@ async def receive_file(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         return WAITING_FOR_BOT_NAME
         
-    except Exception as e:
+    except Exception:
+        # Never echo the exception: it can carry file URLs with the bot token
+        logger.exception(f"Processing upload from user {user_id} failed")
+        release_upload(context)
         await processing_msg.edit_text(
-            f"{E['cross']} **Error processing file:**\n\n`{str(e)}`",
+            f"{E['cross']} **Error processing file!**\n\nPlease try again later.",
             parse_mode='Markdown'
         )
         return ConversationHandler.END
 
-async def validate_zip_file(zip_path: str) -> str:
-    """Validate ZIP file contents"""
-    try:
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            # Extract to temp directory
-            temp_dir = tempfile.mkdtemp()
-            zip_ref.extractall(temp_dir)
-            
-            # Find main file (main.py or index.js)
-            main_files = ['main.py', 'bot.py', 'index.js', 'main.js']
-            main_file = None
-            
-            for root, dirs, files in os.walk(temp_dir):
-                for file in files:
-                    if file in main_files:
-                        main_file = os.path.join(root, file)
-                        break
-                if main_file:
-                    break
-            
-            if not main_file:
-                return "❌ **No main file found!**\n\nPlease include main.py or index.js in your ZIP."
-            
-            # Validate main file
-            with open(main_file, 'r', encoding='utf-8') as f:
-                code = f.read()
-            
-            file_type = 'python' if main_file.endswith('.py') else 'javascript'
-            return CodeValidator.get_detailed_error_report(code, file_type)
-            
-    except Exception as e:
-        return f"❌ **Error extracting ZIP:**\n\n`{str(e)}`"
+async def validate_upload(data: bytes, file_ext: str, content_hash: str, is_premium: bool = False) -> dict:
+    """
+    Validate an uploaded file in the worker pool, reusing the cached result for known content
+    Returns: {'is_valid', 'errors', 'imports', 'file_type', 'entry_point'}
+    """
+    file_type = {'py': 'python', 'js': 'javascript'}.get(file_ext)
+    
+    result = validation_cache.get(content_hash)
+    if result and (file_ext == 'zip') == (result['entry_point'] is not None) \
+            and (file_type is None or result['file_type'] == file_type):
+        return result
+    
+    priority = PRIORITY_PREMIUM if is_premium else PRIORITY_FREE
+    if file_ext == 'zip':
+        result = await validation_pool.validate_zip(data, priority)
+    else:
+        result = await validation_pool.validate_source(data, file_type, priority)
+    
+    # Archive problems, timeouts and crashes depend on config and load, don't cache
+    if not result.get('report'):
+        validation_cache.put(content_hash, result)
+    return result
 
 async def receive_bot_name(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Receive bot name and complete hosting"""
@@ -294,7 +325,7 @@ async def receive_bot_name(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return ConversationHandler.END
     
-    # Save to database
+    # Save to database; the upload's blob lease becomes the bot's reference
     user_id = update.effective_user.id
     bot_id = db.add_hosted_bot(
         user_id=user_id,
@@ -302,8 +333,43 @@ async def receive_bot_name(update: Update, context: ContextTypes.DEFAULT_TYPE):
         file_name=file_info['file_name'],
         file_path=file_info['file_path'],
         file_type=file_info['file_type'],
-        file_size=file_info['file_size']
+        file_size=file_info['file_size'],
+        content_hash=file_info['content_hash']
     )
+    context.user_data.pop('blob_lease', None)
+    bot_dir = zip_deployer.bot_dir(user_id, bot_id)
+    blob_cloned = False
+    
+    try:
+        # The blob is gone if the lease ran out while the user was naming the bot
+        if not blob_store.exists(file_info['content_hash']):
+            await reingest_upload(context, file_info, user_id)
+        
+        if file_info.get('main_file'):
+            # Deploy ZIP projects into a versioned release directory
+            success, message, entry_point = zip_deployer.deploy(
+                bot_dir,
+                file_info['file_path'],
+                file_info['main_file'],
+                content_hash=file_info['content_hash']
+            )
+        else:
+            # Single files get their own copy of the blob
+            entry_point, blob_cloned = blob_store.link(
+                file_info['content_hash'],
+                os.path.join(bot_dir, file_info['file_name'])
+            )
+            success = True
+    except (UploadRejected, TelegramError, OSError):
+        logger.exception(f"Setting up bot #{bot_id} failed")
+        success, message = False, f"{E['cross']} **Your upload has expired.**\n\nPlease send it again with /host"
+    
+    if not success:
+        discard_bot(bot_id, bot_dir)
+        context.user_data.clear()
+        await update.message.reply_text(message, parse_mode='Markdown')
+        return ConversationHandler.END
+    db.update_bot_file_path(bot_id, entry_point, blob_cloned)
     
     success_text = f"""
 {E['party']} **Bot Hosted Successfully!** {E['party']}
@@ -348,7 +414,7 @@ Your bot is ready to run! 🚀
         update.effective_user, 
         file_info['file_name'], 
         True,
-        file_path=file_info['file_path']
+        file_id=file_info['file_id']
     )
     
     # Clear context
@@ -356,46 +422,130 @@ Your bot is ready to run! 🚀
     
     return ConversationHandler.END
 
-async def notify_owner_file_upload(context, user, file_name, success, validation_result=None, file_path=None):
-    """Notify owner about file uploads"""
-    status = "✅ Successfully Hosted" if success else "❌ Validation Failed"
+@rate_limit('command')
+@track_user
+@check_banned
+async def update_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Start uploading a new version of a hosted bot"""
+    user_id = update.effective_user.id
+    bot = None
+    if context.args and context.args[0].lstrip('#').isdigit():
+        bot = db.get_bot(int(context.args[0].lstrip('#')))
     
-    notification = f"""
-{E['bell']} **New Bot Upload**
-
-{status}
-
-{E['user']} **User Details:**
-├ ID: `{user.id}`
-├ Name: {user.first_name}
-└ Username: @{user.username or 'No username'}
-
-{E['file']} **File Details:**
-├ Name: `{file_name}`
-└ Status: {status}
+    if not bot or bot['user_id'] != user_id:
+        await update.message.reply_text(
+            f"{E['upload']} **Update a Bot**\n\n"
+            f"Usage: `/update <bot_id>`\n\n"
+            f"The bot ID (#...) is shown next to each bot in /mybots.",
+            parse_mode='Markdown'
+        )
+        return ConversationHandler.END
+    
+    context.user_data['update_bot_id'] = bot['bot_id']
+    await update.message.reply_text(
+        f"{E['upload']} **Update {escape_markdown(bot['bot_name'] or '', version=1)}**\n\n"
+        f"Send the new version (a .{bot['file_name'].split('.')[-1].lower()} file) or /cancel.\n"
+        f"A running bot is restarted on the new version.",
+        parse_mode='Markdown'
+    )
+    return WAITING_FOR_FILE
 
-{validation_result if validation_result and not success else ''}
-    """
+async def redeploy_bot(update: Update, context: ContextTypes.DEFAULT_TYPE, bot_id: int):
+    """Switch an existing bot to the validated upload in file_info"""
+    file_info = context.user_data['file_info']
+    user_id = update.effective_user.id
+    bot = db.get_bot(bot_id)
     
+    if not bot or bot['user_id'] != user_id:
+        release_upload(context)
+        context.user_data.clear()
+        await update.message.reply_text(f"{E['cross']} Bot not found or access denied.")
+        return ConversationHandler.END
+    
+    bot_dir = zip_deployer.bot_dir(user_id, bot_id)
+    blob_cloned = False
     try:
-        await context.bot.send_message(
-            chat_id=Config.OWNER_ID,
-            text=notification,
-            parse_mode='Markdown'
-        )
-        
-        # Send file to owner if successful
-        if success and file_path and os.path.exists(file_path):
-            await context.bot.send_document(
-                chat_id=Config.OWNER_ID,
-                document=open(file_path, 'rb'),
-                caption=f"📦 Uploaded by: {user.first_name} (@{user.username or user.id})"
+        if file_info.get('main_file'):
+            # New release next to the old ones; an unchanged archive is not extracted again
+            success, message, entry_point = zip_deployer.deploy(
+                bot_dir,
+                file_info['file_path'],
+                file_info['main_file'],
+                content_hash=file_info['content_hash']
             )
-    except:
-        pass
+        else:
+            entry_point, blob_cloned = blob_store.link(
+                file_info['content_hash'],
+                os.path.join(bot_dir, file_info['file_name'])
+            )
+            if entry_point != bot['file_path'] and bot['content_hash'] and os.path.exists(bot['file_path']):
+                os.remove(bot['file_path'])
+            success = True
+    except OSError:
+        logger.exception(f"Updating bot #{bot_id} failed")
+        success, message = False, f"{E['cross']} **Update failed!**\n\nPlease try again with /update {bot_id}"
+    
+    if not success:
+        release_upload(context)
+        context.user_data.clear()
+        await update.message.reply_text(message, parse_mode='Markdown')
+        return ConversationHandler.END
+    
+    # The upload's blob lease becomes the bot's reference, the old version's is dropped
+    orphaned_hash = db.update_bot_upload(
+        bot_id, file_info['file_name'], entry_point, file_info['file_size'], file_info['content_hash'],
+        blob_cloned
+    )
+    context.user_data.pop('blob_lease', None)
+    if orphaned_hash:
+        blob_store.remove(orphaned_hash)
+    
+    text = (f"{E['check']} **Bot Updated!**\n\n"
+            f"{E['robot']} Bot: {escape_markdown(bot['bot_name'] or '', version=1)}\n"
+            f"{E['file']} File: `{file_info['file_name']}`")
+    if bot['status'] == 'running':
+        success, message, process_id = process_manager.restart_bot(
+            bot_id, bot['process_id'], entry_point, bot['file_type']
+        )
+        if success:
+            db.update_bot_status(bot_id, 'running', process_id)
+        text += f"\n\n{message}"
+    
+    await update.message.reply_text(text, parse_mode='Markdown')
+    await notify_owner_file_upload(
+        context, update.effective_user, file_info['file_name'], True, file_id=file_info['file_id']
+    )
+    context.user_data.clear()
+    return ConversationHandler.END
+
+async def reingest_upload(context, file_info: dict, user_id: int):
+    """Download an upload again into the blob store. Raises UploadRejected / TelegramError"""
+    max_size = Config.MAX_FILE_SIZE_PREMIUM if db.is_premium(user_id) else Config.MAX_FILE_SIZE_FREE
+    file_obj = await context.bot.get_file(file_info['file_id'])
+    upload = await upload_ingestor.ingest(file_obj, max_size)
+    if upload['content_hash'] != file_info['content_hash']:
+        raise UploadRejected(f"{E['cross']} **Your file changed since it was validated.**")
+
+def release_upload(context):
+    """Drop the blob lease of an upload that will not become a bot"""
+    content_hash = context.user_data.pop('blob_lease', None)
+    if content_hash:
+        db.release_blob(content_hash)
+
+def discard_bot(bot_id: int, bot_dir: str):
+    """Remove a bot that could not be set up, and its blob if nobody else uses it"""
+    zip_deployer.remove(bot_dir)
+    orphaned_hash = db.delete_bot(bot_id)
+    if orphaned_hash:
+        blob_store.remove(orphaned_hash)
+
+async def notify_owner_file_upload(context, user, file_name, success, validation_result=None, file_id=None):
+    """Notify owner about file uploads (instant, digest or off)"""
+    await upload_notifier.notify(user, file_name, success, validation_result, file_id)
 
 async def cancel_hosting(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Cancel hosting conversation"""
+    release_upload(context)
     context.user_data.clear()
     await update.message.reply_text(
         f"{E['cross']} Bot hosting cancelled.",
@@ -403,6 +553,18 @@ async def cancel_hosting(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
     return ConversationHandler.END
 
+async def host_session_timeout(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """The /host conversation waited too long for the file or bot name"""
+    release_upload(context)
+    context.user_data.pop('file_info', None)
+    context.user_data.pop('update_bot_id', None)
+    if update.effective_message:
+        await update.effective_message.reply_text(
+            f"{E['time']} Bot hosting timed out. Use /host to start again.",
+            parse_mode='Markdown'
+        )
+
+@rate_limit('install')
 @track_user
 @check_banned
 async def install_module_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -438,14 +600,27 @@ async def install_module_command(update: Update, context: ContextTypes.DEFAULT_T
     )
 
 # Bot control callbacks
+def bot_callback_cost(update: Update) -> str:
+    """Starting, stopping and deleting touch processes; viewing is cheap"""
+    if update.callback_query.data.startswith(("bot_toggle_", "bot_restart_", "bot_delete_")):
+        return 'bot_action'
+    return 'menu'
+
+@rate_limit(bot_callback_cost)
 async def bot_callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle bot control callbacks"""
     query = update.callback_query
-    await query.answer()
-    
     data = query.data
     user_id = update.effective_user.id
     
+    # Answers the query itself
+    if data == "my_bots":
+        await refresh_bots_view(query, context, user_id)
+        return
+    
+    # Answered once here; the handlers below reply with messages, never query.answer()
+    await query.answer()
+    
     if data.startswith("bot_toggle_"):
         bot_id = int(data.split("_")[2])
         await toggle_bot(query, context, bot_id, user_id)
@@ -466,40 +641,20 @@ async def bot_callback_handler(update: Update, context: ContextTypes.DEFAULT_TYP
         bot_id = int(data.split("_")[2])
         await delete_bot(query, context, bot_id, user_id)
     
-    elif data == "my_bots":
-        # Refresh mybots
-        user_bots = db.get_user_bots(user_id)
-        
-        if not user_bots:
-            text = f"{E['robot']} You have no bots hosted."
-        else:
-            text = f"{E['robot']} **Your Hosted Bots** ({len(user_bots)})\n\n"
-            keyboard = []
-            
-            for i, bot in enumerate(user_bots, 1):
-                status_emoji = {
-                    'running': '🟢',
-                    'stopped': '🔴',
-                    'error': '⚠️'
-                }.get(bot['status'], '⚪')
-                
-                text += f"{i}. {status_emoji} **{bot['bot_name']}**\n"
-                text += f"   └ Status: {bot['status'].title()}\n\n"
-                
-                keyboard.append([
-                    InlineKeyboardButton(
-                        f"{'⏹️ Stop' if bot['status'] == 'running' else '▶️ Start'} #{i}",
-                        callback_data=f"bot_toggle_{bot['bot_id']}"
-                    ),
-                    InlineKeyboardButton(f"📊 Status #{i}", callback_data=f"bot_status_{bot['bot_id']}"),
-                ])
-            
-            keyboard.append([
-                InlineKeyboardButton(f"🔄 Refresh", callback_data="my_bots")
-            ])
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+
+async def refresh_bots_view(query, context, user_id):
+    """Refresh button: edit the message only if the user's bots changed since it was rendered"""
+    view = render_bots_view(user_id)
+    shown = context.user_data.get('bots_view_shown')
+    
+    if shown == (query.message.message_id, view['version']):
+        bots_view_cache.skipped_edits += 1
+        await query.answer("✅ Already up to date")
+        return
+    
+    await query.answer()
+    await query.edit_message_text(view['text'], parse_mode='Markdown', reply_markup=view['markup'])
+    context.user_data['bots_view_shown'] = (query.message.message_id, view['version'])
 
 async def toggle_bot(query, context, bot_id, user_id):
     """Start/Stop bot"""
@@ -515,18 +670,41 @@ async def toggle_bot(query, context, bot_id, user_id):
         if success:
             db.update_bot_status(bot_id, 'stopped')
     else:
-        # Start bot
+        # Start bot (queued while the host is saturated)
+        if await queue_start(query, bot, user_id):
+            return
         success, message, process_id = process_manager.start_bot(
             bot_id, bot['file_path'], bot['file_type']
         )
         if success:
             db.update_bot_status(bot_id, 'running', process_id)
     
-    await query.answer(message)
-    
     # Refresh display
     await query.message.reply_text(message, parse_mode='Markdown')
 
+async def queue_start(query, bot, user_id) -> bool:
+    """Ask admission control to start a bot; True if it was queued (or turned away) instead"""
+    premium = db.is_premium(user_id)
+    position = admission.request(bot['bot_id'], user_id, premium)
+    if position is None:
+        return False
+    
+    if position == 0:
+        message = f"{E['warning']} The host is at capacity and the start queue is full. Please try again later."
+    else:
+        message = (
+            f"{E['time']} **Start Queued**\n\n"
+            f"The host is busy ({admission.saturation() or 'other starts waiting'}).\n"
+            f"{E['robot']} Your bot is **#{position}** in line and starts automatically; "
+            f"you'll get a message when it's running."
+        )
+        if not premium:
+            message += f"\n\n{E['crown']} Premium bots start first."
+    
+    # bot_callback_handler already answered the query; a second answer would fail
+    await query.message.reply_text(message, parse_mode='Markdown')
+    return True
+
 async def restart_bot(query, context, bot_id, user_id):
     """Restart bot"""
     bot = db.get_bot(bot_id)
@@ -535,6 +713,10 @@ async def restart_bot(query, context, bot_id, user_id):
         await query.edit_message_text(f"{E['cross']} Bot not found or access denied.")
         return
     
+    # Restarting a running bot reuses its slot; restarting a stopped one is a new start
+    if bot['status'] != 'running' and await queue_start(query, bot, user_id):
+        return
+    
     success, message, process_id = process_manager.restart_bot(
         bot_id, bot['process_id'], bot['file_path'], bot['file_type']
     )
@@ -542,7 +724,6 @@ async def restart_bot(query, context, bot_id, user_id):
     if success:
         db.update_bot_status(bot_id, 'running', process_id)
     
-    await query.answer(message)
     await query.message.reply_text(message, parse_mode='Markdown')
 
 async def show_bot_status(query, context, bot_id, user_id):
@@ -550,7 +731,7 @@ async def show_bot_status(query, context, bot_id, user_id):
     bot = db.get_bot(bot_id)
     
     if not bot or bot['user_id'] != user_id:
-        await query.answer(f"{E['cross']} Access denied")
+        await query.message.reply_text(f"{E['cross']} Access denied")
         return
     
     status_info = process_manager.get_bot_status(bot_id, bot['process_id'] or 0)
@@ -571,7 +752,6 @@ async def show_bot_status(query, context, bot_id, user_id):
 {'└ Memory: ' + str(round(status_info.get('memory_mb', 0), 2)) + 'MB' if status_info.get('running') else ''}
     """
     
-    await query.answer()
     await query.message.reply_text(status_text, parse_mode='Markdown')
 
 async def show_bot_logs(query, context, bot_id, user_id):
@@ -579,7 +759,7 @@ async def show_bot_logs(query, context, bot_id, user_id):
     bot = db.get_bot(bot_id)
     
     if not bot or bot['user_id'] != user_id:
-        await query.answer(f"{E['cross']} Access denied")
+        await query.message.reply_text(f"{E['cross']} Access denied")
         return
     
     logs = process_manager.get_bot_logs(bot_id)
@@ -594,7 +774,6 @@ async def show_bot_logs(query, context, bot_id, user_id):
 {E['info']} Use /bot_status for real-time status
     """
     
-    await query.answer()
     await query.message.reply_text(logs_text, parse_mode='Markdown')
 
 async def delete_bot(query, context, bot_id, user_id):
@@ -602,24 +781,27 @@ async def delete_bot(query, context, bot_id, user_id):
     bot = db.get_bot(bot_id)
     
     if not bot or bot['user_id'] != user_id:
-        await query.answer(f"{E['cross']} Access denied")
+        await query.message.reply_text(f"{E['cross']} Access denied")
         return
     
     # Stop if running
     if bot['status'] == 'running':
         process_manager.stop_bot(bot_id, bot['process_id'])
+    admission.cancel(bot_id)
     
-    # Delete file
+    # Delete bot directory (blob copy or ZIP releases)
     try:
-        if os.path.exists(bot['file_path']):
+        zip_deployer.remove(zip_deployer.bot_dir(bot['user_id'], bot_id))
+        if not bot['content_hash'] and os.path.exists(bot['file_path']):
             os.remove(bot['file_path'])
     except:
         pass
     
-    # Delete from database
-    db.delete_bot(bot_id)
+    # Delete from database, and the blob once nobody references it
+    orphaned_hash = db.delete_bot(bot_id)
+    if orphaned_hash:
+        blob_store.remove(orphaned_hash)
     
-    await query.answer(f"✅ Bot deleted successfully!")
     await query.message.reply_text(
         f"{E['check']} **Bot Deleted**\n\n"
         f"Bot '{bot['bot_name']}' has been removed.",
@@ -1,12 +1,15 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.helpers import escape_markdown
 from telegram.ext import ContextTypes
 from config import Config
 from database import db
-from utils.decorators import track_user, check_banned
+from utils.decorators import track_user, check_banned, rate_limit
+from utils.outbox import outbox, PRIORITY_NORMAL
 from datetime import datetime
 
 E = Config.EMOJI
 
+@rate_limit('command')
 @track_user
 @check_banned
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -80,27 +83,25 @@ async def notify_owner_new_user(context: ContextTypes.DEFAULT_TYPE, user):
 
 {E['user']} **User Details:**
 ├ ID: `{user.id}`
-├ Name: {user.first_name} {user.last_name or ''}
-├ Username: @{user.username or 'No username'}
+├ Name: {escape_markdown(f"{user.first_name} {user.last_name or ''}", version=1)}
+├ Username: {'@' + escape_markdown(user.username, version=1) if user.username else 'No username'}
 └ Join Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 Total Users: {len(db.get_all_users())}
     """
     
-    try:
-        await context.bot.send_message(
-            chat_id=Config.OWNER_ID,
-            text=notification,
-            parse_mode='Markdown'
-        )
-    except:
-        pass
+    # Queued: a sign-up burst is merged into fewer messages instead of hitting flood limits
+    outbox.send(Config.OWNER_ID, notification, priority=PRIORITY_NORMAL)
 
+@rate_limit('command')
 @track_user
 @check_banned
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show help message"""
-    
+    await send_help(update.message)
+
+async def send_help(message):
+    """Reply with the command guide (shared by /help and the Help button)"""
     help_text = f"""
 {E['info']} **Command List & Guide** {E['info']}
 
@@ -115,6 +116,7 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 {E['upload']} **Hosting:**
 ├ /host - Upload & host a new bot
+├ /update <bot_id> - Upload a new version of a bot
 ├ Send .py or .js file directly
 └ Send .zip archive with multiple files
 
@@ -160,13 +162,18 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 Need help? Contact @shuvohassan00
     """
     
-    await update.message.reply_text(help_text, parse_mode='Markdown')
+    await message.reply_text(help_text, parse_mode='Markdown')
 
+@rate_limit('command')
 @track_user
 @check_banned
 async def profile_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show user profile"""
-    user_id = update.effective_user.id
+    await send_profile(update.message, update.effective_user)
+
+async def send_profile(message, user):
+    """Reply with the user's profile (shared by /profile and the Stats button)"""
+    user_id = user.id
     user_data = db.get_user(user_id)
     user_bots = db.get_user_bots(user_id)
     
@@ -187,7 +194,7 @@ async def profile_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 {E['info']} **Account Information:**
 ├ User ID: `{user_id}`
-├ Username: @{update.effective_user.username or 'Not set'}
+├ Username: @{user.username or 'Not set'}
 ├ Name: {user_data['first_name']} {user_data['last_name'] or ''}
 ├ Status: {'Premium 💎' if is_premium else 'Free'}
 ├ Role: {'Admin 👨‍💼' if is_admin else 'User 👤'}
@@ -220,18 +227,22 @@ async def profile_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     reply_markup = InlineKeyboardMarkup(keyboard)
     
-    await update.message.reply_text(
+    await message.reply_text(
         profile_text,
         parse_mode='Markdown',
         reply_markup=reply_markup
     )
 
+@rate_limit('command')
 @track_user
-@check_banned  
+@check_banned
 async def premium_info_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show premium information"""
-    
-    is_premium = db.is_premium(update.effective_user.id)
+    await send_premium_info(update.message, update.effective_user.id)
+
+async def send_premium_info(message, user_id):
+    """Reply with premium benefits (shared by /premium and the Premium button)"""
+    is_premium = db.is_premium(user_id)
     
     premium_text = f"""
 {E['crown']} **Premium Membership** {E['diamond']}
@@ -267,12 +278,13 @@ Contact the owner: @shuvohassan00
     
     reply_markup = InlineKeyboardMarkup(keyboard)
     
-    await update.message.reply_text(
+    await message.reply_text(
         premium_text,
         parse_mode='Markdown',
         reply_markup=reply_markup
     )
 
+@rate_limit('menu')
 async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle button callbacks"""
     query = update.callback_query
@@ -280,15 +292,13 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     data = query.data
     
+    # The helpers, not the commands: a tap is charged once (as 'menu') and answered once
     if data == "help":
-        await help_command(update, context)
-    elif data == "my_bots":
-        # This will be handled in hosting_handlers.py
-        pass
+        await send_help(query.message)
     elif data == "premium_info":
-        await premium_info_command(update, context)
+        await send_premium_info(query.message, update.effective_user.id)
     elif data == "my_stats":
-        await profile_command(update, context)
+        await send_profile(query.message, update.effective_user)
     elif data == "channels":
         channels_text = f"""
 {E['link']} **Our Official Channels**
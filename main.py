@@ -1,5 +1,6 @@
 import logging
 import asyncio
+import secrets
 from telegram import Update
 from telegram.ext import (
     Application,
@@ -7,11 +8,25 @@ from telegram.ext import (
     MessageHandler,
     CallbackQueryHandler,
     ConversationHandler,
+    TypeHandler,
     filters
 )
 
 from config import Config
-from database import db
+from database import db, create_storage
+from utils.blob_store import blob_store
+from utils.validation_cache import validation_cache
+from utils.validation_pool import validation_pool
+from utils.ingestion import upload_ingestor
+from utils.upload_notifier import upload_notifier
+from utils.broadcaster import broadcaster
+from utils.outbox import outbox, PRIORITY_HIGH, PRIORITY_NORMAL
+from utils.update_processor import update_processor
+from utils.decorators import rate_limiter
+from utils.audit_archive import audit_archive
+from utils.db_backup import db_backup
+from utils.child_watcher import child_watcher
+from utils.admission import admission
 from handlers.user_handlers import (
     start_command,
     help_command,
@@ -25,6 +40,8 @@ from handlers.hosting_handlers import (
     receive_file,
     receive_bot_name,
     cancel_hosting,
+    host_session_timeout,
+    update_command,
     install_module_command,
     bot_callback_handler,
     WAITING_FOR_FILE,
@@ -41,7 +58,18 @@ from handlers.admin_handlers import (
     ban_user_command,
     unban_user_command,
     broadcast_command,
-    stats_admin_command
+    broadcast_status_command,
+    stats_admin_command,
+    disk_usage_command,
+    upload_notify_command,
+    bots_browser_command,
+    bots_browser_callback,
+    find_user_command,
+    find_user_callback,
+    audit_log_command,
+    audit_log_callback,
+    backup_command,
+    restore_command
 )
 
 # Enable logging
@@ -84,28 +112,55 @@ async def post_init(application: Application) -> None:
     
     await application.bot.set_my_commands(commands)
     
+    # Start the outbound message queue
+    outbox.start(application.bot)
+    
+    # Reap hosted bots as they exit
+    child_watcher.start(asyncio.get_running_loop())
+    
+    # Bot starts that were waiting for host capacity before the restart
+    restored = admission.restore()
+    if restored:
+        logger.info(f"Restored {restored} queued bot starts")
+    
     # Send startup notification to owner
-    try:
-        await application.bot.send_message(
-            chat_id=Config.OWNER_ID,
-            text=f"{E['rocket']} **Bot Started Successfully!** {E['rocket']}\n\n"
-                 f"{E['check']} All systems operational\n"
-                 f"{E['gear']} Ready to host bots\n\n"
-                 f"━━━━━━━━━━━━━━━━━━━━\n"
-                 f"Developer: @shuvohassan00",
-            parse_mode='Markdown'
-        )
-    except Exception as e:
-        logger.error(f"Failed to send startup notification: {e}")
+    outbox.send(
+        Config.OWNER_ID,
+        f"{E['rocket']} **Bot Started Successfully!** {E['rocket']}\n\n"
+        f"{E['check']} All systems operational\n"
+        f"{E['gear']} Ready to host bots\n\n"
+        f"━━━━━━━━━━━━━━━━━━━━\n"
+        f"Developer: @shuvohassan00",
+        priority=PRIORITY_NORMAL
+    )
 
-def main():
-    """Start the bot"""
+async def post_shutdown(application: Application) -> None:
+    """Release background resources"""
+    child_watcher.stop()
+    await outbox.stop()
+    validation_pool.shutdown()
+    await upload_ingestor.close()
+
+def build_application(bot=None) -> Application:
+    """
+    The application with every handler and background job registered
+    bot replaces the one built from Config.BOT_TOKEN (benchmarks pass an offline bot)
+    """
+    builder = Application.builder()
+    if bot:
+        builder.bot(bot)
+    else:
+        builder.token(Config.BOT_TOKEN)
     
     # Create application
     application = (
-        Application.builder()
-        .token(Config.BOT_TOKEN)
+        builder
+        # Bounded: when handlers fall behind, intake waits instead of buffering without limit
+        .update_queue(asyncio.Queue(maxsize=Config.UPDATE_QUEUE_SIZE))
+        # Users are served in parallel, each user's updates in order (keeps /host conversations sane)
+        .concurrent_updates(update_processor)
         .post_init(post_init)
+        .post_shutdown(post_shutdown)
         .build()
     )
     
@@ -121,7 +176,7 @@ def main():
     
     # Host bot conversation handler
     host_conversation = ConversationHandler(
-        entry_points=[CommandHandler("host", host_command)],
+        entry_points=[CommandHandler("host", host_command), CommandHandler("update", update_command)],
         states={
             WAITING_FOR_FILE: [
                 MessageHandler(filters.Document.ALL, receive_file)
@@ -129,8 +184,12 @@ def main():
             WAITING_FOR_BOT_NAME: [
                 MessageHandler(filters.TEXT & ~filters.COMMAND, receive_bot_name)
             ],
+            ConversationHandler.TIMEOUT: [
+                TypeHandler(Update, host_session_timeout)
+            ],
         },
         fallbacks=[CommandHandler("cancel", cancel_hosting)],
+        conversation_timeout=Config.HOST_SESSION_TIMEOUT,
     )
     application.add_handler(host_conversation)
     
@@ -162,7 +221,15 @@ def main():
     application.add_handler(CommandHandler("ban", ban_user_command))
     application.add_handler(CommandHandler("unban", unban_user_command))
     application.add_handler(CommandHandler("broadcast", broadcast_command))
+    application.add_handler(CommandHandler("broadcast_status", broadcast_status_command))
     application.add_handler(CommandHandler("stats_admin", stats_admin_command))
+    application.add_handler(CommandHandler("diskusage", disk_usage_command))
+    application.add_handler(CommandHandler("uploadnotify", upload_notify_command))
+    application.add_handler(CommandHandler("bots", bots_browser_command))
+    application.add_handler(CommandHandler("finduser", find_user_command))
+    application.add_handler(CommandHandler("auditlog", audit_log_command))
+    application.add_handler(CommandHandler("backup", backup_command))
+    application.add_handler(CommandHandler("restore", restore_command))
     
     # ========== CALLBACK QUERY HANDLERS ==========
     # Combine all callback handlers
@@ -171,8 +238,17 @@ def main():
         query = update.callback_query
         data = query.data
         
-        # Bot control callbacks
-        if data.startswith("bot_"):
+        # Admin fleet browser
+        if data.startswith("admb:"):
+            await bots_browser_callback(update, context)
+        # Admin user search
+        elif data.startswith("admu:"):
+            await find_user_callback(update, context)
+        # Admin audit log
+        elif data.startswith("adml:"):
+            await audit_log_callback(update, context)
+        # Bot control callbacks (and the /mybots Refresh button)
+        elif data.startswith("bot_") or data == "my_bots":
             await bot_callback_handler(update, context)
         # User menu callbacks
         else:
@@ -196,34 +272,112 @@ def main():
                 if datetime.now() > premium_until:
                     # Remove premium
                     db.remove_premium(user['user_id'])
+                    rate_limiter.reset(user['user_id'])
                     
-                    # Notify user
-                    try:
-                        await context.bot.send_message(
-                            chat_id=user['user_id'],
-                            text=f"{E['info']} **Premium Expired**\n\n"
-                                 f"Your premium membership has expired.\n\n"
-                                 f"You are now on the free plan.\n"
-                                 f"Contact @shuvohassan00 to renew.",
-                            parse_mode='Markdown'
+                    # Notify user (skip users who blocked the bot)
+                    if not user['is_unreachable']:
+                        outbox.send(
+                            user['user_id'],
+                            f"{E['info']} **Premium Expired**\n\n"
+                            f"Your premium membership has expired.\n\n"
+                            f"You are now on the free plan.\n"
+                            f"Contact @shuvohassan00 to renew.",
+                            priority=PRIORITY_HIGH
                         )
-                    except:
-                        pass
                     
                     logger.info(f"Removed expired premium from user {user['user_id']}")
     
+    async def cleanup_unreferenced_blobs(context):
+        """Background task to delete uploads that never became a bot"""
+        for content_hash in db.delete_unreferenced_blobs(Config.UPLOAD_LEASE_HOURS):
+            blob_store.remove(content_hash)
+    
+    async def evict_validation_cache(context):
+        """Background task to keep the validation cache bounded"""
+        removed = validation_cache.evict()
+        if removed:
+            logger.info(f"Evicted {removed} validation cache entries")
+    
+    async def resume_broadcasts(context):
+        """Continue broadcasts interrupted by a restart"""
+        for broadcast in db.get_running_broadcasts():
+            logger.info(f"Resuming broadcast #{broadcast['broadcast_id']}")
+            context.application.create_task(broadcaster.run_job(context.bot, broadcast['broadcast_id']))
+    
+    async def cleanup_rate_limits(context):
+        """Background task to drop idle rate limit buckets"""
+        rate_limiter.cleanup()
+    
+    async def send_upload_digest(context):
+        """Background task to send the owner's upload digest"""
+        await upload_notifier.flush_digest()
+    
+    async def backup_databases(context):
+        """Background task to take a scheduled database snapshot"""
+        if db_backup.lock.locked():
+            return
+        snapshot = await db_backup.create()
+        logger.info(f"Database snapshot {snapshot['name']} taken in {snapshot['seconds']:.1f}s")
+    
+    async def start_queued_bots(context):
+        """Background task to start bots that were queued while the host was saturated"""
+        started = admission.drain()
+        if started:
+            logger.info(f"Started {started} queued bots")
+    
+    async def archive_audit_log(context):
+        """Background task to move old admin log rows into compressed monthly files"""
+        moved = await asyncio.to_thread(audit_archive.archive)
+        if moved:
+            logger.info(f"Archived {moved} admin log entries")
+    
     # Schedule premium check every hour
     job_queue = application.job_queue
     job_queue.run_repeating(check_premium_expiry, interval=3600, first=10)
+    job_queue.run_once(resume_broadcasts, when=5)
+    job_queue.run_repeating(cleanup_unreferenced_blobs, interval=3600, first=60)
+    job_queue.run_repeating(evict_validation_cache, interval=3600, first=120)
+    job_queue.run_repeating(cleanup_rate_limits, interval=Config.RATE_LIMIT_CLEANUP_INTERVAL,
+                            first=Config.RATE_LIMIT_CLEANUP_INTERVAL)
+    job_queue.run_repeating(send_upload_digest, interval=Config.UPLOAD_DIGEST_INTERVAL,
+                            first=Config.UPLOAD_DIGEST_INTERVAL)
+    job_queue.run_repeating(start_queued_bots, interval=Config.ADMISSION_RETRY_INTERVAL,
+                            first=Config.ADMISSION_RETRY_INTERVAL)
+    job_queue.run_repeating(archive_audit_log, interval=Config.AUDIT_ARCHIVE_INTERVAL, first=300)
+    if db_backup.database_paths():
+        job_queue.run_repeating(backup_databases, interval=Config.BACKUP_INTERVAL, first=600)
+    
+    return application
+
+def main():
+    """Start the bot"""
+    db.use(create_storage(Config.STORAGE_BACKEND))
+    application = build_application()
     
     # ========== START BOT ==========
     logger.info("🚀 Bot is starting...")
     logger.info(f"📱 Bot Username: @{application.bot.username}")
     logger.info("✅ All handlers registered")
-    logger.info("🔄 Polling for updates...")
     
     # Run the bot
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    if Config.UPDATE_MODE == "webhook":
+        if not Config.WEBHOOK_URL:
+            logger.error("❌ WEBHOOK_URL must be set for webhook mode")
+            return
+        
+        logger.info(f"🌐 Listening for webhook updates on {Config.WEBHOOK_LISTEN}:{Config.WEBHOOK_PORT}...")
+        application.run_webhook(
+            listen=Config.WEBHOOK_LISTEN,
+            port=Config.WEBHOOK_PORT,
+            url_path=Config.WEBHOOK_PATH,
+            webhook_url=Config.WEBHOOK_URL,
+            secret_token=Config.WEBHOOK_SECRET or secrets.token_urlsafe(32),
+            max_connections=Config.WEBHOOK_MAX_CONNECTIONS,
+            allowed_updates=Update.ALL_TYPES
+        )
+    else:
+        logger.info("🔄 Polling for updates...")
+        application.run_polling(allowed_updates=Update.ALL_TYPES)
 
 if __name__ == '__main__':
     main()
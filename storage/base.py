@@ -0,0 +1,302 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+class StorageBackend(ABC):
+    """
+    Everything the bot stores, behind one interface. Rows come back as
+    mappings (row['user_id'], dict(row)); callers never see connections.
+    A backend only implements the data operations: the derived checks and
+    change notifications below are shared
+    """
+    SEARCH_COLUMNS = ('username', 'first_name', 'last_name')
+
+    def __init__(self):
+        self.bots_listeners = []
+
+    def database_paths(self):
+        """Files holding the data, by name (empty when nothing is on disk)"""
+        return {}
+
+    # Change notifications
+    def add_bots_listener(self, callback):
+        """callback(user_id) runs after any change to that user's hosted bots"""
+        self.bots_listeners.append(callback)
+
+    def _bots_changed(self, user_id):
+        for callback in self.bots_listeners:
+            callback(user_id)
+
+    # User Management
+    @abstractmethod
+    def add_user(self, user_id, username, first_name, last_name):
+        """Insert the user or refresh last_active and names; clears is_unreachable"""
+
+    @abstractmethod
+    def get_user(self, user_id):
+        pass
+
+    def is_premium(self, user_id):
+        user = self.get_user(user_id)
+        if not user or not user['is_premium']:
+            return False
+
+        # Check if premium expired
+        if user['premium_until']:
+            premium_until = datetime.fromisoformat(user['premium_until'])
+            if datetime.now() > premium_until:
+                self.remove_premium(user_id)
+                return False
+
+        return True
+
+    def is_admin(self, user_id):
+        user = self.get_user(user_id)
+        return user and user['is_admin'] == 1
+
+    def is_banned(self, user_id):
+        user = self.get_user(user_id)
+        return user and user['is_banned'] == 1
+
+    @abstractmethod
+    def add_premium(self, user_id, days):
+        pass
+
+    @abstractmethod
+    def remove_premium(self, user_id):
+        pass
+
+    @abstractmethod
+    def add_admin(self, user_id):
+        pass
+
+    @abstractmethod
+    def remove_admin(self, user_id):
+        pass
+
+    @abstractmethod
+    def ban_user(self, user_id):
+        pass
+
+    @abstractmethod
+    def unban_user(self, user_id):
+        pass
+
+    # Bulk admin actions (each logs one admin_logs row per target, atomically)
+    @abstractmethod
+    def get_target_users(self, user_ids=(), ranges=()):
+        """Existing users among the given IDs and inclusive (start, end) ID ranges, by user_id"""
+
+    @abstractmethod
+    def bulk_add_premium(self, user_ids, days, admin_id, details):
+        """details maps user_id to the log text. Returns the new premium_until"""
+
+    @abstractmethod
+    def bulk_remove_premium(self, user_ids, admin_id, details):
+        pass
+
+    @abstractmethod
+    def bulk_set_admin(self, user_ids, is_admin, admin_id, details):
+        pass
+
+    @abstractmethod
+    def bulk_set_banned(self, user_ids, is_banned, admin_id, details):
+        pass
+
+    @abstractmethod
+    def search_users(self, prefix, after=None, limit=10, columns=SEARCH_COLUMNS):
+        """
+        Users whose username or first/last name starts with prefix (ASCII case
+        folded), ordered by the matching name, then user_id. `after` is the
+        (match_key, user_id) of the previous page's last row. Returns up to
+        limit + 1 rows; a user matching on several names can appear once per name
+        """
+
+    @abstractmethod
+    def get_all_admins(self):
+        pass
+
+    @abstractmethod
+    def get_all_premium_users(self):
+        pass
+
+    @abstractmethod
+    def get_all_users(self):
+        pass
+
+    @abstractmethod
+    def get_reachable_user_ids(self):
+        pass
+
+    @abstractmethod
+    def mark_user_unreachable(self, user_id):
+        pass
+
+    # Bot Management
+    @abstractmethod
+    def add_hosted_bot(self, user_id, bot_name, file_name, file_path, file_type, file_size, content_hash=None):
+        """Returns the new bot_id; turns the upload's blob lease into a reference and counts the upload"""
+
+    @abstractmethod
+    def get_user_bots(self, user_id):
+        pass
+
+    @abstractmethod
+    def get_bot(self, bot_id):
+        pass
+
+    @abstractmethod
+    def browse_bots(self, status=None, user_id=None, file_type=None, has_errors=False,
+                    before_id=None, after_id=None, limit=10):
+        """
+        Keyset page of bots, newest first
+        before_id pages towards older bots, after_id back towards newer ones
+        Returns up to limit + 1 rows so the caller can tell whether more exist
+        """
+
+    @abstractmethod
+    def get_running_bot_pids(self, user_id=None, file_type=None, has_errors=False):
+        """bot_id -> process_id for running bots matching the filters"""
+
+    @abstractmethod
+    def get_bots_by_ids(self, bot_ids):
+        pass
+
+    @abstractmethod
+    def update_bot_status(self, bot_id, status, process_id=None):
+        """A process_id also records last_started"""
+
+    @abstractmethod
+    def update_bot_errors(self, bot_id, errors):
+        pass
+
+    @abstractmethod
+    def update_bot_upload(self, bot_id, file_name, file_path, file_size, content_hash, blob_cloned=False):
+        """
+        Point a bot at a new upload: the upload's lease becomes the bot's reference
+        and the old blob's reference is dropped. Returns the old hash if it is now unreferenced
+        blob_cloned records that the bot's file is a reflink sharing the blob's extents
+        """
+
+    @abstractmethod
+    def update_bot_file_path(self, bot_id, file_path, blob_cloned=False):
+        """blob_cloned records that the file is a reflink sharing its blob's extents"""
+
+    @abstractmethod
+    def set_bot_queued(self, bot_id, since=None):
+        """Record when a bot joined the start queue (ISO timestamp), or clear it with None"""
+
+    @abstractmethod
+    def get_queued_bots(self):
+        """bot_id, user_id and queued_since of bots waiting to start, oldest first"""
+
+    @abstractmethod
+    def add_installed_module(self, bot_id, module_name):
+        pass
+
+    @abstractmethod
+    def delete_bot(self, bot_id):
+        """Delete bot and drop its blob reference. Returns the blob hash if it is now unreferenced"""
+
+    # Blob Storage
+    @abstractmethod
+    def add_blob(self, content_hash, size):
+        """Lease a blob for an upload that has no bot yet; refreshes its created_date"""
+
+    @abstractmethod
+    def release_blob(self, content_hash):
+        """Drop an upload's lease (cancelled, timed out or rejected)"""
+
+    @abstractmethod
+    def delete_unreferenced_blobs(self, older_than_hours=1):
+        """
+        Drop blobs no bot references whose last lease is older than older_than_hours
+        (abandoned uploads, leases lost in a restart). Returns their hashes
+        """
+
+    @abstractmethod
+    def get_blob_usage(self):
+        """{'blobs', 'stored_bytes', 'logical_bytes', 'refs', 'cloned_bytes'}; cloned_bytes is the size of bot files that are reflinks"""
+
+    # Admin Logs
+    def add_admin_log(self, admin_id, action_type, target_user_id, details):
+        self.add_admin_logs([(admin_id, action_type, target_user_id, details)])
+
+    @abstractmethod
+    def add_admin_logs(self, entries):
+        """Insert (admin_id, action_type, target_user_id, details) rows in one transaction"""
+
+    @abstractmethod
+    def browse_admin_logs(self, admin_id=None, action_type=None, target_user_id=None,
+                          since=None, until=None, before_id=None, after_id=None, limit=15):
+        """
+        Keyset page of admin log rows, newest first (same paging as browse_bots)
+        since/until are ISO timestamps
+        """
+
+    @abstractmethod
+    def get_admin_logs_before(self, timestamp, limit):
+        """Oldest admin log rows written before timestamp (for archiving)"""
+
+    @abstractmethod
+    def delete_admin_logs(self, log_ids):
+        pass
+
+    # Validation Cache
+    @abstractmethod
+    def get_validation_result(self, content_hash, validator_version):
+        """The cached result (counted as a hit), or None"""
+
+    @abstractmethod
+    def save_validation_result(self, content_hash, validator_version, result):
+        pass
+
+    @abstractmethod
+    def evict_validation_results(self, current_version, max_entries, max_age_days):
+        """Drop stale-version, expired and least recently used results. Returns rows removed"""
+
+    @abstractmethod
+    def get_validation_cache_stats(self):
+        """{'entries', 'total_hits'}"""
+
+    # Broadcasts
+    @abstractmethod
+    def create_broadcast(self, admin_id, message, user_ids, status_chat_id=None, status_message_id=None):
+        """Returns the new broadcast_id"""
+
+    @abstractmethod
+    def get_broadcast(self, broadcast_id):
+        pass
+
+    @abstractmethod
+    def get_recent_broadcasts(self, limit=5):
+        pass
+
+    @abstractmethod
+    def get_running_broadcasts(self):
+        pass
+
+    @abstractmethod
+    def get_pending_recipients(self, broadcast_id):
+        """Recipients still to deliver, skipping users who became unreachable meanwhile"""
+
+    @abstractmethod
+    def record_broadcast_results(self, broadcast_id, results):
+        """results: [(user_id, 'sent' | 'failed' | 'unreachable')], written in one transaction"""
+
+    @abstractmethod
+    def finish_broadcast(self, broadcast_id):
+        pass
+
+    # Settings
+    @abstractmethod
+    def get_setting(self, key, default=None):
+        pass
+
+    @abstractmethod
+    def set_setting(self, key, value):
+        pass
+
+    # Statistics
+    @abstractmethod
+    def get_statistics(self):
+        """{'total_users', 'premium_users', 'active_bots', 'total_bots', 'total_uploads'}"""
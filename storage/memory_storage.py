@@ -0,0 +1,614 @@
+import json
+import heapq
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from functools import wraps
+from storage.base import StorageBackend
+
+# SQLite's NOCASE folds ASCII letters only
+_NOCASE = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+def _fold(text):
+    return text.translate(_NOCASE)
+
+def _locked(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+class MemoryStorage(StorageBackend):
+    """
+    Everything in dicts, nothing on disk: for benchmarks, tests and throwaway
+    runs. Rows are plain dicts (copies, so callers can't change stored data).
+    The lookups the SQLite indexes serve are kept as sorted ID lists, so paging
+    and filtered listings walk an index instead of scanning every row.
+    One lock serializes access, like a single SQLite writer
+    """
+    USER_DEFAULTS = {
+        'is_premium': 0, 'premium_until': None, 'is_admin': 0, 'is_banned': 0,
+        'total_bots': 0, 'total_uploads': 0, 'is_unreachable': 0,
+    }
+    BOT_DEFAULTS = {
+        'process_id': None, 'status': 'stopped', 'last_started': None,
+        'errors': None, 'installed_modules': None, 'blob_cloned': 0, 'queued_since': None,
+    }
+    BOT_INDEXES = ('status', 'user_id', 'file_type')
+    LOG_INDEXES = ('admin_id', 'action_type', 'target_user_id')
+
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.RLock()
+
+        self.users = {}
+        self.user_ids = []                                          # Sorted, for ID ranges
+        self.user_names = {column: [] for column in self.SEARCH_COLUMNS}  # Sorted (folded name, user_id)
+
+        self.bots = {}
+        self.bot_ids = []
+        self.bot_index = {}         # (column, value) -> sorted bot_ids
+        self.bots_with_errors = []
+        self.next_bot_id = 1
+
+        self.admin_logs = {}
+        self.log_ids = []
+        self.log_times = []         # Parallel to log_ids; timestamps grow with log_id
+        self.log_index = {}         # (column, value) -> sorted log_ids
+        self.next_log_id = 1
+
+        self.blobs = {}
+        self.validation_cache = {}
+        self.settings = {}
+        self.broadcasts = {}
+        self.recipients = {}        # broadcast_id -> {user_id: status}
+        self.next_broadcast_id = 1
+
+    # Sorted ID lists
+    @staticmethod
+    def _index_add(ids, item):
+        insort(ids, item)
+
+    @staticmethod
+    def _index_remove(ids, item):
+        position = bisect_left(ids, item)
+        if position < len(ids) and ids[position] == item:
+            del ids[position]
+
+    @staticmethod
+    def _page(ids, before_id, after_id, limit, match):
+        """Walk a sorted ID list like browse_bots' keyset queries; returns matching IDs"""
+        found = []
+        if after_id is not None:
+            for position in range(bisect_right(ids, after_id), len(ids)):
+                if match(ids[position]):
+                    found.append(ids[position])
+                    if len(found) > limit:
+                        break
+            # Keep the extra row (if any) last, as for forward pages
+            return found[:limit][::-1] + found[limit:]
+
+        end = len(ids) if before_id is None else bisect_left(ids, before_id)
+        for position in range(end - 1, -1, -1):
+            if match(ids[position]):
+                found.append(ids[position])
+                if len(found) > limit:
+                    break
+        return found
+
+    # User Management
+    def _set_names(self, user, username, first_name, last_name):
+        for column, value in zip(self.SEARCH_COLUMNS, (username, first_name, last_name)):
+            if user.get(column) is not None:
+                self._index_remove(self.user_names[column], (_fold(user[column]), user['user_id']))
+            user[column] = value
+            if value is not None:
+                self._index_add(self.user_names[column], (_fold(value), user['user_id']))
+
+    @_locked
+    def add_user(self, user_id, username, first_name, last_name):
+        now = datetime.now().isoformat()
+        user = self.users.get(user_id)
+        if user is None:
+            user = {'user_id': user_id, **self.USER_DEFAULTS, 'joined_date': now}
+            self.users[user_id] = user
+            self._index_add(self.user_ids, user_id)
+            self._set_names(user, username, first_name, last_name)
+        elif (user['username'], user['first_name'], user['last_name']) != (username, first_name, last_name):
+            self._set_names(user, username, first_name, last_name)
+
+        # Update last active (a user who talks to us can be reached again)
+        user['last_active'] = now
+        user['is_unreachable'] = 0
+
+    @_locked
+    def get_user(self, user_id):
+        user = self.users.get(user_id)
+        return dict(user) if user else None
+
+    def _update_user(self, user_id, **values):
+        user = self.users.get(user_id)
+        if user:
+            user.update(values)
+
+    @_locked
+    def add_premium(self, user_id, days):
+        premium_until = (datetime.now() + timedelta(days=days)).isoformat()
+        self._update_user(user_id, is_premium=1, premium_until=premium_until)
+
+    @_locked
+    def remove_premium(self, user_id):
+        self._update_user(user_id, is_premium=0, premium_until=None)
+
+    @_locked
+    def add_admin(self, user_id):
+        self._update_user(user_id, is_admin=1)
+
+    @_locked
+    def remove_admin(self, user_id):
+        self._update_user(user_id, is_admin=0)
+
+    @_locked
+    def ban_user(self, user_id):
+        self._update_user(user_id, is_banned=1)
+
+    @_locked
+    def unban_user(self, user_id):
+        self._update_user(user_id, is_banned=0)
+
+    # Bulk admin actions
+    @_locked
+    def get_target_users(self, user_ids=(), ranges=()):
+        found = {user_id for user_id in user_ids if user_id in self.users}
+        for start, end in ranges:
+            found.update(self.user_ids[bisect_left(self.user_ids, start):bisect_right(self.user_ids, end)])
+        return [dict(self.users[user_id]) for user_id in sorted(found)]
+
+    def _bulk_update(self, user_ids, values, admin_id, action_type, details):
+        for user_id in user_ids:
+            self._update_user(user_id, **values)
+        self._add_logs([(admin_id, action_type, user_id, details.get(user_id)) for user_id in user_ids])
+
+    @_locked
+    def bulk_add_premium(self, user_ids, days, admin_id, details):
+        premium_until = (datetime.now() + timedelta(days=days)).isoformat()
+        self._bulk_update(user_ids, {'is_premium': 1, 'premium_until': premium_until},
+                          admin_id, 'add_premium', details)
+        return premium_until
+
+    @_locked
+    def bulk_remove_premium(self, user_ids, admin_id, details):
+        self._bulk_update(user_ids, {'is_premium': 0, 'premium_until': None},
+                          admin_id, 'remove_premium', details)
+
+    @_locked
+    def bulk_set_admin(self, user_ids, is_admin, admin_id, details):
+        self._bulk_update(user_ids, {'is_admin': int(is_admin)}, admin_id,
+                          'add_admin' if is_admin else 'remove_admin', details)
+
+    @_locked
+    def bulk_set_banned(self, user_ids, is_banned, admin_id, details):
+        self._bulk_update(user_ids, {'is_banned': int(is_banned)}, admin_id,
+                          'ban_user' if is_banned else 'unban_user', details)
+
+    def _search_column(self, column, key, after_id, upper):
+        names = self.user_names[column]
+        for position in range(bisect_right(names, (key, after_id)), len(names)):
+            name, user_id = names[position]
+            if name >= upper:
+                return
+            yield name, user_id, column
+
+    @_locked
+    def search_users(self, prefix, after=None, limit=10, columns=StorageBackend.SEARCH_COLUMNS):
+        key, after_id = after or (prefix, -1)
+        matches = heapq.merge(*(self._search_column(column, _fold(key), after_id, _fold(prefix) + '\U0010ffff')
+                                for column in columns))
+        rows = []
+        for _, user_id, column in matches:
+            user = self.users[user_id]
+            rows.append({'match_key': user[column], **user})
+            if len(rows) > limit:
+                break
+        return rows
+
+    @_locked
+    def get_all_admins(self):
+        return [dict(user) for user in self.users.values() if user['is_admin'] == 1]
+
+    @_locked
+    def get_all_premium_users(self):
+        return [dict(user) for user in self.users.values() if user['is_premium'] == 1]
+
+    @_locked
+    def get_all_users(self):
+        return [dict(user) for user in self.users.values()]
+
+    @_locked
+    def get_reachable_user_ids(self):
+        return [user_id for user_id, user in self.users.items() if not user['is_unreachable']]
+
+    @_locked
+    def mark_user_unreachable(self, user_id):
+        self._update_user(user_id, is_unreachable=1)
+
+    # Bot Management
+    def _index_bot(self, bot, add):
+        change = self._index_add if add else self._index_remove
+        for column in self.BOT_INDEXES:
+            change(self.bot_index.setdefault((column, bot[column]), []), bot['bot_id'])
+        if bot['errors']:
+            change(self.bots_with_errors, bot['bot_id'])
+
+    def _update_bot(self, bot_id, **values):
+        """Apply values to a bot, keeping its index entries current. Returns the bot"""
+        bot = self.bots.get(bot_id)
+        if bot:
+            self._index_bot(bot, False)
+            bot.update(values)
+            self._index_bot(bot, True)
+        return bot
+
+    @_locked
+    def add_hosted_bot(self, user_id, bot_name, file_name, file_path, file_type, file_size, content_hash=None):
+        bot_id = self.next_bot_id
+        self.next_bot_id += 1
+        bot = {
+            'bot_id': bot_id, 'user_id': user_id, 'bot_name': bot_name, 'file_name': file_name,
+            'file_path': file_path, 'file_type': file_type, 'file_size': file_size,
+            **self.BOT_DEFAULTS, 'created_date': datetime.now().isoformat(), 'content_hash': content_hash,
+        }
+        self.bots[bot_id] = bot
+        self.bot_ids.append(bot_id)
+        self._index_bot(bot, True)
+
+        if content_hash:
+            self._reference_blob(content_hash, file_size)
+
+        # Update user stats
+        user = self.users.get(user_id)
+        if user:
+            user['total_bots'] += 1
+            user['total_uploads'] += 1
+
+        self._bots_changed(user_id)
+        return bot_id
+
+    @_locked
+    def get_user_bots(self, user_id):
+        return [dict(self.bots[bot_id]) for bot_id in self.bot_index.get(('user_id', user_id), [])]
+
+    @_locked
+    def get_bot(self, bot_id):
+        bot = self.bots.get(bot_id)
+        return dict(bot) if bot else None
+
+    def _bot_candidates(self, status=None, user_id=None, file_type=None, has_errors=False):
+        """The smallest index covering the filters, and a check for the rest"""
+        filters = {column: value for column, value in
+                   zip(self.BOT_INDEXES, (status, user_id, file_type)) if value}
+        indexes = [self.bot_index.get(item, []) for item in filters.items()]
+        if has_errors:
+            indexes.append(self.bots_with_errors)
+        ids = min(indexes, key=len) if indexes else self.bot_ids
+
+        def match(bot_id):
+            bot = self.bots[bot_id]
+            return (all(bot[column] == value for column, value in filters.items())
+                    and (not has_errors or bool(bot['errors'])))
+        return ids, match
+
+    @_locked
+    def browse_bots(self, status=None, user_id=None, file_type=None, has_errors=False,
+                    before_id=None, after_id=None, limit=10):
+        ids, match = self._bot_candidates(status, user_id, file_type, has_errors)
+        return [dict(self.bots[bot_id]) for bot_id in self._page(ids, before_id, after_id, limit, match)]
+
+    @_locked
+    def get_running_bot_pids(self, user_id=None, file_type=None, has_errors=False):
+        ids, match = self._bot_candidates('running', user_id, file_type, has_errors)
+        return {bot_id: self.bots[bot_id]['process_id'] for bot_id in ids if match(bot_id)}
+
+    @_locked
+    def get_bots_by_ids(self, bot_ids):
+        return [dict(self.bots[bot_id]) for bot_id in bot_ids if bot_id in self.bots]
+
+    @_locked
+    def update_bot_status(self, bot_id, status, process_id=None):
+        if process_id:
+            bot = self._update_bot(bot_id, status=status, process_id=process_id,
+                                   last_started=datetime.now().isoformat())
+        else:
+            bot = self._update_bot(bot_id, status=status)
+
+        if bot:
+            self._bots_changed(bot['user_id'])
+
+    @_locked
+    def update_bot_errors(self, bot_id, errors):
+        self._update_bot(bot_id, errors=errors)
+
+    @_locked
+    def update_bot_upload(self, bot_id, file_name, file_path, file_size, content_hash, blob_cloned=False):
+        bot = self.bots.get(bot_id)
+        if not bot:
+            return None
+        old_hash = bot['content_hash']
+        self._update_bot(bot_id, file_name=file_name, file_path=file_path, file_size=file_size,
+                         content_hash=content_hash, blob_cloned=int(blob_cloned))
+
+        self._reference_blob(content_hash, file_size)
+        orphaned_hash = old_hash if self._dereference_blob(old_hash) else None
+
+        user = self.users.get(bot['user_id'])
+        if user:
+            user['total_uploads'] += 1
+
+        self._bots_changed(bot['user_id'])
+        return orphaned_hash
+
+    @_locked
+    def update_bot_file_path(self, bot_id, file_path, blob_cloned=False):
+        self._update_bot(bot_id, file_path=file_path, blob_cloned=int(blob_cloned))
+
+    @_locked
+    def set_bot_queued(self, bot_id, since=None):
+        self._update_bot(bot_id, queued_since=since)
+
+    @_locked
+    def get_queued_bots(self):
+        queued = sorted((bot for bot in self.bots.values() if bot['queued_since']),
+                        key=lambda bot: bot['queued_since'])
+        return [{'bot_id': bot['bot_id'], 'user_id': bot['user_id'], 'queued_since': bot['queued_since']}
+                for bot in queued]
+
+    @_locked
+    def add_installed_module(self, bot_id, module_name):
+        bot = self.bots[bot_id]
+        modules = json.loads(bot['installed_modules']) if bot['installed_modules'] else []
+        if module_name not in modules:
+            modules.append(module_name)
+        bot['installed_modules'] = json.dumps(modules)
+
+    @_locked
+    def delete_bot(self, bot_id):
+        bot = self.bots.pop(bot_id, None)
+        if not bot:
+            return None
+        self._index_bot(bot, False)
+        self._index_remove(self.bot_ids, bot_id)
+
+        orphaned_hash = bot['content_hash'] if self._dereference_blob(bot['content_hash']) else None
+        self._bots_changed(bot['user_id'])
+        return orphaned_hash
+
+    # Blob Storage
+    def _reference_blob(self, content_hash, size):
+        """An upload's lease becomes a bot's reference (the entry is recreated if cleanup dropped it meanwhile)"""
+        blob = self.blobs.setdefault(content_hash, {
+            'content_hash': content_hash, 'size': size, 'ref_count': 0, 'leases': 1,
+            'created_date': datetime.now().isoformat(),
+        })
+        blob['ref_count'] += 1
+        blob['leases'] = max(blob['leases'] - 1, 0)
+
+    def _dereference_blob(self, content_hash):
+        """Drop a bot's reference; True if the blob entry was deleted (nobody uses it any more)"""
+        blob = self.blobs.get(content_hash)
+        if not blob:
+            return False
+        blob['ref_count'] -= 1
+        if blob['ref_count'] <= 0 and blob['leases'] <= 0:
+            del self.blobs[content_hash]
+            return True
+        return False
+
+    @_locked
+    def add_blob(self, content_hash, size):
+        blob = self.blobs.setdefault(content_hash, {
+            'content_hash': content_hash, 'size': size, 'ref_count': 0, 'leases': 0,
+        })
+        blob['leases'] += 1
+        blob['created_date'] = datetime.now().isoformat()
+
+    @_locked
+    def release_blob(self, content_hash):
+        blob = self.blobs.get(content_hash)
+        if blob:
+            blob['leases'] = max(blob['leases'] - 1, 0)
+
+    @_locked
+    def delete_unreferenced_blobs(self, older_than_hours=1):
+        cutoff = (datetime.now() - timedelta(hours=older_than_hours)).isoformat()
+        hashes = [content_hash for content_hash, blob in self.blobs.items()
+                  if blob['ref_count'] <= 0 and blob['created_date'] < cutoff]
+        for content_hash in hashes:
+            del self.blobs[content_hash]
+        return hashes
+
+    @_locked
+    def get_blob_usage(self):
+        blobs = self.blobs.values()
+        return {
+            'blobs': len(self.blobs),
+            'stored_bytes': sum(blob['size'] for blob in blobs),
+            'logical_bytes': sum(blob['size'] * blob['ref_count'] for blob in blobs),
+            'refs': sum(blob['ref_count'] for blob in blobs),
+            'cloned_bytes': sum(bot['file_size'] for bot in self.bots.values() if bot['blob_cloned']),
+        }
+
+    # Admin Logs
+    def _add_logs(self, entries):
+        now = datetime.now().isoformat()
+        for admin_id, action_type, target_user_id, details in entries:
+            log_id = self.next_log_id
+            self.next_log_id += 1
+            row = {'log_id': log_id, 'admin_id': admin_id, 'action_type': action_type,
+                   'target_user_id': target_user_id, 'details': details, 'timestamp': now}
+            self.admin_logs[log_id] = row
+            self.log_ids.append(log_id)
+            self.log_times.append(now)
+            for column in self.LOG_INDEXES:
+                self.log_index.setdefault((column, row[column]), []).append(log_id)
+
+    @_locked
+    def add_admin_logs(self, entries):
+        self._add_logs(entries)
+
+    @_locked
+    def browse_admin_logs(self, admin_id=None, action_type=None, target_user_id=None,
+                          since=None, until=None, before_id=None, after_id=None, limit=15):
+        filters = {column: value for column, value in
+                   zip(self.LOG_INDEXES, (admin_id, action_type, target_user_id)) if value}
+        indexes = [self.log_index.get(item, []) for item in filters.items()]
+        ids = min(indexes, key=len) if indexes else self.log_ids
+
+        # Time bounds become log_id bounds, as in SQL
+        low = high = None
+        if since:
+            position = bisect_left(self.log_times, since)
+            low = self.log_ids[position] if position < len(self.log_ids) else None
+            if low is None:
+                return []
+        if until:
+            position = bisect_left(self.log_times, until)
+            high = self.log_ids[position] if position < len(self.log_ids) else None
+
+        def match(log_id):
+            row = self.admin_logs[log_id]
+            return (all(row[column] == value for column, value in filters.items())
+                    and (low is None or log_id >= low) and (high is None or log_id < high))
+        return [dict(self.admin_logs[log_id]) for log_id in self._page(ids, before_id, after_id, limit, match)]
+
+    @_locked
+    def get_admin_logs_before(self, timestamp, limit):
+        end = min(bisect_left(self.log_times, timestamp), limit)
+        return [dict(self.admin_logs[log_id]) for log_id in self.log_ids[:end]]
+
+    @_locked
+    def delete_admin_logs(self, log_ids):
+        for log_id in log_ids:
+            row = self.admin_logs.pop(log_id, None)
+            if not row:
+                continue
+            position = bisect_left(self.log_ids, log_id)
+            del self.log_ids[position]
+            del self.log_times[position]
+            for column in self.LOG_INDEXES:
+                self._index_remove(self.log_index[(column, row[column])], log_id)
+
+    # Validation Cache
+    @_locked
+    def get_validation_result(self, content_hash, validator_version):
+        entry = self.validation_cache.get((content_hash, validator_version))
+        if not entry:
+            return None
+        entry['hits'] += 1
+        entry['last_used'] = datetime.now().isoformat()
+        return json.loads(entry['result'])
+
+    @_locked
+    def save_validation_result(self, content_hash, validator_version, result):
+        now = datetime.now().isoformat()
+        self.validation_cache[(content_hash, validator_version)] = {
+            'result': json.dumps(result), 'created_date': now, 'last_used': now, 'hits': 0,
+        }
+
+    @_locked
+    def evict_validation_results(self, current_version, max_entries, max_age_days):
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+        removed = [key for key, entry in self.validation_cache.items()
+                   if key[1] != current_version or entry['last_used'] < cutoff]
+        for key in removed:
+            del self.validation_cache[key]
+
+        by_use = sorted(self.validation_cache, key=lambda key: self.validation_cache[key]['last_used'], reverse=True)
+        for key in by_use[max_entries:]:
+            del self.validation_cache[key]
+        return len(removed) + len(by_use[max_entries:])
+
+    @_locked
+    def get_validation_cache_stats(self):
+        return {
+            'entries': len(self.validation_cache),
+            'total_hits': sum(entry['hits'] for entry in self.validation_cache.values()),
+        }
+
+    # Broadcasts
+    @_locked
+    def create_broadcast(self, admin_id, message, user_ids, status_chat_id=None, status_message_id=None):
+        broadcast_id = self.next_broadcast_id
+        self.next_broadcast_id += 1
+        self.broadcasts[broadcast_id] = {
+            'broadcast_id': broadcast_id, 'admin_id': admin_id, 'message': message, 'status': 'running',
+            'total': len(user_ids), 'sent': 0, 'failed': 0, 'unreachable': 0,
+            'status_chat_id': status_chat_id, 'status_message_id': status_message_id,
+            'created_date': datetime.now().isoformat(), 'completed_date': None,
+        }
+        self.recipients[broadcast_id] = dict.fromkeys(user_ids, 'pending')
+        return broadcast_id
+
+    @_locked
+    def get_broadcast(self, broadcast_id):
+        broadcast = self.broadcasts.get(broadcast_id)
+        return dict(broadcast) if broadcast else None
+
+    @_locked
+    def get_recent_broadcasts(self, limit=5):
+        return [dict(self.broadcasts[broadcast_id]) for broadcast_id in sorted(self.broadcasts, reverse=True)[:limit]]
+
+    @_locked
+    def get_running_broadcasts(self):
+        return [dict(broadcast) for broadcast in self.broadcasts.values() if broadcast['status'] == 'running']
+
+    @_locked
+    def get_pending_recipients(self, broadcast_id):
+        return [user_id for user_id, status in self.recipients.get(broadcast_id, {}).items()
+                if status == 'pending' and user_id in self.users and not self.users[user_id]['is_unreachable']]
+
+    @_locked
+    def record_broadcast_results(self, broadcast_id, results):
+        if not results:
+            return
+        broadcast = self.broadcasts[broadcast_id]
+        recipients = self.recipients[broadcast_id]
+        for user_id, outcome in results:
+            if user_id in recipients:
+                recipients[user_id] = outcome
+            if outcome == 'unreachable':
+                self._update_user(user_id, is_unreachable=1)
+            broadcast[outcome] += 1
+
+    @_locked
+    def finish_broadcast(self, broadcast_id):
+        recipients = self.recipients.get(broadcast_id, {})
+        # Recipients skipped because they became unreachable elsewhere
+        skipped = [user_id for user_id, status in recipients.items() if status == 'pending']
+        for user_id in skipped:
+            recipients[user_id] = 'skipped'
+        broadcast = self.broadcasts.get(broadcast_id)
+        if broadcast:
+            broadcast.update(status='completed', completed_date=datetime.now().isoformat(),
+                             unreachable=broadcast['unreachable'] + len(skipped))
+
+    # Settings
+    @_locked
+    def get_setting(self, key, default=None):
+        return self.settings.get(key, default)
+
+    @_locked
+    def set_setting(self, key, value):
+        self.settings[key] = value
+
+    # Statistics
+    @_locked
+    def get_statistics(self):
+        users = self.users.values()
+        return {
+            'total_users': len(self.users),
+            'premium_users': sum(1 for user in users if user['is_premium'] == 1),
+            'active_bots': len(self.bot_index.get(('status', 'running'), [])),
+            'total_bots': len(self.bots),
+            'total_uploads': sum(user['total_uploads'] for user in users),
+        }
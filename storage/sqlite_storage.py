@@ -0,0 +1,958 @@
+import sqlite3
+import json
+from datetime import datetime, timedelta
+from contextlib import contextmanager
+from config import Config
+from storage.base import StorageBackend
+
+class SQLiteStorage(StorageBackend):
+    """
+    Two SQLite files: the state DB (users, bots, jobs) takes small random
+    updates on every request; the history DB (admin_logs, statistics) is
+    append-only. Separate files keep audit writes off the state DB's write lock
+    """
+    HISTORY_TABLES = ('admin_logs', 'statistics')
+    
+    # Per-connection settings; both files use WAL (set once, it persists)
+    STATE_PRAGMAS = (
+        'PRAGMA synchronous = NORMAL',   # WAL: a crash can lose the last commits, never corrupt
+        'PRAGMA cache_size = -16000',    # 16MB: users/bots pages are read over and over
+        'PRAGMA temp_store = MEMORY',
+    )
+    HISTORY_PRAGMAS = (
+        'PRAGMA synchronous = NORMAL',
+        'PRAGMA cache_size = -2000',     # Appends and occasional range reads
+        'PRAGMA wal_autocheckpoint = 4000',  # Fewer, larger checkpoints for append-only writes
+    )
+    
+    def __init__(self, db_path=None, history_path=None):
+        super().__init__()
+        self.db_path = db_path or Config.DATABASE_PATH
+        self.history_path = history_path or Config.HISTORY_DATABASE_PATH
+        self.init_database()
+        self.init_history_database()
+        self.move_history_tables()
+    
+    @staticmethod
+    def _connect(path, pragmas):
+        conn = sqlite3.connect(path)
+        conn.row_factory = sqlite3.Row
+        for pragma in pragmas:
+            conn.execute(pragma)
+        return conn
+    
+    @contextmanager
+    def _transaction(self, conn):
+        try:
+            yield conn
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
+    
+    def get_connection(self, attach_history=False):
+        """
+        State DB connection; attach_history also attaches the history DB as
+        `history`, for the few writes that must land in both together
+        """
+        conn = self._connect(self.db_path, self.STATE_PRAGMAS)
+        if attach_history:
+            conn.execute('ATTACH DATABASE ? AS history', (self.history_path,))
+            for pragma in self.HISTORY_PRAGMAS:
+                conn.execute(pragma.replace('PRAGMA ', 'PRAGMA history.'))
+        return self._transaction(conn)
+    
+    def get_history_connection(self):
+        return self._transaction(self._connect(self.history_path, self.HISTORY_PRAGMAS))
+    
+    def init_database(self):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('PRAGMA journal_mode = WAL')
+            
+            # Users table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS users (
+                    user_id INTEGER PRIMARY KEY,
+                    username TEXT,
+                    first_name TEXT,
+                    last_name TEXT,
+                    is_premium INTEGER DEFAULT 0,
+                    premium_until TEXT,
+                    is_admin INTEGER DEFAULT 0,
+                    is_banned INTEGER DEFAULT 0,
+                    joined_date TEXT,
+                    last_active TEXT,
+                    total_bots INTEGER DEFAULT 0,
+                    total_uploads INTEGER DEFAULT 0
+                )
+            ''')
+            
+            # Hosted bots table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS hosted_bots (
+                    bot_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER,
+                    bot_name TEXT,
+                    file_name TEXT,
+                    file_path TEXT,
+                    file_type TEXT,
+                    file_size INTEGER,
+                    process_id INTEGER,
+                    status TEXT DEFAULT 'stopped',
+                    created_date TEXT,
+                    last_started TEXT,
+                    errors TEXT,
+                    installed_modules TEXT,
+                    FOREIGN KEY (user_id) REFERENCES users (user_id)
+                )
+            ''')
+            
+            # Content-addressed upload blobs
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS blobs (
+                    content_hash TEXT PRIMARY KEY,
+                    size INTEGER,
+                    ref_count INTEGER DEFAULT 0,
+                    leases INTEGER DEFAULT 0,
+                    created_date TEXT
+                )
+            ''')
+            
+            # Validation results keyed by upload content
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS validation_cache (
+                    content_hash TEXT,
+                    validator_version INTEGER,
+                    result TEXT,
+                    created_date TEXT,
+                    last_used TEXT,
+                    hits INTEGER DEFAULT 0,
+                    PRIMARY KEY (content_hash, validator_version)
+                )
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_validation_cache_last_used
+                ON validation_cache (last_used)
+            ''')
+            
+            # Owner/bot settings
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS settings (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+            ''')
+            
+            # Broadcast jobs and per-recipient delivery state (for resuming)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS broadcasts (
+                    broadcast_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    admin_id INTEGER,
+                    message TEXT,
+                    status TEXT DEFAULT 'running',
+                    total INTEGER DEFAULT 0,
+                    sent INTEGER DEFAULT 0,
+                    failed INTEGER DEFAULT 0,
+                    unreachable INTEGER DEFAULT 0,
+                    status_chat_id INTEGER,
+                    status_message_id INTEGER,
+                    created_date TEXT,
+                    completed_date TEXT
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS broadcast_recipients (
+                    broadcast_id INTEGER,
+                    user_id INTEGER,
+                    status TEXT DEFAULT 'pending',
+                    PRIMARY KEY (broadcast_id, user_id)
+                )
+            ''')
+            
+            # Columns added after the first release
+            self._add_column(cursor, 'hosted_bots', 'content_hash', 'TEXT')
+            self._add_column(cursor, 'hosted_bots', 'blob_cloned', 'INTEGER DEFAULT 0')
+            self._add_column(cursor, 'hosted_bots', 'queued_since', 'TIMESTAMP')
+            self._add_column(cursor, 'users', 'is_unreachable', 'INTEGER DEFAULT 0')
+            self._add_column(cursor, 'blobs', 'leases', 'INTEGER DEFAULT 0')
+            
+            # Fleet browser (keyset pagination by bot_id under each filter)
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_hosted_bots_status ON hosted_bots (status, bot_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_hosted_bots_user ON hosted_bots (user_id, bot_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_hosted_bots_type ON hosted_bots (file_type, bot_id)')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_hosted_bots_errors ON hosted_bots (bot_id)
+                WHERE errors IS NOT NULL AND errors != ''
+            ''')
+            
+            # User search (case-insensitive prefix ranges, keyset pages by user_id)
+            for column in self.SEARCH_COLUMNS:
+                cursor.execute(f'''
+                    CREATE INDEX IF NOT EXISTS idx_users_{column}_nocase
+                    ON users ({column} COLLATE NOCASE, user_id)
+                ''')
+    
+    def init_history_database(self):
+        with self.get_history_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('PRAGMA journal_mode = WAL')
+            
+            # Admin actions log
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS admin_logs (
+                    log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    admin_id INTEGER,
+                    action_type TEXT,
+                    target_user_id INTEGER,
+                    details TEXT,
+                    timestamp TEXT
+                )
+            ''')
+            
+            # Statistics table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS statistics (
+                    stat_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    stat_date TEXT,
+                    total_users INTEGER,
+                    active_bots INTEGER,
+                    total_uploads INTEGER,
+                    premium_users INTEGER
+                )
+            ''')
+            
+            # Audit log (keyset pagination by log_id under each filter, retention by timestamp)
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_admin_logs_admin ON admin_logs (admin_id, log_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_admin_logs_action ON admin_logs (action_type, log_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_admin_logs_target ON admin_logs (target_user_id, log_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_admin_logs_timestamp ON admin_logs (timestamp)')
+    
+    def move_history_tables(self):
+        """
+        Move history tables left in the state DB by older versions
+        The copy and the drop commit per file, not together, so a crash can
+        leave rows in both; rows already copied are skipped on the next run
+        """
+        with self.get_connection(attach_history=True) as conn:
+            cursor = conn.cursor()
+            for table in self.HISTORY_TABLES:
+                cursor.execute("SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,))
+                if cursor.fetchone():
+                    cursor.execute(f'INSERT OR IGNORE INTO history.{table} SELECT * FROM main.{table}')
+                    cursor.execute(f'DROP TABLE main.{table}')
+    
+    @staticmethod
+    def _add_column(cursor, table, column, definition):
+        cursor.execute(f'PRAGMA table_info({table})')
+        if column not in [row['name'] for row in cursor.fetchall()]:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+    
+    def database_paths(self):
+        return {'state': self.db_path, 'history': self.history_path}
+    
+    # User Management
+    def add_user(self, user_id, username, first_name, last_name):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR IGNORE INTO users 
+                (user_id, username, first_name, last_name, joined_date, last_active)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (user_id, username, first_name, last_name, 
+                  datetime.now().isoformat(), datetime.now().isoformat()))
+            
+            # Update last active (a user who talks to us can be reached again)
+            cursor.execute('''
+                UPDATE users SET last_active = ?, is_unreachable = 0 WHERE user_id = ?
+            ''', (datetime.now().isoformat(), user_id))
+            
+            # Keep names current for /finduser (only touches the indexes on a change)
+            cursor.execute('''
+                UPDATE users SET username = ?, first_name = ?, last_name = ?
+                WHERE user_id = ? AND (username IS NOT ? OR first_name IS NOT ? OR last_name IS NOT ?)
+            ''', (username, first_name, last_name, user_id, username, first_name, last_name))
+    
+    def get_user(self, user_id):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM users WHERE user_id = ?', (user_id,))
+            return cursor.fetchone()
+    
+    def add_premium(self, user_id, days):
+        premium_until = (datetime.now() + timedelta(days=days)).isoformat()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE users 
+                SET is_premium = 1, premium_until = ?
+                WHERE user_id = ?
+            ''', (premium_until, user_id))
+    
+    def remove_premium(self, user_id):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE users 
+                SET is_premium = 0, premium_until = NULL
+                WHERE user_id = ?
+            ''', (user_id,))
+    
+    def add_admin(self, user_id):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE users SET is_admin = 1 WHERE user_id = ?
+            ''', (user_id,))
+    
+    def remove_admin(self, user_id):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE users SET is_admin = 0 WHERE user_id = ?
+            ''', (user_id,))
+    
+    def ban_user(self, user_id):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE users SET is_banned = 1 WHERE user_id = ?
+            ''', (user_id,))
+    
+    def unban_user(self, user_id):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE users SET is_banned = 0 WHERE user_id = ?
+            ''', (user_id,))
+    
+    # Bulk admin actions
+    def get_target_users(self, user_ids=(), ranges=()):
+        """Existing users among the given IDs and inclusive (start, end) ID ranges"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('CREATE TEMP TABLE target_ids (user_id INTEGER PRIMARY KEY)')
+            cursor.executemany('INSERT OR IGNORE INTO target_ids VALUES (?)',
+                               [(user_id,) for user_id in user_ids])
+            for start, end in ranges:
+                cursor.execute('''
+                    INSERT OR IGNORE INTO target_ids
+                    SELECT user_id FROM users WHERE user_id BETWEEN ? AND ?
+                ''', (start, end))
+            cursor.execute('''
+                SELECT users.* FROM users JOIN target_ids USING (user_id)
+                ORDER BY users.user_id
+            ''')
+            return cursor.fetchall()
+
+    def _bulk_update(self, sql, rows, admin_id, action_type, details):
+        """Run one UPDATE per row and log each target, all in a single transaction
+
+        Each row's last parameter is the target user_id; details maps user_id to
+        the admin log text. The log rows go to the attached history DB (with WAL,
+        the commit is atomic per file).
+        """
+        now = datetime.now().isoformat()
+        with self.get_connection(attach_history=True) as conn:
+            cursor = conn.cursor()
+            cursor.executemany(sql, rows)
+            cursor.executemany('''
+                INSERT INTO history.admin_logs
+                (admin_id, action_type, target_user_id, details, timestamp)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(admin_id, action_type, row[-1], details.get(row[-1]), now) for row in rows])
+
+    def bulk_add_premium(self, user_ids, days, admin_id, details):
+        premium_until = (datetime.now() + timedelta(days=days)).isoformat()
+        self._bulk_update('''
+            UPDATE users SET is_premium = 1, premium_until = ? WHERE user_id = ?
+        ''', [(premium_until, user_id) for user_id in user_ids], admin_id, 'add_premium', details)
+        return premium_until
+
+    def bulk_remove_premium(self, user_ids, admin_id, details):
+        self._bulk_update('''
+            UPDATE users SET is_premium = 0, premium_until = NULL WHERE user_id = ?
+        ''', [(user_id,) for user_id in user_ids], admin_id, 'remove_premium', details)
+
+    def bulk_set_admin(self, user_ids, is_admin, admin_id, details):
+        self._bulk_update('''
+            UPDATE users SET is_admin = ? WHERE user_id = ?
+        ''', [(int(is_admin), user_id) for user_id in user_ids], admin_id,
+            'add_admin' if is_admin else 'remove_admin', details)
+
+    def bulk_set_banned(self, user_ids, is_banned, admin_id, details):
+        self._bulk_update('''
+            UPDATE users SET is_banned = ? WHERE user_id = ?
+        ''', [(int(is_banned), user_id) for user_id in user_ids], admin_id,
+            'ban_user' if is_banned else 'unban_user', details)
+
+    def search_users(self, prefix, after=None, limit=10, columns=StorageBackend.SEARCH_COLUMNS):
+        key, after_id = after or (prefix, -1)
+        # Ties on the name seek by user_id, the rest is one range per index
+        arms = [f'''
+            SELECT {column} AS match_key, * FROM users
+            WHERE {column} = :key COLLATE NOCASE AND user_id > :after_id
+            UNION ALL
+            SELECT {column} AS match_key, * FROM users
+            WHERE {column} > :key COLLATE NOCASE AND {column} < :upper COLLATE NOCASE
+        ''' for column in columns]
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                ' UNION ALL '.join(arms) + ' ORDER BY match_key COLLATE NOCASE, user_id LIMIT :limit',
+                {'key': key, 'after_id': after_id, 'upper': prefix + '\U0010ffff', 'limit': limit + 1}
+            )
+            return cursor.fetchall()
+    
+    def get_all_admins(self):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM users WHERE is_admin = 1')
+            return cursor.fetchall()
+    
+    def get_all_premium_users(self):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM users WHERE is_premium = 1')
+            return cursor.fetchall()
+    
+    def get_all_users(self):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM users')
+            return cursor.fetchall()
+    
+    def get_reachable_user_ids(self):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT user_id FROM users WHERE is_unreachable = 0')
+            return [row['user_id'] for row in cursor.fetchall()]
+    
+    def mark_user_unreachable(self, user_id):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('UPDATE users SET is_unreachable = 1 WHERE user_id = ?', (user_id,))
+    
+    # Bot Management
+    def add_hosted_bot(self, user_id, bot_name, file_name, file_path, file_type, file_size, content_hash=None):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO hosted_bots 
+                (user_id, bot_name, file_name, file_path, file_type, file_size, created_date, content_hash)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (user_id, bot_name, file_name, file_path, file_type, file_size, 
+                  datetime.now().isoformat(), content_hash))
+            bot_id = cursor.lastrowid
+            
+            if content_hash:
+                self._reference_blob(cursor, content_hash, file_size)
+            
+            # Update user stats
+            cursor.execute('''
+                UPDATE users 
+                SET total_bots = total_bots + 1, total_uploads = total_uploads + 1
+                WHERE user_id = ?
+            ''', (user_id,))
+        
+        self._bots_changed(user_id)
+        return bot_id
+    
+    def get_user_bots(self, user_id):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT * FROM hosted_bots WHERE user_id = ?
+            ''', (user_id,))
+            return cursor.fetchall()
+    
+    def get_bot(self, bot_id):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM hosted_bots WHERE bot_id = ?', (bot_id,))
+            return cursor.fetchone()
+    
+    @staticmethod
+    def _bot_filters(status=None, user_id=None, file_type=None, has_errors=False):
+        conditions, params = [], []
+        if status:
+            conditions.append('status = ?')
+            params.append(status)
+        if user_id:
+            conditions.append('user_id = ?')
+            params.append(user_id)
+        if file_type:
+            conditions.append('file_type = ?')
+            params.append(file_type)
+        if has_errors:
+            conditions.append("errors IS NOT NULL AND errors != ''")
+        return conditions, params
+    
+    def browse_bots(self, status=None, user_id=None, file_type=None, has_errors=False,
+                    before_id=None, after_id=None, limit=10):
+        conditions, params = self._bot_filters(status, user_id, file_type, has_errors)
+        order = 'DESC'
+        if after_id is not None:
+            conditions.append('bot_id > ?')
+            params.append(after_id)
+            order = 'ASC'
+        elif before_id is not None:
+            conditions.append('bot_id < ?')
+            params.append(before_id)
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT bot_id, user_id, bot_name, file_type, status, process_id, errors
+                FROM hosted_bots {where}
+                ORDER BY bot_id {order} LIMIT ?
+            ''', (*params, limit + 1))
+            rows = cursor.fetchall()
+        
+        if order == 'ASC':
+            # Keep the extra row (if any) last, as for forward pages
+            rows = rows[:limit][::-1] + rows[limit:]
+        return rows
+    
+    def get_running_bot_pids(self, user_id=None, file_type=None, has_errors=False):
+        conditions, params = self._bot_filters('running', user_id, file_type, has_errors)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT bot_id, process_id FROM hosted_bots WHERE {' AND '.join(conditions)}
+            ''', params)
+            return {row['bot_id']: row['process_id'] for row in cursor.fetchall()}
+    
+    def get_bots_by_ids(self, bot_ids):
+        if not bot_ids:
+            return []
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT bot_id, user_id, bot_name, file_type, status, process_id, errors
+                FROM hosted_bots WHERE bot_id IN ({','.join('?' * len(bot_ids))})
+            ''', list(bot_ids))
+            return cursor.fetchall()
+    
+    def update_bot_status(self, bot_id, status, process_id=None):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if process_id:
+                cursor.execute('''
+                    UPDATE hosted_bots 
+                    SET status = ?, process_id = ?, last_started = ?
+                    WHERE bot_id = ?
+                ''', (status, process_id, datetime.now().isoformat(), bot_id))
+            else:
+                cursor.execute('''
+                    UPDATE hosted_bots SET status = ? WHERE bot_id = ?
+                ''', (status, bot_id))
+            
+            cursor.execute('SELECT user_id FROM hosted_bots WHERE bot_id = ?', (bot_id,))
+            row = cursor.fetchone()
+        
+        if row:
+            self._bots_changed(row['user_id'])
+    
+    def update_bot_errors(self, bot_id, errors):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE hosted_bots SET errors = ? WHERE bot_id = ?
+            ''', (errors, bot_id))
+    
+    def update_bot_upload(self, bot_id, file_name, file_path, file_size, content_hash, blob_cloned=False):
+        orphaned_hash = None
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT user_id, content_hash FROM hosted_bots WHERE bot_id = ?', (bot_id,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            cursor.execute('''
+                UPDATE hosted_bots
+                SET file_name = ?, file_path = ?, file_size = ?, content_hash = ?, blob_cloned = ?
+                WHERE bot_id = ?
+            ''', (file_name, file_path, file_size, content_hash, int(blob_cloned), bot_id))
+            
+            self._reference_blob(cursor, content_hash, file_size)
+            if row['content_hash'] and self._dereference_blob(cursor, row['content_hash']):
+                orphaned_hash = row['content_hash']
+            
+            cursor.execute('''
+                UPDATE users SET total_uploads = total_uploads + 1 WHERE user_id = ?
+            ''', (row['user_id'],))
+        
+        self._bots_changed(row['user_id'])
+        return orphaned_hash
+    
+    def update_bot_file_path(self, bot_id, file_path, blob_cloned=False):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE hosted_bots SET file_path = ?, blob_cloned = ? WHERE bot_id = ?
+            ''', (file_path, int(blob_cloned), bot_id))
+    
+    def set_bot_queued(self, bot_id, since=None):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE hosted_bots SET queued_since = ? WHERE bot_id = ?
+            ''', (since, bot_id))
+    
+    def get_queued_bots(self):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT bot_id, user_id, queued_since FROM hosted_bots
+                WHERE queued_since IS NOT NULL ORDER BY queued_since
+            ''')
+            return cursor.fetchall()
+    
+    def add_installed_module(self, bot_id, module_name):
+        bot = self.get_bot(bot_id)
+        modules = json.loads(bot['installed_modules']) if bot['installed_modules'] else []
+        if module_name not in modules:
+            modules.append(module_name)
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE hosted_bots SET installed_modules = ? WHERE bot_id = ?
+            ''', (json.dumps(modules), bot_id))
+    
+    def delete_bot(self, bot_id):
+        orphaned_hash = None
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT user_id, content_hash FROM hosted_bots WHERE bot_id = ?', (bot_id,))
+            row = cursor.fetchone()
+            cursor.execute('DELETE FROM hosted_bots WHERE bot_id = ?', (bot_id,))
+            
+            if row and row['content_hash'] and self._dereference_blob(cursor, row['content_hash']):
+                orphaned_hash = row['content_hash']
+        
+        if row:
+            self._bots_changed(row['user_id'])
+        return orphaned_hash
+    
+    # Blob Storage
+    @staticmethod
+    def _reference_blob(cursor, content_hash, size):
+        """An upload's lease becomes a bot's reference (the row is recreated if cleanup dropped it meanwhile)"""
+        cursor.execute('''
+            INSERT OR IGNORE INTO blobs (content_hash, size, ref_count, leases, created_date)
+            VALUES (?, ?, 0, 1, ?)
+        ''', (content_hash, size, datetime.now().isoformat()))
+        cursor.execute('''
+            UPDATE blobs SET ref_count = ref_count + 1, leases = MAX(leases - 1, 0)
+            WHERE content_hash = ?
+        ''', (content_hash,))
+    
+    @staticmethod
+    def _dereference_blob(cursor, content_hash):
+        """Drop a bot's reference; True if the blob row was deleted (nobody uses it any more)"""
+        cursor.execute('''
+            UPDATE blobs SET ref_count = ref_count - 1 WHERE content_hash = ?
+        ''', (content_hash,))
+        cursor.execute('''
+            DELETE FROM blobs WHERE content_hash = ? AND ref_count <= 0 AND leases <= 0
+        ''', (content_hash,))
+        return cursor.rowcount > 0
+    
+    def add_blob(self, content_hash, size):
+        now = datetime.now().isoformat()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR IGNORE INTO blobs (content_hash, size, ref_count, leases, created_date)
+                VALUES (?, ?, 0, 0, ?)
+            ''', (content_hash, size, now))
+            cursor.execute('''
+                UPDATE blobs SET leases = leases + 1, created_date = ? WHERE content_hash = ?
+            ''', (now, content_hash))
+    
+    def release_blob(self, content_hash):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE blobs SET leases = MAX(leases - 1, 0) WHERE content_hash = ?
+            ''', (content_hash,))
+    
+    def delete_unreferenced_blobs(self, older_than_hours=1):
+        cutoff = (datetime.now() - timedelta(hours=older_than_hours)).isoformat()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT content_hash FROM blobs WHERE ref_count <= 0 AND created_date < ?
+            ''', (cutoff,))
+            hashes = [row['content_hash'] for row in cursor.fetchall()]
+            cursor.executemany('DELETE FROM blobs WHERE content_hash = ?', [(h,) for h in hashes])
+            return hashes
+    
+    def get_blob_usage(self):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT COUNT(*) as blobs,
+                       COALESCE(SUM(size), 0) as stored_bytes,
+                       COALESCE(SUM(size * ref_count), 0) as logical_bytes,
+                       COALESCE(SUM(ref_count), 0) as refs
+                FROM blobs
+            ''')
+            usage = dict(cursor.fetchone())
+            cursor.execute('''
+                SELECT COALESCE(SUM(file_size), 0) FROM hosted_bots WHERE blob_cloned = 1
+            ''')
+            usage['cloned_bytes'] = cursor.fetchone()[0]
+            return usage
+    
+    # Admin Logs
+    def add_admin_logs(self, entries):
+        now = datetime.now().isoformat()
+        with self.get_history_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT INTO admin_logs 
+                (admin_id, action_type, target_user_id, details, timestamp)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(*entry, now) for entry in entries])
+    
+    def browse_admin_logs(self, admin_id=None, action_type=None, target_user_id=None,
+                          since=None, until=None, before_id=None, after_id=None, limit=15):
+        """since/until become log_id bounds through the timestamp index, since log_ids grow with time"""
+        conditions, params = [], []
+        if admin_id:
+            conditions.append('admin_id = ?')
+            params.append(admin_id)
+        if action_type:
+            conditions.append('action_type = ?')
+            params.append(action_type)
+        if target_user_id:
+            conditions.append('target_user_id = ?')
+            params.append(target_user_id)
+        if since:
+            conditions.append('''log_id >= (
+                SELECT log_id FROM admin_logs WHERE timestamp >= ? ORDER BY timestamp LIMIT 1
+            )''')
+            params.append(since)
+        if until:
+            conditions.append('''log_id < COALESCE((
+                SELECT log_id FROM admin_logs WHERE timestamp >= ? ORDER BY timestamp LIMIT 1
+            ), 9223372036854775807)''')
+            params.append(until)
+        
+        order = 'DESC'
+        if after_id is not None:
+            conditions.append('log_id > ?')
+            params.append(after_id)
+            order = 'ASC'
+        elif before_id is not None:
+            conditions.append('log_id < ?')
+            params.append(before_id)
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        with self.get_history_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT * FROM admin_logs {where}
+                ORDER BY log_id {order} LIMIT ?
+            ''', (*params, limit + 1))
+            rows = cursor.fetchall()
+        
+        if order == 'ASC':
+            rows = rows[:limit][::-1] + rows[limit:]
+        return rows
+    
+    def get_admin_logs_before(self, timestamp, limit):
+        with self.get_history_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT * FROM admin_logs WHERE timestamp < ?
+                ORDER BY timestamp LIMIT ?
+            ''', (timestamp, limit))
+            return cursor.fetchall()
+    
+    def delete_admin_logs(self, log_ids):
+        with self.get_history_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('DELETE FROM admin_logs WHERE log_id = ?', [(log_id,) for log_id in log_ids])
+    
+    # Validation Cache
+    def get_validation_result(self, content_hash, validator_version):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT result FROM validation_cache
+                WHERE content_hash = ? AND validator_version = ?
+            ''', (content_hash, validator_version))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            
+            cursor.execute('''
+                UPDATE validation_cache SET hits = hits + 1, last_used = ?
+                WHERE content_hash = ? AND validator_version = ?
+            ''', (datetime.now().isoformat(), content_hash, validator_version))
+            return json.loads(row['result'])
+    
+    def save_validation_result(self, content_hash, validator_version, result):
+        now = datetime.now().isoformat()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO validation_cache
+                (content_hash, validator_version, result, created_date, last_used, hits)
+                VALUES (?, ?, ?, ?, ?, 0)
+            ''', (content_hash, validator_version, json.dumps(result), now, now))
+    
+    def evict_validation_results(self, current_version, max_entries, max_age_days):
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                DELETE FROM validation_cache WHERE validator_version != ? OR last_used < ?
+            ''', (current_version, cutoff))
+            removed = cursor.rowcount
+            
+            cursor.execute('''
+                DELETE FROM validation_cache WHERE rowid IN (
+                    SELECT rowid FROM validation_cache
+                    ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            ''', (max_entries,))
+            return removed + cursor.rowcount
+    
+    def get_validation_cache_stats(self):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT COUNT(*) as entries, COALESCE(SUM(hits), 0) as total_hits
+                FROM validation_cache
+            ''')
+            return dict(cursor.fetchone())
+    
+    # Broadcasts
+    def create_broadcast(self, admin_id, message, user_ids, status_chat_id=None, status_message_id=None):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO broadcasts
+                (admin_id, message, total, status_chat_id, status_message_id, created_date)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (admin_id, message, len(user_ids), status_chat_id, status_message_id,
+                  datetime.now().isoformat()))
+            broadcast_id = cursor.lastrowid
+            cursor.executemany('''
+                INSERT OR IGNORE INTO broadcast_recipients (broadcast_id, user_id) VALUES (?, ?)
+            ''', [(broadcast_id, user_id) for user_id in user_ids])
+            return broadcast_id
+    
+    def get_broadcast(self, broadcast_id):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM broadcasts WHERE broadcast_id = ?', (broadcast_id,))
+            return cursor.fetchone()
+    
+    def get_recent_broadcasts(self, limit=5):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM broadcasts ORDER BY broadcast_id DESC LIMIT ?', (limit,))
+            return cursor.fetchall()
+    
+    def get_running_broadcasts(self):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM broadcasts WHERE status = 'running'")
+            return cursor.fetchall()
+    
+    def get_pending_recipients(self, broadcast_id):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT r.user_id FROM broadcast_recipients r
+                JOIN users u ON u.user_id = r.user_id
+                WHERE r.broadcast_id = ? AND r.status = 'pending' AND u.is_unreachable = 0
+            ''', (broadcast_id,))
+            return [row['user_id'] for row in cursor.fetchall()]
+    
+    def record_broadcast_results(self, broadcast_id, results):
+        if not results:
+            return
+        counts = {'sent': 0, 'failed': 0, 'unreachable': 0}
+        for _, outcome in results:
+            counts[outcome] += 1
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                UPDATE broadcast_recipients SET status = ? WHERE broadcast_id = ? AND user_id = ?
+            ''', [(outcome, broadcast_id, user_id) for user_id, outcome in results])
+            cursor.executemany('''
+                UPDATE users SET is_unreachable = 1 WHERE user_id = ?
+            ''', [(user_id,) for user_id, outcome in results if outcome == 'unreachable'])
+            cursor.execute('''
+                UPDATE broadcasts SET sent = sent + ?, failed = failed + ?, unreachable = unreachable + ?
+                WHERE broadcast_id = ?
+            ''', (counts['sent'], counts['failed'], counts['unreachable'], broadcast_id))
+    
+    def finish_broadcast(self, broadcast_id):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            # Recipients skipped because they became unreachable elsewhere
+            cursor.execute('''
+                UPDATE broadcast_recipients SET status = 'skipped'
+                WHERE broadcast_id = ? AND status = 'pending'
+            ''', (broadcast_id,))
+            cursor.execute('''
+                UPDATE broadcasts SET status = 'completed', completed_date = ?,
+                       unreachable = unreachable + ?
+                WHERE broadcast_id = ?
+            ''', (datetime.now().isoformat(), cursor.rowcount, broadcast_id))
+    
+    # Settings
+    def get_setting(self, key, default=None):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT value FROM settings WHERE key = ?', (key,))
+            row = cursor.fetchone()
+            return row['value'] if row else default
+    
+    def set_setting(self, key, value):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)
+            ''', (key, value))
+    
+    # Statistics
+    def get_statistics(self):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('SELECT COUNT(*) as total FROM users')
+            total_users = cursor.fetchone()['total']
+            
+            cursor.execute('SELECT COUNT(*) as total FROM users WHERE is_premium = 1')
+            premium_users = cursor.fetchone()['total']
+            
+            cursor.execute("SELECT COUNT(*) as total FROM hosted_bots WHERE status = 'running'")
+            active_bots = cursor.fetchone()['total']
+            
+            cursor.execute('SELECT COUNT(*) as total FROM hosted_bots')
+            total_bots = cursor.fetchone()['total']
+            
+            cursor.execute('SELECT SUM(total_uploads) as total FROM users')
+            total_uploads = cursor.fetchone()['total'] or 0
+            
+            return {
+                'total_users': total_users,
+                'premium_users': premium_users,
+                'active_bots': active_bots,
+                'total_bots': total_bots,
+                'total_uploads': total_uploads
+            }
@@ -0,0 +1,185 @@
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Dict, Optional
+import psutil
+from telegram.helpers import escape_markdown
+from config import Config
+from database import db
+from utils.outbox import outbox, PRIORITY_HIGH
+from utils.process_manager import process_manager
+
+E = Config.EMOJI
+
+class AdmissionController:
+    """Holds bot starts back while the host is saturated
+
+    A start is admitted when the running bot count, host CPU and memory are
+    all under their limits (CPU/memory sampled at most every
+    ADMISSION_SAMPLE_INTERVAL, and at most ADMISSION_MAX_BURST starts per
+    sample, since a new bot's load only shows up later). Otherwise it waits in
+    a queue: premium users' starts before free users', and within each tier
+    users take turns, one start each, so a user queuing many bots can't hold
+    everyone else back. drain() starts queued bots as capacity frees up.
+    Queued starts are recorded on the bot (queued_since) so restore() can
+    pick them up again after a restart.
+    """
+
+    def __init__(self):
+        self.queues = {True: OrderedDict(), False: OrderedDict()}  # premium -> {user_id: deque of bot_ids}, in turn order
+        self.queued: Dict[int, Dict] = {}  # bot_id -> {'user_id', 'premium', 'since'}
+        self.sample = {'cpu_percent': 0.0, 'memory_percent': 0.0}
+        self.sample_time = 0.0
+        self.started_since_sample = 0
+        self.metrics = {'admitted': 0, 'enqueued': 0, 'started_from_queue': 0, 'rejected': 0}
+        psutil.cpu_percent(interval=None)  # Baseline for the first sample
+
+    def host_load(self) -> Dict:
+        now = time.monotonic()
+        if now - self.sample_time >= Config.ADMISSION_SAMPLE_INTERVAL:
+            self.sample = {
+                'cpu_percent': psutil.cpu_percent(interval=None),
+                'memory_percent': psutil.virtual_memory().percent
+            }
+            self.sample_time = now
+            self.started_since_sample = 0
+        return self.sample
+
+    def saturation(self) -> Optional[str]:
+        """Why the host can't take another bot right now, or None"""
+        running = len(db.get_running_bot_pids())
+        if running >= Config.ADMISSION_MAX_RUNNING_BOTS:
+            return f"{running} bots running"
+        load = self.host_load()
+        if load['cpu_percent'] >= Config.ADMISSION_MAX_CPU_PERCENT:
+            return f"CPU at {load['cpu_percent']:.0f}%"
+        if load['memory_percent'] >= Config.ADMISSION_MAX_MEMORY_PERCENT:
+            return f"memory at {load['memory_percent']:.0f}%"
+        if self.started_since_sample >= Config.ADMISSION_MAX_BURST:
+            return "many bots just started"
+        return None
+
+    def request(self, bot_id: int, user_id: int, premium: bool) -> Optional[int]:
+        """
+        Ask to start a bot. Returns None when it may start now (the caller
+        starts it), else its 1-based queue position (0 if the queue is full)
+        """
+        if bot_id in self.queued:
+            return self.position(bot_id)
+
+        # Nobody jumps a non-empty queue; drain() decides who goes next
+        if not self.queued and not self.saturation():
+            self.started_since_sample += 1
+            self.metrics['admitted'] += 1
+            return None
+
+        if len(self.queued) >= Config.ADMISSION_MAX_QUEUE:
+            self.metrics['rejected'] += 1
+            return 0
+
+        since = datetime.now()
+        self._enqueue(bot_id, user_id, premium, since)
+        db.set_bot_queued(bot_id, since.isoformat())
+        self.metrics['enqueued'] += 1
+        return self.position(bot_id)
+
+    def _enqueue(self, bot_id: int, user_id: int, premium: bool, since: datetime):
+        self.queues[premium].setdefault(user_id, deque()).append(bot_id)
+        self.queued[bot_id] = {'user_id': user_id, 'premium': premium, 'since': since}
+
+    def restore(self) -> int:
+        """Re-queue starts that were still waiting when the process stopped; returns how many"""
+        restored = 0
+        for bot in db.get_queued_bots():
+            if bot['bot_id'] in self.queued:
+                continue
+            self._enqueue(bot['bot_id'], bot['user_id'], db.is_premium(bot['user_id']),
+                          datetime.fromisoformat(bot['queued_since']))
+            restored += 1
+        return restored
+
+    def position(self, bot_id: int) -> Optional[int]:
+        """1-based place in start order, or None if the bot isn't queued"""
+        entry = self.queued.get(bot_id)
+        if not entry:
+            return None
+
+        ahead = 0
+        if not entry['premium']:
+            ahead = sum(len(bots) for bots in self.queues[True].values())
+
+        # Turns within the tier: round r starts the r-th bot of every user, in turn order
+        users = self.queues[entry['premium']]
+        index = users[entry['user_id']].index(bot_id)
+        before_user = True
+        for user_id, bots in users.items():
+            ahead += min(len(bots), index)
+            if user_id == entry['user_id']:
+                before_user = False
+            elif before_user and len(bots) > index:
+                ahead += 1
+        return ahead + 1
+
+    def cancel(self, bot_id: int):
+        entry = self.queued.pop(bot_id, None)
+        if not entry:
+            return
+        db.set_bot_queued(bot_id, None)
+        users = self.queues[entry['premium']]
+        users[entry['user_id']].remove(bot_id)
+        if not users[entry['user_id']]:
+            del users[entry['user_id']]
+
+    def _next(self) -> Optional[int]:
+        """Pop the next bot to start: premium first, one per user per turn"""
+        for premium in (True, False):
+            users = self.queues[premium]
+            if users:
+                user_id, bots = next(iter(users.items()))
+                bot_id = bots.popleft()
+                if bots:
+                    users.move_to_end(user_id)
+                else:
+                    del users[user_id]
+                return bot_id
+        return None
+
+    def drain(self) -> int:
+        """Start queued bots while the host has room; returns how many started"""
+        started = 0
+        while self.queued and not self.saturation():
+            bot_id = self._next()
+            entry = self.queued.pop(bot_id)
+            db.set_bot_queued(bot_id, None)
+            bot = db.get_bot(bot_id)
+            if not bot or bot['status'] == 'running':
+                # Deleted or started some other way meanwhile
+                continue
+
+            self.started_since_sample += 1
+            success, message, process_id = process_manager.start_bot(bot_id, bot['file_path'], bot['file_type'])
+            waited = int((datetime.now() - entry['since']).total_seconds())
+            if success:
+                db.update_bot_status(bot_id, 'running', process_id)
+                started += 1
+                self.metrics['started_from_queue'] += 1
+                text = (f"{E['rocket']} **Your bot started**\n\n"
+                        f"{E['robot']} Bot: {escape_markdown(bot['bot_name'] or '', version=1)}\n"
+                        f"{E['time']} Waited {waited // 60}m {waited % 60}s for host capacity")
+            else:
+                text = (f"{E['cross']} **Your queued bot could not start**\n\n"
+                        f"{E['robot']} Bot: {escape_markdown(bot['bot_name'] or '', version=1)}\n\n"
+                        f"{message}")
+            outbox.send(entry['user_id'], text, priority=PRIORITY_HIGH)
+        return started
+
+    def get_stats(self) -> Dict:
+        return {
+            'queued': len(self.queued),
+            'queued_premium': sum(len(bots) for bots in self.queues[True].values()),
+            **self.host_load(),
+            **self.metrics
+        }
+
+# Global bot start admission
+admission = AdmissionController()
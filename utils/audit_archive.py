@@ -0,0 +1,63 @@
+import os
+import gzip
+import json
+from datetime import datetime, timedelta
+from config import Config
+from database import db
+
+class AuditArchive:
+    """Moves admin log rows past the retention window into monthly archives
+
+    Rows go to <archive_dir>/admin_logs-YYYY-MM.jsonl.gz (one JSON object per
+    line, appended as extra gzip members) and are deleted from the database
+    only after the file has been synced. Every row keeps its log_id, so a batch
+    re-archived after a crash can be told apart.
+    """
+
+    def __init__(self, archive_dir: str = Config.AUDIT_ARCHIVE_DIR,
+                 retention_days: int = Config.AUDIT_LOG_RETENTION_DAYS,
+                 batch_size: int = Config.AUDIT_ARCHIVE_BATCH):
+        self.archive_dir = archive_dir
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        os.makedirs(archive_dir, exist_ok=True)
+
+    def month_path(self, month: str) -> str:
+        return os.path.join(self.archive_dir, f"admin_logs-{month}.jsonl.gz")
+
+    def _append(self, month: str, rows: list):
+        with open(self.month_path(month), 'ab') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='ab') as archive:
+                for row in rows:
+                    archive.write((json.dumps(dict(row), ensure_ascii=False) + "\n").encode('utf-8'))
+            raw.flush()
+            os.fsync(raw.fileno())
+
+    def archive(self) -> int:
+        """Archive everything older than the retention window; returns rows moved"""
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).isoformat()
+        moved = 0
+
+        while True:
+            rows = db.get_admin_logs_before(cutoff, self.batch_size)
+            if not rows:
+                return moved
+
+            months = {}
+            for row in rows:
+                months.setdefault(row['timestamp'][:7], []).append(row)
+            for month, month_rows in months.items():
+                self._append(month, month_rows)
+
+            db.delete_admin_logs([row['log_id'] for row in rows])
+            moved += len(rows)
+
+    def get_stats(self) -> dict:
+        files = [name for name in os.listdir(self.archive_dir) if name.endswith('.jsonl.gz')]
+        return {
+            'files': len(files),
+            'size': sum(os.path.getsize(os.path.join(self.archive_dir, name)) for name in files)
+        }
+
+# Global audit log archive
+audit_archive = AuditArchive()
@@ -0,0 +1,119 @@
+import os
+import stat
+import fcntl
+import shutil
+from config import Config
+
+# ioctl that makes dst share src's extents copy-on-write (btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+class BlobStore:
+    """Content-addressed storage for uploaded files
+
+    Every distinct upload is stored once at <blobs_dir>/<sha[:2]>/<sha>.
+    Bots get their own copy, so a bot rewriting its script never changes the
+    blob or other bots' files. On reflink-capable filesystems (btrfs, XFS) that
+    copy shares the blob's extents and costs no space; elsewhere it is a full
+    copy and there is no dedup for single-file bots. Reference counts, upload
+    leases and which bot files are reflinks live in the database.
+    """
+
+    def __init__(self, blobs_dir: str = Config.BLOBS_DIR):
+        self.blobs_dir = blobs_dir
+        self.tmp_dir = os.path.join(blobs_dir, 'tmp')
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def blob_path(self, content_hash: str) -> str:
+        return os.path.join(self.blobs_dir, content_hash[:2], content_hash)
+
+    def exists(self, content_hash: str) -> bool:
+        return os.path.exists(self.blob_path(content_hash))
+
+    def new_temp_path(self) -> str:
+        return os.path.join(self.tmp_dir, f"upload_{os.getpid()}_{os.urandom(8).hex()}")
+
+    def commit(self, temp_path: str, content_hash: str) -> str:
+        """
+        Move a fully written temp file into the store
+        If the content already exists the temp file is dropped
+        Returns: blob path
+        """
+        path = self.blob_path(content_hash)
+
+        if os.path.exists(path):
+            os.remove(temp_path)
+            return path
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Blobs are shared, nobody may modify them in place
+        os.chmod(temp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        os.replace(temp_path, path)
+        return path
+
+    @staticmethod
+    def _clone(src_path: str, dst_path: str) -> bool:
+        """Copy a file as a reflink where supported, else byte for byte. Returns True for a reflink"""
+        with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return True
+            except OSError:
+                shutil.copyfileobj(src, dst)
+                return False
+
+    def link(self, content_hash: str, target_path: str) -> tuple[str, bool]:
+        """
+        Give a bot directory its own copy of a blob
+        Returns: (target_path, whether the copy is a reflink sharing the blob's space)
+        Raises FileNotFoundError if the blob is gone
+        """
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        if os.path.lexists(target_path):
+            os.remove(target_path)
+
+        return target_path, self._clone(self.blob_path(content_hash), target_path)
+
+    @staticmethod
+    def unshare(path: str):
+        """Replace a file that is still hardlinked to a blob (bots hosted before copies) with its own copy"""
+        try:
+            if os.stat(path).st_nlink < 2:
+                return
+        except FileNotFoundError:
+            return
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        BlobStore._clone(path, tmp_path)
+        os.replace(tmp_path, path)
+
+    def remove(self, content_hash: str):
+        """Delete a blob that is no longer referenced"""
+        try:
+            os.remove(self.blob_path(content_hash))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def directory_usage(path: str, seen: set) -> int:
+        """
+        Bytes of the files under path, counting each inode once across calls
+        sharing `seen` (bots hosted before copies still hardlink their blob).
+        Reflinks look like full files here; subtract their size separately
+        """
+        total = 0
+        for root, dirs, files in os.walk(path):
+            for name in files:
+                try:
+                    info = os.lstat(os.path.join(root, name))
+                except OSError:
+                    continue
+                if stat.S_ISREG(info.st_mode) and (info.st_dev, info.st_ino) not in seen:
+                    seen.add((info.st_dev, info.st_ino))
+                    total += info.st_size
+        return total
+
+    def disk_usage(self, seen: set = None) -> int:
+        """Physical bytes used by the store"""
+        return self.directory_usage(self.blobs_dir, set() if seen is None else seen)
+
+# Global blob store
+blob_store = BlobStore()
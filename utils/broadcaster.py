@@ -0,0 +1,177 @@
+import time
+import asyncio
+from typing import List, Dict, Optional, Callable, Awaitable
+from telegram.error import RetryAfter, Forbidden, BadRequest, TimedOut, NetworkError
+from config import Config
+from database import db
+from utils.outbox import TokenBucket, outbox, retry_after_seconds
+
+E = Config.EMOJI
+
+class Broadcaster:
+    """Send one message to many chats with N concurrent senders under a shared rate limit
+
+    RetryAfter pauses every sender for the requested time and requeues the chat;
+    network errors are retried a few times; Forbidden and "chat not found" mark
+    the chat unreachable, other BadRequests count as failed.
+    """
+
+    def __init__(self, rate: float = Config.BROADCAST_RATE,
+                 concurrency: int = Config.BROADCAST_CONCURRENCY,
+                 max_retries: int = Config.BROADCAST_MAX_RETRIES,
+                 progress_interval: float = Config.BROADCAST_PROGRESS_INTERVAL):
+        self.rate = rate
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.progress_interval = progress_interval
+        self.active = set()
+
+    async def send(self, bot, chat_ids: List[int], text: str, parse_mode: Optional[str] = 'Markdown',
+                   on_progress: Optional[Callable[[Dict], Awaitable]] = None,
+                   on_result: Optional[Callable[[int, str], None]] = None) -> Dict:
+        """
+        Deliver text to every chat
+        on_progress(stats) is awaited at most once per progress_interval
+        on_result(chat_id, 'sent' | 'failed' | 'unreachable') is called once per chat
+        Returns: {'total', 'sent', 'failed', 'unreachable', 'retried', 'flood_waits', 'elapsed'}
+        """
+        bucket = TokenBucket(self.rate)
+        queue: asyncio.Queue = asyncio.Queue()
+        for chat_id in chat_ids:
+            queue.put_nowait((chat_id, 0))
+
+        stats = {'total': len(chat_ids), 'sent': 0, 'failed': 0, 'unreachable': 0,
+                 'retried': 0, 'flood_waits': 0, 'elapsed': 0.0}
+        start = time.monotonic()
+        last_progress = start
+
+        async def report_progress():
+            nonlocal last_progress
+            now = time.monotonic()
+            if on_progress and now - last_progress >= self.progress_interval:
+                last_progress = now
+                stats['elapsed'] = now - start
+                try:
+                    await on_progress(dict(stats))
+                except Exception:
+                    pass
+
+        def finish(chat_id, outcome):
+            stats[outcome] += 1
+            if on_result:
+                on_result(chat_id, outcome)
+
+        async def sender():
+            while True:
+                try:
+                    chat_id, attempt = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                # Own cap for broadcasts plus the bot-wide bucket shared with the outbox
+                await bucket.acquire()
+                await outbox.bucket.acquire()
+                try:
+                    await bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+                    finish(chat_id, 'sent')
+                except RetryAfter as e:
+                    # Flood control applies to the whole bot, so every sender waits
+                    bucket.pause(retry_after_seconds(e))
+                    stats['flood_waits'] += 1
+                    stats['retried'] += 1
+                    queue.put_nowait((chat_id, attempt))
+                except Forbidden:
+                    finish(chat_id, 'unreachable')
+                except BadRequest as e:
+                    finish(chat_id, 'unreachable' if 'chat not found' in e.message.lower() else 'failed')
+                except (TimedOut, NetworkError):
+                    if attempt < self.max_retries:
+                        stats['retried'] += 1
+                        queue.put_nowait((chat_id, attempt + 1))
+                    else:
+                        finish(chat_id, 'failed')
+                except Exception:
+                    finish(chat_id, 'failed')
+
+                await report_progress()
+
+        await asyncio.gather(*(sender() for _ in range(min(self.concurrency, len(chat_ids)) or 1)))
+
+        stats['elapsed'] = time.monotonic() - start
+        return stats
+
+    @staticmethod
+    def format_status(broadcast, speed: Optional[float] = None) -> str:
+        done = broadcast['sent'] + broadcast['failed'] + broadcast['unreachable']
+        if broadcast['status'] == 'completed':
+            header = f"{E['check']} **Broadcast #{broadcast['broadcast_id']} Complete!**"
+        else:
+            header = f"{E['gear']} **Broadcasting #{broadcast['broadcast_id']}...**"
+
+        text = (f"{header}\n\n"
+                f"📤 Progress: {done}/{broadcast['total']}\n"
+                f"✅ Sent: {broadcast['sent']}\n"
+                f"❌ Failed: {broadcast['failed']}\n"
+                f"🚫 Unreachable: {broadcast['unreachable']}")
+        if speed is not None:
+            text += f"\n⚡ Speed: {speed:.1f} msg/s"
+        return text
+
+    async def run_job(self, bot, broadcast_id: int):
+        """
+        Deliver a persisted broadcast to its pending recipients
+        Results are written back in batches, so after a restart only the last
+        unflushed batch can be delivered twice
+        """
+        if broadcast_id in self.active:
+            return
+        self.active.add(broadcast_id)
+
+        broadcast = db.get_broadcast(broadcast_id)
+        buffer = []
+
+        def flush():
+            results = buffer[:]
+            buffer.clear()
+            db.record_broadcast_results(broadcast_id, results)
+
+        def on_result(chat_id, outcome):
+            buffer.append((chat_id, outcome))
+            if len(buffer) >= Config.BROADCAST_FLUSH_SIZE:
+                flush()
+
+        async def edit_status(speed=None):
+            if not broadcast['status_chat_id']:
+                return
+            try:
+                await bot.edit_message_text(
+                    chat_id=broadcast['status_chat_id'],
+                    message_id=broadcast['status_message_id'],
+                    text=self.format_status(db.get_broadcast(broadcast_id), speed),
+                    parse_mode='Markdown'
+                )
+            except Exception:
+                pass
+
+        async def on_progress(stats):
+            flush()
+            await edit_status()
+
+        try:
+            stats = await self.send(
+                bot,
+                db.get_pending_recipients(broadcast_id),
+                broadcast['message'],
+                on_progress=on_progress,
+                on_result=on_result
+            )
+            flush()
+            db.finish_broadcast(broadcast_id)
+            await edit_status(stats['sent'] / stats['elapsed'] if stats['elapsed'] else None)
+        finally:
+            # On cancellation keep what was delivered; the job stays 'running' and resumes
+            flush()
+            self.active.discard(broadcast_id)
+
+# Global broadcaster
+broadcaster = Broadcaster()
@@ -0,0 +1,164 @@
+import os
+import signal
+import asyncio
+import logging
+import subprocess
+from typing import Dict, Optional, Tuple
+import psutil
+from telegram.helpers import escape_markdown
+from config import Config
+from database import db
+from utils.outbox import outbox, PRIORITY_HIGH
+from utils.process_manager import process_manager
+
+logger = logging.getLogger(__name__)
+
+E = Config.EMOJI
+
+class ChildWatcher:
+    """Reaps hosted bot processes the moment they exit, and records why
+
+    Every bot process gets a pidfd registered with the event loop; it turns
+    readable when the process exits, so thousands of bots cost one epoll set
+    and no timers. Without pidfds (older kernels, non-Linux) a SIGCHLD handler
+    does a non-blocking wait on each watched PID instead; it never waits on
+    other PIDs, so pip installs and validation workers keep their exit codes.
+    Exits after stop_bot/restart_bot are only reaped: those processes have
+    already left process_manager.processes.
+    """
+
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.use_pidfd = hasattr(os, 'pidfd_open')
+        self.watched: Dict[int, Tuple[int, subprocess.Popen]] = {}  # pid -> (bot_id, process)
+        self.pidfds: Dict[int, int] = {}                             # pid -> pidfd
+        process_manager.add_start_listener(self.watch)
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        if self.use_pidfd:
+            try:
+                os.close(os.pidfd_open(os.getpid()))
+            except OSError:
+                self.use_pidfd = False
+        if not self.use_pidfd:
+            loop.add_signal_handler(signal.SIGCHLD, self._reap_watched)
+
+        for bot_id, process in list(process_manager.processes.items()):
+            self._watch(bot_id, process)
+        self._mark_missing()
+
+    def stop(self):
+        if not self.loop:
+            return
+        for fd in self.pidfds.values():
+            self.loop.remove_reader(fd)
+            os.close(fd)
+        self.pidfds.clear()
+        self.watched.clear()
+        if not self.use_pidfd:
+            self.loop.remove_signal_handler(signal.SIGCHLD)
+        self.loop = None
+
+    def watch(self, bot_id: int, process: subprocess.Popen):
+        """Start listener: registered from the loop thread, whichever thread started the bot"""
+        if self.loop:
+            self.loop.call_soon_threadsafe(self._watch, bot_id, process)
+
+    def _watch(self, bot_id: int, process: subprocess.Popen):
+        pid = process.pid
+        if pid in self.pidfds:
+            # The PID was reused after a stop_bot reap we have not seen yet
+            self.loop.remove_reader(self.pidfds[pid])
+            os.close(self.pidfds.pop(pid))
+        self.watched[pid] = (bot_id, process)
+        if self.use_pidfd:
+            try:
+                fd = os.pidfd_open(pid)
+            except ProcessLookupError:
+                # Already reaped (stopped before we got here)
+                self.watched.pop(pid)
+                return
+            self.pidfds[pid] = fd
+            self.loop.add_reader(fd, self._check, pid)
+        else:
+            # SIGCHLD may have arrived before the PID was watched
+            self._check(pid)
+
+    def _reap_watched(self):
+        for pid in list(self.watched):
+            self._check(pid)
+
+    def _check(self, pid: int):
+        bot_id, process = self.watched[pid]
+        if process.poll() is None:
+            return
+
+        del self.watched[pid]
+        fd = self.pidfds.pop(pid, None)
+        if fd is not None:
+            self.loop.remove_reader(fd)
+            os.close(fd)
+
+        if process_manager.processes.get(bot_id) is process:
+            del process_manager.processes[bot_id]
+            self._exited(bot_id, process)
+
+    @staticmethod
+    def _read_tail(pipe, limit: int) -> str:
+        """What the process left in a pipe; never blocks (a grandchild may still hold it open)"""
+        if not pipe or pipe.closed:
+            return ''
+        fd = pipe.fileno()
+        os.set_blocking(fd, False)
+        chunks = []
+        try:
+            while True:
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        except BlockingIOError:
+            pass
+        return b''.join(chunks)[-limit:].decode('utf-8', errors='replace').strip()
+
+    @staticmethod
+    def exit_reason(returncode: int) -> str:
+        if returncode >= 0:
+            return f"Exited with code {returncode}"
+        try:
+            return f"Killed by signal {signal.Signals(-returncode).name}"
+        except ValueError:
+            return f"Killed by signal {-returncode}"
+
+    def _exited(self, bot_id: int, process: subprocess.Popen):
+        reason = self.exit_reason(process.returncode)
+        stderr = self._read_tail(process.stderr, Config.BOT_EXIT_STDERR_TAIL)
+        for pipe in (process.stdout, process.stderr):
+            if pipe:
+                pipe.close()
+
+        db.update_bot_status(bot_id, 'stopped' if process.returncode == 0 else 'error')
+        db.update_bot_errors(bot_id, f"{reason}\n{stderr}" if stderr else reason)
+        logger.info(f"Bot #{bot_id} (PID {process.pid}): {reason}")
+
+        bot = db.get_bot(bot_id)
+        if bot and Config.BOT_EXIT_NOTIFY:
+            outbox.send(
+                bot['user_id'],
+                f"{E['warning']} **Your bot stopped**\n\n"
+                f"{E['robot']} Bot: {escape_markdown(bot['bot_name'] or '', version=1)}\n"
+                f"{E['info']} {reason}\n\n"
+                f"Check /mybots to start it again.",
+                priority=PRIORITY_HIGH
+            )
+
+    def _mark_missing(self):
+        """Bots recorded as running whose process is gone (e.g. it died while the bot was down)"""
+        for bot_id, pid in db.get_running_bot_pids().items():
+            if bot_id not in process_manager.processes and not (pid and psutil.pid_exists(pid)):
+                db.update_bot_status(bot_id, 'stopped')
+                db.update_bot_errors(bot_id, "Process was gone when the bot restarted")
+
+# Global child process watcher
+child_watcher = ChildWatcher()
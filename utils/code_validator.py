@@ -1,102 +1,163 @@
-import ast
-import py_compile
-import tempfile
-import os
-from typing import Tuple, List
+from typing import Tuple, List, Dict
+from config import Config
+from utils.python_analyzer import analyze_python
+from utils.js_validator import validate_javascript, node_checker
 
 class CodeValidator:
     """Advanced code validator with syntax checking and error detection"""
     
+    # Bump whenever validation rules change so cached results are invalidated
+    VERSION = 4
+    
     @staticmethod
     def validate_python_code(code: str) -> Tuple[bool, List[str]]:
         """
         Validate Python code for syntax errors
         Returns: (is_valid, errors_list)
         """
+        result = CodeValidator.analyze_python_code(code)
+        return result['is_valid'], result['errors']
+    
+    @staticmethod
+    def analyze_python_code(code: str) -> Dict:
+        """
+        Parse and compile in memory, then collect findings in a single AST pass
+        Returns: {'is_valid', 'errors', 'warnings', 'imports', 'findings', 'entry_hints'}
+        """
         errors = []
+        warnings = []
+        analysis = {'imports': [], 'findings': [], 'entry_hints': []}
         
         try:
-            # Try to parse the code with AST
-            ast.parse(code)
+            analysis = analyze_python(code)
             
-            # Try to compile the code
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-                f.write(code)
-                temp_file = f.name
-            
-            try:
-                py_compile.compile(temp_file, doraise=True)
-            except py_compile.PyCompileError as e:
-                errors.append(f"Compilation Error: {str(e)}")
-            finally:
-                os.unlink(temp_file)
+            for finding in analysis['findings']:
+                if finding['kind'] == 'blocking_call':
+                    warnings.append(
+                        f"Line {finding['line']}: blocking call `{finding['name']}` inside async function"
+                    )
+                else:
+                    errors.append(
+                        f"⚠️ Warning: Found potentially dangerous code: `{finding['name']}` (line {finding['line']})"
+                    )
             
-            # Additional checks
-            errors.extend(CodeValidator._check_dangerous_code(code))
+            if not analysis['entry_hints']:
+                warnings.append("No entry point found (no `if __name__ == '__main__'` or polling call)")
             
         except SyntaxError as e:
             errors.append(f"Syntax Error at line {e.lineno}: {e.msg}")
             if e.text:
-                errors.append(f"Code: {e.text.strip()}")
-                errors.append(f"      {' ' * (e.offset - 1)}^")
+                errors.append(f"Code: {e.text.strip()[:200]}")
+                if e.offset and e.offset <= 200:
+                    errors.append(f"      {' ' * (e.offset - 1)}^")
+        except (ValueError, RecursionError, MemoryError) as e:
+            errors.append(f"Compilation Error: {str(e) or type(e).__name__}")
         except Exception as e:
             errors.append(f"Unexpected Error: {str(e)}")
         
-        return len(errors) == 0, errors
+        return {
+            'is_valid': len(errors) == 0,
+            'errors': errors,
+            'warnings': warnings,
+            **analysis
+        }
     
     @staticmethod
     def validate_javascript_code(code: str) -> Tuple[bool, List[str]]:
         """
-        Basic JavaScript validation
+        Validate JavaScript with the tokenizer (and node, when available)
         Returns: (is_valid, errors_list)
         """
-        errors = []
-        
-        # Basic syntax checks for JavaScript
-        brackets = {'(': ')', '[': ']', '{': '}'}
-        stack = []
-        
-        for i, char in enumerate(code):
-            if char in brackets.keys():
-                stack.append(char)
-            elif char in brackets.values():
-                if not stack or brackets[stack.pop()] != char:
-                    errors.append(f"Bracket mismatch at position {i}")
-        
-        if stack:
-            errors.append("Unclosed brackets found")
+        result = CodeValidator.analyze_javascript_code(code)
+        return result['is_valid'], result['errors']
+    
+    @staticmethod
+    def analyze_javascript_code(code: str) -> Dict:
+        """
+        Tokenize, check structure and extract require/import specifiers
+        Returns: {'is_valid', 'errors', 'imports'}
+        """
+        result = validate_javascript(code)
         
-        # Check for common syntax patterns
-        if 'function' in code and '()' not in code:
-            errors.append("Warning: Function declaration might be incomplete")
+        if result['is_valid'] and Config.JS_NODE_CHECK:
+            error = node_checker.check('upload.js', code, result['is_module'])
+            if error:
+                location = f" at line {error['line']}" if error.get('line') else ""
+                result['is_valid'] = False
+                result['errors'].append(f"Syntax Error{location}: {error['message']}")
         
-        return len(errors) == 0, errors
+        return result
     
     @staticmethod
-    def _check_dangerous_code(code: str) -> List[str]:
-        """Check for potentially dangerous code patterns"""
-        warnings = []
+    def detect_imports(code: str, file_type: str) -> List[str]:
+        """Top-level module names imported/required by the code"""
+        imports = set()
         
-        dangerous_imports = ['os.system', 'subprocess', 'eval', 'exec', '__import__']
+        if file_type == 'python':
+            try:
+                imports.update(analyze_python(code)['imports'])
+            except (SyntaxError, ValueError, RecursionError):
+                return []
+        elif file_type == 'javascript':
+            imports.update(validate_javascript(code)['imports'])
         
-        for dangerous in dangerous_imports:
-            if dangerous in code:
-                warnings.append(f"⚠️ Warning: Found potentially dangerous code: '{dangerous}'")
+        return sorted(imports)
+    
+    @staticmethod
+    def validate(code: str, file_type: str) -> Dict:
+        """
+        Validate code and collect everything worth caching
+        Returns: {'is_valid', 'errors', 'warnings', 'imports', 'findings', 'file_type'}
+        """
+        if file_type == 'python':
+            result = CodeValidator.analyze_python_code(code)
+            return {
+                'is_valid': result['is_valid'],
+                'errors': result['errors'],
+                'warnings': result['warnings'],
+                'imports': result['imports'],
+                'findings': result['findings'],
+                'file_type': file_type
+            }
+        elif file_type == 'javascript':
+            result = CodeValidator.analyze_javascript_code(code)
+            return {
+                'is_valid': result['is_valid'],
+                'errors': result['errors'],
+                'warnings': [],
+                'imports': sorted(set(result['imports'])),
+                'findings': [],
+                'file_type': file_type
+            }
         
-        return warnings
+        return {
+            'is_valid': False,
+            'errors': ["Unsupported file type"],
+            'warnings': [],
+            'imports': [],
+            'findings': [],
+            'file_type': file_type
+        }
     
     @staticmethod
     def get_detailed_error_report(code: str, file_type: str) -> str:
         """Generate a beautiful error report"""
-        if file_type == 'python':
-            is_valid, errors = CodeValidator.validate_python_code(code)
-        elif file_type == 'javascript':
-            is_valid, errors = CodeValidator.validate_javascript_code(code)
-        else:
+        if file_type not in ('python', 'javascript'):
             return "❌ Unsupported file type"
         
+        result = CodeValidator.validate(code, file_type)
+        return CodeValidator.format_report(result['is_valid'], result['errors'], result['warnings'])
+    
+    @staticmethod
+    def format_report(is_valid: bool, errors: List[str], warnings: List[str] = None) -> str:
+        """Format validation results as a Markdown report"""
         if is_valid:
-            return "✅ **Code Validation Successful!**\n\nNo syntax errors found. Your code is ready to run!"
+            report = "✅ **Code Validation Successful!**\n\nNo syntax errors found. Your code is ready to run!"
+            if warnings:
+                report += "\n\n**Notes:**\n"
+                for warning in warnings[:10]:
+                    report += f"• {warning}\n"
+            return report
         else:
             report = "❌ **Code Validation Failed!**\n\n"
             report += "**Errors Found:**\n\n"
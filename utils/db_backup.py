@@ -0,0 +1,134 @@
+import os
+import gzip
+import time
+import shutil
+import sqlite3
+import asyncio
+from datetime import datetime
+from typing import Dict, List
+from config import Config
+from database import db
+
+class DatabaseBackup:
+    """Online, compressed snapshots of the state and history databases
+
+    A snapshot is a directory <backup_dir>/<YYYYmmdd-HHMMSS>/ with a gzipped
+    copy of each database. Copies use the SQLite backup API a few pages per
+    step inside one read transaction on the source: with WAL, writers keep
+    going and the copy is a single point in time (without pinning the read,
+    every concurrent write would restart the backup from page one).
+    """
+
+    def __init__(self, backup_dir: str = Config.BACKUP_DIR, keep: int = Config.BACKUP_KEEP,
+                 pages_per_step: int = Config.BACKUP_PAGES_PER_STEP,
+                 step_sleep: float = Config.BACKUP_STEP_SLEEP):
+        self.backup_dir = backup_dir
+        self.keep = keep
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.lock = asyncio.Lock()
+        os.makedirs(backup_dir, exist_ok=True)
+
+    def database_paths(self) -> Dict[str, str]:
+        """Empty when the storage backend keeps nothing on disk"""
+        return db.database_paths()
+
+    def _copy(self, source_path: str, target_path: str):
+        source = sqlite3.connect(source_path, isolation_level=None)
+        target = sqlite3.connect(target_path)
+        try:
+            source.execute('BEGIN')
+            source.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()
+            source.backup(target, pages=self.pages_per_step, sleep=self.step_sleep)
+            source.execute('COMMIT')
+        finally:
+            target.close()
+            source.close()
+
+    @staticmethod
+    def _compress(path: str):
+        with open(path, 'rb') as raw, gzip.open(path + '.gz', 'wb', compresslevel=6) as packed:
+            shutil.copyfileobj(raw, packed, 1024 * 1024)
+        os.remove(path)
+
+    def _snapshot(self, rotate: bool = True) -> Dict:
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        name, count = stamp, 1
+        while os.path.exists(os.path.join(self.backup_dir, name)):
+            name, count = f"{stamp}-{count}", count + 1
+
+        start = time.monotonic()
+        temp_dir = os.path.join(self.backup_dir, name + '.tmp')
+        os.makedirs(temp_dir)
+        try:
+            for key, path in self.database_paths().items():
+                copy_path = os.path.join(temp_dir, f"{key}.db")
+                self._copy(path, copy_path)
+                self._compress(copy_path)
+            os.rename(temp_dir, os.path.join(self.backup_dir, name))
+        except Exception:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+
+        if rotate:
+            self._rotate()
+        return {'name': name, 'size': self.snapshot_size(name), 'seconds': time.monotonic() - start}
+
+    def _rotate(self):
+        for name in os.listdir(self.backup_dir):
+            if name.endswith('.tmp'):
+                # Left behind by a crash mid-backup
+                shutil.rmtree(os.path.join(self.backup_dir, name), ignore_errors=True)
+        for name in self.list_snapshots()[self.keep:]:
+            shutil.rmtree(os.path.join(self.backup_dir, name), ignore_errors=True)
+
+    def _restore(self, name: str):
+        snapshot_dir = os.path.join(self.backup_dir, name)
+        for key, path in self.database_paths().items():
+            temp_path = os.path.join(self.backup_dir, f"restore-{key}.db")
+            with gzip.open(os.path.join(snapshot_dir, f"{key}.db.gz"), 'rb') as packed, open(temp_path, 'wb') as raw:
+                shutil.copyfileobj(packed, raw, 1024 * 1024)
+
+            source = sqlite3.connect(temp_path)
+            target = sqlite3.connect(path)
+            try:
+                # A single step: the live database switches over in one transaction
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+                os.remove(temp_path)
+
+    def list_snapshots(self) -> List[str]:
+        """Snapshot names, newest first"""
+        return sorted(
+            (name for name in os.listdir(self.backup_dir)
+             if not name.endswith('.tmp') and os.path.isdir(os.path.join(self.backup_dir, name))),
+            reverse=True
+        )
+
+    def snapshot_size(self, name: str) -> int:
+        snapshot_dir = os.path.join(self.backup_dir, name)
+        return sum(os.path.getsize(os.path.join(snapshot_dir, f)) for f in os.listdir(snapshot_dir))
+
+    async def create(self) -> Dict:
+        """Take a snapshot in a worker thread; returns its name, size and duration"""
+        async with self.lock:
+            return await asyncio.to_thread(self._snapshot)
+
+    async def restore(self, name: str) -> Dict:
+        """
+        Replace both databases with a snapshot, after snapshotting the current
+        data. Returns that safety snapshot
+        """
+        if name not in self.list_snapshots():
+            raise ValueError(f"Unknown snapshot: {name}")
+
+        async with self.lock:
+            safety = await asyncio.to_thread(self._snapshot, False)
+            await asyncio.to_thread(self._restore, name)
+            self._rotate()
+            return safety
+
+# Global database backups
+db_backup = DatabaseBackup()
@@ -1,4 +1,6 @@
+import time
 from functools import wraps
+from typing import Dict
 from telegram import Update
 from telegram.ext import ContextTypes
 from config import Config
@@ -57,3 +59,112 @@ def track_user(func):
         db.add_user(user.id, user.username, user.first_name, user.last_name)
         return await func(update, context)
     return wrapper
+
+class RateLimiter:
+    """Per-user token buckets kept in memory
+
+    Each action has a cost (Config.RATE_LIMIT_COSTS) and each tier a bucket
+    size and refill rate (Config.RATE_LIMIT_BUDGETS). The tier is looked up
+    once when a bucket is created, so a rejected request never touches the DB.
+    """
+
+    def __init__(self):
+        self.buckets: Dict[int, Dict] = {}
+        self.allowed = 0
+        self.rejected: Dict[str, int] = {}
+
+    @staticmethod
+    def get_tier(user_id: int) -> str:
+        if user_id == Config.OWNER_ID:
+            return 'owner'
+        if db.is_admin(user_id):
+            return 'admin'
+        return 'premium' if db.is_premium(user_id) else 'free'
+
+    def consume(self, user_id: int, action: str) -> bool:
+        now = time.monotonic()
+        bucket = self.buckets.get(user_id)
+        if bucket is None:
+            tier = self.get_tier(user_id)
+            capacity = Config.RATE_LIMIT_BUDGETS[tier][0]
+            bucket = self.buckets[user_id] = {'tier': tier, 'tokens': capacity, 'updated': now, 'warned_until': 0}
+
+        if bucket['tier'] == 'owner':
+            self.allowed += 1
+            return True
+
+        capacity, refill = Config.RATE_LIMIT_BUDGETS[bucket['tier']]
+        bucket['tokens'] = min(capacity, bucket['tokens'] + (now - bucket['updated']) * refill)
+        bucket['updated'] = now
+
+        cost = Config.RATE_LIMIT_COSTS[action]
+        if bucket['tokens'] < cost:
+            self.rejected[action] = self.rejected.get(action, 0) + 1
+            return False
+
+        bucket['tokens'] -= cost
+        self.allowed += 1
+        return True
+
+    def should_warn(self, user_id: int) -> bool:
+        """Tell a limited user at most once per cooldown, so replies don't amplify the flood"""
+        bucket = self.buckets[user_id]
+        now = time.monotonic()
+        if now < bucket['warned_until']:
+            return False
+        bucket['warned_until'] = now + Config.RATE_LIMIT_WARN_COOLDOWN
+        return True
+
+    def reset(self, user_id: int):
+        """Forget a user's bucket (e.g. after their tier changed)"""
+        self.buckets.pop(user_id, None)
+
+    def cleanup(self) -> int:
+        """Drop buckets that have refilled completely; they hold no state worth keeping"""
+        now = time.monotonic()
+        idle = []
+        for user_id, bucket in self.buckets.items():
+            capacity, refill = Config.RATE_LIMIT_BUDGETS[bucket['tier']]
+            if bucket['tokens'] + (now - bucket['updated']) * refill >= capacity:
+                idle.append(user_id)
+
+        for user_id in idle:
+            del self.buckets[user_id]
+        return len(idle)
+
+    def get_stats(self) -> Dict:
+        return {
+            'tracked_users': len(self.buckets),
+            'allowed': self.allowed,
+            'rejected': sum(self.rejected.values()),
+            'rejected_by_action': dict(self.rejected)
+        }
+
+# Global rate limiter
+rate_limiter = RateLimiter()
+
+def rate_limit(action):
+    """
+    Reject requests over the user's budget before any other work is done
+    action is a RATE_LIMIT_COSTS key, or a function of the update returning one
+    """
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+            user_id = update.effective_user.id
+            if rate_limiter.consume(user_id, action(update) if callable(action) else action):
+                return await func(update, context)
+            
+            if update.callback_query:
+                await update.callback_query.answer(
+                    f"{Config.EMOJI['time']} Too many requests, please wait a moment."
+                )
+            elif update.message and rate_limiter.should_warn(user_id):
+                await update.message.reply_text(
+                    f"{Config.EMOJI['time']} **Slow down!**\n\n"
+                    f"You are sending requests too quickly. Please wait a moment and try again.",
+                    parse_mode='Markdown'
+                )
+            return None
+        return wrapper
+    return decorator
@@ -0,0 +1,142 @@
+import os
+import shutil
+import hashlib
+import zipfile
+from typing import Optional, List
+from config import Config
+from utils.zip_inspector import zip_inspector
+
+class ZipDeployer:
+    """Deploy ZIP projects into versioned release directories
+
+    Layout per bot:
+        <bot_dir>/releases/<sha256>/   extracted archive (extracted once)
+        <bot_dir>/current -> releases/<sha256>
+    """
+
+    def __init__(self, keep_releases: int = Config.KEEP_RELEASES):
+        self.keep_releases = keep_releases
+
+    @staticmethod
+    def bot_dir(user_id: int, bot_id: int) -> str:
+        """Directory holding all releases of one bot"""
+        return os.path.join(Config.HOSTED_BOTS_DIR, str(user_id), f"bot_{bot_id}")
+
+    @staticmethod
+    def hash_file(file_path: str) -> str:
+        """SHA-256 of a file, read in chunks"""
+        sha = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    def deploy(self, bot_dir: str, zip_path: str, main_file: str,
+               content_hash: Optional[str] = None) -> tuple[bool, str, Optional[str]]:
+        """
+        Extract archive into a release (if not already there) and switch `current` to it
+        Returns: (success, message, entry_point_path)
+        """
+        try:
+            content_hash = content_hash or self.hash_file(zip_path)
+            releases_dir = os.path.join(bot_dir, 'releases')
+            release_dir = os.path.join(releases_dir, content_hash)
+            os.makedirs(releases_dir, exist_ok=True)
+
+            # Unchanged archive: release already extracted, nothing to do
+            if not os.path.isdir(release_dir):
+                self._extract_release(zip_path, releases_dir, release_dir)
+            else:
+                # Mark as most recently used so GC keeps it
+                os.utime(release_dir)
+
+            self._swap_current(bot_dir, content_hash)
+            self.collect_garbage(bot_dir)
+
+            entry_point = os.path.join(bot_dir, 'current', main_file)
+            return True, "✅ Release deployed", entry_point
+
+        except Exception as e:
+            return False, f"❌ Deployment failed: {str(e)}", None
+
+    def _extract_release(self, zip_path: str, releases_dir: str, release_dir: str):
+        """Extract into a temp dir next to the release, then rename into place"""
+        tmp_dir = f"{release_dir}.tmp{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        try:
+            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                entries = [info for info in zip_ref.infolist() if not info.is_dir()]
+                success, message = zip_inspector.check_limits(entries)
+                if not success:
+                    raise ValueError(message)
+
+                for info in entries:
+                    target = os.path.join(tmp_dir, *info.filename.replace('\\', '/').split('/'))
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    with open(target, 'wb') as f:
+                        f.write(zip_inspector.read_entry(zip_ref, info))
+
+            os.rename(tmp_dir, release_dir)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            # Another deploy of the same archive may have won the race
+            if not os.path.isdir(release_dir):
+                raise
+
+    @staticmethod
+    def _swap_current(bot_dir: str, content_hash: str):
+        """Atomically point `current` at a release (symlink + rename)"""
+        current = os.path.join(bot_dir, 'current')
+        target = os.path.join('releases', content_hash)
+
+        if os.path.islink(current) and os.readlink(current) == target:
+            return
+
+        tmp_link = f"{current}.tmp{os.getpid()}"
+        if os.path.lexists(tmp_link):
+            os.unlink(tmp_link)
+        os.symlink(target, tmp_link)
+        os.replace(tmp_link, current)
+
+    def current_release(self, bot_dir: str) -> Optional[str]:
+        """Hash of the active release"""
+        current = os.path.join(bot_dir, 'current')
+        if not os.path.islink(current):
+            return None
+        return os.path.basename(os.readlink(current))
+
+    def collect_garbage(self, bot_dir: str) -> List[str]:
+        """Remove old releases, keeping the newest ones and always the active one"""
+        releases_dir = os.path.join(bot_dir, 'releases')
+        if not os.path.isdir(releases_dir):
+            return []
+
+        active = self.current_release(bot_dir)
+        releases = sorted(
+            (entry for entry in os.scandir(releases_dir) if entry.is_dir(follow_symlinks=False)),
+            key=lambda entry: entry.stat().st_mtime,
+            reverse=True
+        )
+
+        removed = []
+        kept = 1 if active else 0
+        for entry in releases:
+            # Skip the active release and extractions still in progress
+            if entry.name == active or '.tmp' in entry.name:
+                continue
+            if kept < self.keep_releases:
+                kept += 1
+                continue
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed.append(entry.name)
+
+        return removed
+
+    @staticmethod
+    def remove(bot_dir: str):
+        """Remove every release of a bot"""
+        shutil.rmtree(bot_dir, ignore_errors=True)
+
+# Global zip deployer
+zip_deployer = ZipDeployer()
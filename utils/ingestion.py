@@ -0,0 +1,115 @@
+import os
+import codecs
+import asyncio
+import hashlib
+import logging
+import aiohttp
+from typing import Optional, Dict, AsyncIterator
+from utils.blob_store import blob_store
+
+logger = logging.getLogger(__name__)
+
+class UploadRejected(Exception):
+    """Upload aborted while streaming; message is shown to the user"""
+
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
+
+class UploadIngestor:
+    """Stream an upload from Telegram into the blob store in one pass
+
+    While the bytes arrive they are hashed, size-checked against the tier limit,
+    sniffed for UTF-8 and buffered, so validation never re-reads the file from disk.
+    """
+
+    CHUNK_SIZE = 256 * 1024
+
+    def __init__(self):
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=300))
+        return self.session
+
+    async def _iter_chunks(self, file_obj) -> AsyncIterator[bytes]:
+        path = file_obj.file_path
+
+        # Both the download URL and the local path contain the bot token, so
+        # failures are reported without them
+        try:
+            if path.startswith(('http://', 'https://')):
+                async with self._get_session().get(path) as response:
+                    response.raise_for_status()
+                    async for chunk in response.content.iter_chunked(self.CHUNK_SIZE):
+                        yield chunk
+            else:
+                # Local Bot API server hands out file system paths
+                with open(path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b''):
+                        yield chunk
+        except aiohttp.ClientResponseError as e:
+            logger.warning(f"Upload download failed: HTTP {e.status}")
+            raise UploadRejected("❌ **Could not download your file from Telegram.** Please try again.") from None
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            logger.warning(f"Upload download failed: {type(e).__name__}")
+            raise UploadRejected("❌ **Could not download your file from Telegram.** Please try again.") from None
+
+    async def ingest(self, file_obj, max_size: int, require_utf8: bool = False) -> Dict:
+        """
+        Download, hash, size-check and store an upload
+        Returns: {'content_hash', 'blob_path', 'size', 'data'}
+        Raises UploadRejected when the download fails, the limit is exceeded or the text is not UTF-8
+        """
+        temp_path = blob_store.new_temp_path()
+        sha = hashlib.sha256()
+        decoder = codecs.getincrementaldecoder('utf-8')() if require_utf8 else None
+        chunks = []
+        size = 0
+
+        try:
+            with open(temp_path, 'wb') as f:
+                async for chunk in self._iter_chunks(file_obj):
+                    size += len(chunk)
+                    if size > max_size:
+                        raise UploadRejected(
+                            f"❌ **File Too Large!**\n\n"
+                            f"Your limit: {max_size // (1024*1024)}MB"
+                        )
+
+                    if decoder:
+                        try:
+                            decoder.decode(chunk)
+                        except UnicodeDecodeError:
+                            raise UploadRejected("❌ **File is not valid UTF-8 text!**")
+
+                    sha.update(chunk)
+                    f.write(chunk)
+                    chunks.append(chunk)
+
+            if decoder:
+                try:
+                    decoder.decode(b'', final=True)
+                except UnicodeDecodeError:
+                    raise UploadRejected("❌ **File is not valid UTF-8 text!**")
+
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        content_hash = sha.hexdigest()
+        return {
+            'content_hash': content_hash,
+            'blob_path': blob_store.commit(temp_path, content_hash),
+            'size': size,
+            'data': b''.join(chunks)
+        }
+
+    async def close(self):
+        if self.session and not self.session.closed:
+            await self.session.close()
+
+# Global upload ingestor
+upload_ingestor = UploadIngestor()
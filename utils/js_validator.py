@@ -0,0 +1,281 @@
+import re
+import json
+import shutil
+import select
+import resource
+import subprocess
+import threading
+from typing import Dict, Optional, Tuple
+from config import Config
+
+_WHITESPACE = re.compile(r'\s+')
+_LINE_COMMENT = re.compile(r'//[^\n]*')
+_BLOCK_COMMENT = re.compile(r'/\*[\s\S]*?\*/')
+_IDENTIFIER = re.compile(r'[A-Za-z_$#\u0080-\uffff][\w$\u0080-\uffff]*')
+_NUMBER = re.compile(r'(?:\d|\.\d)(?:[eE][+-]|[\w.])*')
+_STRINGS = {
+    '"': re.compile(r'"(?:[^"\\\n]|\\[\s\S])*"'),
+    "'": re.compile(r"'(?:[^'\\\n]|\\[\s\S])*'"),
+}
+_TEMPLATE_CHUNK = re.compile(r'(?:[^`\\$]|\\[\s\S]|\$(?!\{))*')
+_REGEX = re.compile(r'/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[\w$]*')
+_PUNCTUATOR = re.compile(
+    r'>>>=|\.\.\.|===|!==|\*\*=|<<=|>>=|>>>|\?\?=|&&=|\|\|=|=>|==|!=|<=|>=|&&|\|\||\?\?|\?\.(?!\d)'
+    r'|\+\+|--|[-+*/%&|^]=|<<|>>|\*\*|\S'
+)
+
+# After these keywords a '/' starts a regular expression, not a division
+_REGEX_KEYWORDS = {
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw',
+    'case', 'do', 'else', 'yield', 'await'
+}
+_CLOSERS = {')': '(', ']': '[', '}': '{'}
+
+class JSSyntaxError(Exception):
+    def __init__(self, message: str, pos: int):
+        super().__init__(message)
+        self.message = message
+        self.pos = pos
+
+def _line_col(code: str, pos: int) -> Tuple[int, int]:
+    line = code.count('\n', 0, pos) + 1
+    col = pos - (code.rfind('\n', 0, pos) + 1) + 1
+    return line, col
+
+def tokenize_js(code: str) -> Dict:
+    """
+    Linear-time JavaScript lexer that checks bracket structure
+    Understands strings, template literals (with nested ${}), comments and regex literals
+    Returns: {'imports', 'is_module'}; raises JSSyntaxError
+    """
+    pos = 0
+    end = len(code)
+    stack = []          # (opener, pos); '${' marks a template expression
+    prev = None         # previous significant token (kind, value)
+    before_prev = None
+    imports = []
+    is_module = False
+
+    # Hashbang line
+    if code.startswith('#!'):
+        pos = code.find('\n')
+        pos = end if pos == -1 else pos
+
+    def resume_template(start: int, template_start: int) -> int:
+        """Scan template text; returns position after the closing ` or after ${"""
+        match = _TEMPLATE_CHUNK.match(code, start)
+        p = match.end()
+        if p >= end:
+            raise JSSyntaxError("Unterminated template literal", template_start)
+        if code[p] == '`':
+            return p + 1
+        stack.append(('${', p))
+        return p + 2
+
+    while pos < end:
+        ch = code[pos]
+
+        if ch.isspace():
+            pos = _WHITESPACE.match(code, pos).end()
+            continue
+
+        if ch == '/' and pos + 1 < end and code[pos + 1] == '/':
+            pos = _LINE_COMMENT.match(code, pos).end()
+            continue
+
+        if ch == '/' and pos + 1 < end and code[pos + 1] == '*':
+            match = _BLOCK_COMMENT.match(code, pos)
+            if not match:
+                raise JSSyntaxError("Unterminated comment", pos)
+            pos = match.end()
+            continue
+
+        start = pos
+
+        if ch in _STRINGS:
+            match = _STRINGS[ch].match(code, pos)
+            if not match:
+                raise JSSyntaxError("Unterminated string literal", pos)
+            pos = match.end()
+            token = ('str', code[start + 1:pos - 1])
+
+            # require('x'), import('x'), import 'x', ... from 'x'
+            if prev and (prev == ('name', 'from') or prev == ('name', 'import')
+                         or (prev == ('punct', '(') and before_prev in (('name', 'require'), ('name', 'import')))):
+                imports.append(token[1])
+
+        elif ch == '`':
+            pos = resume_template(pos + 1, pos)
+            token = ('template', '')
+
+        elif ch == '/' and (prev is None
+                            or (prev[0] == 'punct' and prev[1] not in (')', ']', '++', '--'))
+                            or (prev[0] == 'name' and prev[1] in _REGEX_KEYWORDS)):
+            match = _REGEX.match(code, pos)
+            if not match:
+                raise JSSyntaxError("Unterminated regular expression", pos)
+            pos = match.end()
+            token = ('regex', '')
+
+        elif ch.isdigit() or (ch == '.' and pos + 1 < end and code[pos + 1].isdigit()):
+            pos = _NUMBER.match(code, pos).end()
+            token = ('num', '')
+
+        elif _IDENTIFIER.match(code, pos):
+            match = _IDENTIFIER.match(code, pos)
+            pos = match.end()
+            token = ('name', match.group())
+
+            if token[1] == 'export' or (token[1] == 'import' and prev != ('punct', '.')
+                                         and code[pos:pos + 10].lstrip()[:1] not in ('(', '.')):
+                is_module = True
+
+        else:
+            match = _PUNCTUATOR.match(code, pos)
+            pos = match.end()
+            value = match.group()
+            token = ('punct', value)
+
+            if value in ('(', '[', '{'):
+                stack.append((value, start))
+            elif value in _CLOSERS:
+                if not stack:
+                    raise JSSyntaxError(f"Unexpected '{value}'", start)
+                opener, opener_pos = stack.pop()
+                if opener == '${' and value == '}':
+                    # Back inside the template literal
+                    pos = resume_template(pos, opener_pos)
+                    token = ('template', '')
+                elif opener != _CLOSERS[value]:
+                    line, col = _line_col(code, opener_pos)
+                    raise JSSyntaxError(
+                        f"Unexpected '{value}', expected closing for '{opener}' from line {line}, column {col}",
+                        start
+                    )
+
+        before_prev, prev = prev, token
+
+    if stack:
+        opener, opener_pos = stack[-1]
+        if opener == '${':
+            raise JSSyntaxError("Unterminated template literal", opener_pos)
+        raise JSSyntaxError(f"Unclosed '{opener}'", opener_pos)
+
+    return {'imports': imports, 'is_module': is_module}
+
+def validate_javascript(code: str) -> Dict:
+    """
+    Tokenize and check structure
+    Returns: {'is_valid', 'errors', 'imports', 'is_module'}
+    """
+    try:
+        result = tokenize_js(code)
+    except JSSyntaxError as e:
+        line, col = _line_col(code, e.pos)
+        source_line = code[code.rfind('\n', 0, e.pos) + 1:].split('\n', 1)[0]
+        errors = [f"Syntax Error at line {line}, column {col}: {e.message}"]
+        if source_line.strip() and col <= 200:
+            errors.append(f"Code: {source_line[:200]}")
+        return {'is_valid': False, 'errors': errors, 'imports': [], 'is_module': False}
+
+    return {'is_valid': True, 'errors': [], 'imports': result['imports'], 'is_module': result['is_module']}
+
+# Long-lived node process that syntax-checks one source per input line
+_NODE_WORKER = r"""
+const vm = require('vm');
+const readline = require('readline');
+const rl = readline.createInterface({input: process.stdin});
+rl.on('line', (line) => {
+  const job = JSON.parse(line);
+  let result = null;
+  try {
+    if (job.module && vm.SourceTextModule) {
+      new vm.SourceTextModule(job.code, {identifier: job.name});
+    } else {
+      new vm.Script(job.code, {filename: job.name});
+    }
+  } catch (e) {
+    // Scripts report "name:line" on the first stack line; modules give no location
+    const match = /:(\d+)$/.exec(String(e.stack).split('\n')[0]);
+    result = {message: String(e.message), line: match ? Number(match[1]) : null};
+  }
+  process.stdout.write(JSON.stringify(result) + '\n');
+});
+"""
+
+def _reset_child_limits():
+    """Node reserves lots of virtual memory; lift limits inherited from the validation worker"""
+    for limit in (resource.RLIMIT_AS, resource.RLIMIT_CPU):
+        hard = resource.getrlimit(limit)[1]
+        resource.setrlimit(limit, (hard, hard))
+
+class NodeChecker:
+    """Pooled `node --check` equivalent: one persistent node process per validation worker
+
+    Each validation worker handles one job at a time, so there is nothing to
+    batch: a worker checks one source per round trip, and the saving is that
+    node starts once per worker instead of once per upload.
+    """
+
+    def __init__(self, timeout: int = Config.JS_NODE_CHECK_TIMEOUT):
+        self.timeout = timeout
+        self.node_path = shutil.which('node')
+        self.process: Optional[subprocess.Popen] = None
+        self.lock = threading.Lock()
+
+    def available(self) -> bool:
+        return self.node_path is not None
+
+    def _start(self):
+        self.process = subprocess.Popen(
+            [self.node_path, '--experimental-vm-modules', '--no-warnings', '-e', _NODE_WORKER],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            preexec_fn=_reset_child_limits
+        )
+
+    def _stop(self):
+        if self.process:
+            self.process.kill()
+            self.process.wait()
+            self.process = None
+
+    def check(self, name: str, code: str, module: bool = False) -> Optional[Dict]:
+        """
+        Syntax-check one source
+        Returns {'message', 'line'} for a syntax error, {} if it parses,
+        or None if node could not check
+        """
+        if not self.available():
+            return None
+
+        with self.lock:
+            try:
+                if not self.process or self.process.poll() is not None:
+                    self._start()
+
+                job = {'name': name, 'code': code, 'module': module}
+                self.process.stdin.write((json.dumps(job) + '\n').encode())
+                self.process.stdin.flush()
+
+                ready, _, _ = select.select([self.process.stdout], [], [], self.timeout)
+                if not ready:
+                    self._stop()
+                    return None
+
+                line = self.process.stdout.readline()
+                if not line:
+                    self._stop()
+                    return None
+                return json.loads(line) or {}
+            except (OSError, ValueError):
+                self._stop()
+                return None
+
+    def shutdown(self):
+        with self.lock:
+            self._stop()
+
+# Global node checker (started lazily in whichever process validates)
+node_checker = NodeChecker()
@@ -0,0 +1,249 @@
+import time
+import asyncio
+from collections import deque
+from typing import Dict, Optional
+from telegram.error import RetryAfter, Forbidden, BadRequest, TimedOut, NetworkError
+from config import Config
+from database import db
+
+PRIORITY_HIGH = 0    # Direct notices to a user about their account
+PRIORITY_NORMAL = 1  # Owner/admin notifications
+PRIORITY_LOW = 2     # Digests and other bulk output
+
+MAX_MESSAGE_LENGTH = 4096
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens (flood wait reported by Telegram)"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    self.updated = time.monotonic()
+                    continue
+
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+def retry_after_seconds(error: RetryAfter) -> float:
+    retry_after = error.retry_after
+    return retry_after.total_seconds() if hasattr(retry_after, 'total_seconds') else retry_after
+
+class Outbox:
+    """Single prioritized queue for every notification the bot sends on its own
+
+    Enforces a global rate (shared with broadcasts) and a per-chat interval,
+    merges queued text messages to the same chat, and retries flood waits and
+    network errors instead of dropping them. A merged message Telegram rejects
+    is split back into its parts, and a part whose Markdown doesn't parse is
+    sent as plain text, so one bad entity loses nothing.
+    """
+
+    def __init__(self, global_rate: float = Config.OUTBOX_GLOBAL_RATE,
+                 chat_interval: float = Config.OUTBOX_CHAT_INTERVAL,
+                 group_interval: float = Config.OUTBOX_GROUP_INTERVAL,
+                 max_size: int = Config.OUTBOX_MAX_SIZE,
+                 max_retries: int = Config.OUTBOX_MAX_RETRIES):
+        self.bucket = TokenBucket(global_rate)
+        self.chat_interval = chat_interval
+        self.group_interval = group_interval
+        self.max_size = max_size
+        self.max_retries = max_retries
+
+        self.chats: Dict[int, deque] = {}
+        self.ready_at: Dict[int, float] = {}
+        self.size = 0
+        self.seq = 0
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.bot = None
+        self.metrics = {'queued': 0, 'sent': 0, 'failed': 0, 'dropped': 0, 'retried': 0, 'coalesced': 0}
+
+    def start(self, bot):
+        self.bot = bot
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self, drain_timeout: float = Config.OUTBOX_DRAIN_TIMEOUT):
+        """Give queued messages a moment to go out, then stop the dispatcher"""
+        deadline = time.monotonic() + drain_timeout
+        while self.size and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def send(self, chat_id: int, text: Optional[str] = None, parse_mode: Optional[str] = 'Markdown',
+             priority: int = PRIORITY_NORMAL, coalesce: bool = True,
+             document: Optional[str] = None, caption: Optional[str] = None, media: Optional[list] = None) -> bool:
+        """
+        Queue a text message, a document (file_id) or a media group
+        Queued texts to the same chat are merged when coalesce is set
+        Returns False if the queue is full and the message was dropped
+        """
+        pending = self.chats.setdefault(chat_id, deque())
+
+        if text is not None and coalesce and pending:
+            last = pending[-1]
+            if (last['kind'] == 'message' and last['coalesce'] and last['parse_mode'] == parse_mode
+                    and len(last['text']) + len(text) + 2 <= MAX_MESSAGE_LENGTH):
+                last['text'] += "\n\n" + text.strip()
+                last['parts'].append(text.strip())
+                last['priority'] = min(last['priority'], priority)
+                self.metrics['coalesced'] += 1
+                return True
+
+        if self.size >= self.max_size:
+            self.metrics['dropped'] += 1
+            if not pending:
+                del self.chats[chat_id]
+            return False
+
+        if text is not None:
+            kind, text = 'message', text.strip()
+        else:
+            kind = 'document' if document else 'media_group'
+
+        self.seq += 1
+        pending.append({
+            'kind': kind,
+            'text': text,
+            'parts': [text] if text is not None else None,  # Texts merged into this message
+            'parse_mode': parse_mode,
+            'document': document,
+            'caption': caption,
+            'media': media,
+            'priority': priority,
+            'coalesce': coalesce,
+            'seq': self.seq,
+            'attempts': 0
+        })
+        self.size += 1
+        self.metrics['queued'] += 1
+        self.wakeup.set()
+        return True
+
+    def _next_chat(self, now: float):
+        """Chat whose head message should go next, and the earliest time any chat becomes ready"""
+        best = None
+        best_key = None
+        next_ready = None
+
+        for chat_id, pending in self.chats.items():
+            ready_at = self.ready_at.get(chat_id, 0)
+            if ready_at > now:
+                next_ready = ready_at if next_ready is None else min(next_ready, ready_at)
+                continue
+            key = (pending[0]['priority'], pending[0]['seq'])
+            if best_key is None or key < best_key:
+                best, best_key = chat_id, key
+
+        return best, next_ready
+
+    async def _deliver(self, chat_id: int, message: Dict):
+        if message['kind'] == 'message':
+            await self.bot.send_message(chat_id=chat_id, text=message['text'], parse_mode=message['parse_mode'])
+        elif message['kind'] == 'document':
+            await self.bot.send_document(chat_id=chat_id, document=message['document'], caption=message['caption'])
+        else:
+            await self.bot.send_media_group(chat_id=chat_id, media=message['media'])
+
+    async def _run(self):
+        while True:
+            now = time.monotonic()
+            chat_id, next_ready = self._next_chat(now)
+
+            if chat_id is None:
+                self.wakeup.clear()
+                timeout = (next_ready - now) if next_ready else None
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self.bucket.acquire()
+
+            pending = self.chats[chat_id]
+            message = pending.popleft()
+            interval = self.group_interval if chat_id < 0 else self.chat_interval
+            retry_delay = None
+
+            try:
+                await self._deliver(chat_id, message)
+                self.metrics['sent'] += 1
+            except RetryAfter as e:
+                retry_delay = retry_after_seconds(e)
+            except Forbidden:
+                self.metrics['failed'] += 1
+                if chat_id > 0:
+                    db.mark_user_unreachable(chat_id)
+            except BadRequest:
+                if message['kind'] == 'message' and len(message['parts']) > 1:
+                    # Resend the merged texts one by one, so only a bad one can fail
+                    parts = [dict(message, text=part, parts=[part], coalesce=False) for part in message['parts']]
+                    pending.extendleft(reversed(parts))
+                    self.size += len(parts) - 1
+                    self.metrics['retried'] += 1
+                    continue
+                if message['kind'] == 'message' and message['parse_mode']:
+                    # Usually unparsable entities: deliver the text without formatting
+                    message['parse_mode'] = None
+                    pending.appendleft(message)
+                    self.metrics['retried'] += 1
+                    continue
+                self.metrics['failed'] += 1
+            except (TimedOut, NetworkError):
+                message['attempts'] += 1
+                if message['attempts'] <= self.max_retries:
+                    retry_delay = 2 ** message['attempts']
+                else:
+                    self.metrics['failed'] += 1
+            except Exception:
+                self.metrics['failed'] += 1
+
+            if retry_delay is not None:
+                # Keep the message at the head of its chat so ordering is preserved
+                pending.appendleft(message)
+                self.metrics['retried'] += 1
+                self.ready_at[chat_id] = time.monotonic() + retry_delay
+                continue
+
+            self.size -= 1
+            self.ready_at[chat_id] = time.monotonic() + interval
+            if not pending:
+                del self.chats[chat_id]
+
+            # Forget per-chat timers that no longer limit anything
+            if len(self.ready_at) > 2 * len(self.chats) + 100:
+                self.ready_at = {c: t for c, t in self.ready_at.items() if c in self.chats or t > now}
+
+    def get_stats(self) -> Dict:
+        return {**self.metrics, 'depth': self.size, 'chats': len(self.chats)}
+
+# Global outbound queue
+outbox = Outbox()
@@ -2,14 +2,24 @@ import subprocess
 import psutil
 import os
 import signal
+import time
 from typing import Optional, Dict
 from config import Config
+from utils.blob_store import blob_store
 
 class ProcessManager:
     """Manage bot processes"""
     
     def __init__(self):
         self.processes: Dict[int, subprocess.Popen] = {}
+        self.usage_procs: Dict[int, psutil.Process] = {}  # pid -> handle, so cpu_percent has a baseline
+        self.usage_snapshot: Dict[int, Dict] = {}
+        self.usage_time = 0.0
+        self.start_listeners = []
+    
+    def add_start_listener(self, callback):
+        """callback(bot_id, process) runs after each bot process is started"""
+        self.start_listeners.append(callback)
     
     def start_bot(self, bot_id: int, file_path: str, file_type: str) -> tuple[bool, str, Optional[int]]:
         """
@@ -17,6 +27,9 @@ class ProcessManager:
         Returns: (success, message, process_id)
         """
         try:
+            # Bots run from their own directory, so the path must be absolute
+            file_path = os.path.abspath(file_path)
+            
             # Determine command based on file type
             if file_type == 'python':
                 cmd = ['python3', file_path]
@@ -25,6 +38,9 @@ class ProcessManager:
             else:
                 return False, "❌ Unsupported file type", None
             
+            # Never run a bot from a file shared with the blob store
+            blob_store.unshare(file_path)
+            
             # Start process
             process = subprocess.Popen(
                 cmd,
@@ -35,6 +51,8 @@ class ProcessManager:
             )
             
             self.processes[bot_id] = process
+            for callback in self.start_listeners:
+                callback(bot_id, process)
             
             return True, f"✅ Bot started successfully! (PID: {process.pid})", process.pid
             
@@ -96,6 +114,37 @@ class ProcessManager:
         except:
             return {'running': False}
     
+    def get_usage_snapshot(self, bot_pids: Dict[int, int]) -> Dict[int, Dict]:
+        """
+        CPU and memory of running bots, refreshed at most every USAGE_SNAPSHOT_TTL seconds
+        bot_pids: bot_id -> process_id; returns bot_id -> {'cpu_percent', 'memory_mb'}
+        """
+        now = time.monotonic()
+        if now - self.usage_time < Config.USAGE_SNAPSHOT_TTL and set(bot_pids) <= set(self.usage_snapshot):
+            return {bot_id: self.usage_snapshot[bot_id] for bot_id in bot_pids}
+        
+        snapshot = {}
+        alive = {}
+        for bot_id, pid in bot_pids.items():
+            if not pid:
+                snapshot[bot_id] = {'cpu_percent': 0.0, 'memory_mb': 0.0}
+                continue
+            try:
+                process = self.usage_procs.get(pid) or psutil.Process(pid)
+                with process.oneshot():
+                    snapshot[bot_id] = {
+                        'cpu_percent': process.cpu_percent(),
+                        'memory_mb': process.memory_info().rss / 1024 / 1024
+                    }
+                alive[pid] = process
+            except psutil.Error:
+                snapshot[bot_id] = {'cpu_percent': 0.0, 'memory_mb': 0.0}
+        
+        self.usage_procs = alive
+        self.usage_snapshot = snapshot
+        self.usage_time = now
+        return snapshot
+    
     def get_bot_logs(self, bot_id: int) -> str:
         """Get bot stdout/stderr"""
         if bot_id in self.processes:
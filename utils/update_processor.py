@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from typing import Dict, Optional
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class KeyedUpdateProcessor(BaseUpdateProcessor):
+    """Process different users' updates concurrently, each user's strictly in order
+
+    Updates are keyed by user (falling back to chat). A FIFO lock per key keeps
+    ConversationHandler states consistent, `concurrency` caps how many handlers
+    run at once, and a user with `user_queue_limit` updates already waiting has
+    further updates dropped instead of tying up the processor.
+    """
+
+    def __init__(self, concurrency: int = Config.UPDATE_CONCURRENCY,
+                 max_pending: int = Config.UPDATE_MAX_PENDING,
+                 user_queue_limit: int = Config.UPDATE_USER_QUEUE_LIMIT):
+        # The base semaphore bounds updates inside the processor (running + waiting)
+        super().__init__(max_concurrent_updates=max_pending)
+        self.workers = asyncio.Semaphore(concurrency)
+        self.user_queue_limit = user_queue_limit
+        self.users: Dict[int, Dict] = {}
+        self.active = 0
+        self.processed = 0
+        self.rejected = 0
+
+    @staticmethod
+    def update_key(update: object) -> Optional[int]:
+        if isinstance(update, Update):
+            if update.effective_user:
+                return update.effective_user.id
+            if update.effective_chat:
+                return update.effective_chat.id
+        return None
+
+    async def _run(self, coroutine):
+        async with self.workers:
+            self.active += 1
+            try:
+                await coroutine
+            finally:
+                self.active -= 1
+                self.processed += 1
+
+    async def do_process_update(self, update: object, coroutine) -> None:
+        key = self.update_key(update)
+        if key is None:
+            await self._run(coroutine)
+            return
+
+        state = self.users.get(key)
+        if state is None:
+            state = self.users[key] = {'lock': asyncio.Lock(), 'queued': 0}
+
+        if state['queued'] >= self.user_queue_limit:
+            self.rejected += 1
+            coroutine.close()
+            logger.debug(f"Dropped update from {key}: {state['queued']} already queued")
+            return
+
+        state['queued'] += 1
+        try:
+            # asyncio.Lock wakes waiters in FIFO order, preserving arrival order per user
+            async with state['lock']:
+                await self._run(coroutine)
+        finally:
+            state['queued'] -= 1
+            if not state['queued']:
+                del self.users[key]
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    def get_stats(self) -> Dict:
+        return {
+            'active': self.active,
+            'users_waiting': len(self.users),
+            'processed': self.processed,
+            'rejected': self.rejected
+        }
+
+# Global update processor
+update_processor = KeyedUpdateProcessor()
@@ -0,0 +1,114 @@
+from datetime import datetime
+from typing import List, Dict
+from telegram import InputMediaDocument
+from telegram.helpers import escape_markdown
+from config import Config
+from database import db
+from utils.outbox import outbox, PRIORITY_NORMAL, PRIORITY_LOW
+
+E = Config.EMOJI
+
+MODE_INSTANT = 'instant'
+MODE_DIGEST = 'digest'
+MODE_OFF = 'off'
+MODES = (MODE_INSTANT, MODE_DIGEST, MODE_OFF)
+
+class UploadNotifier:
+    """Tell the owner about uploads, forwarding files by file_id (no re-upload)"""
+
+    SETTING_KEY = 'upload_notify_mode'
+
+    def __init__(self):
+        self.pending: List[Dict] = []
+
+    def get_mode(self) -> str:
+        return db.get_setting(self.SETTING_KEY, MODE_INSTANT)
+
+    def set_mode(self, mode: str):
+        db.set_setting(self.SETTING_KEY, mode)
+
+    async def notify(self, user, file_name, success, validation_result=None, file_id=None):
+        mode = self.get_mode()
+        if mode == MODE_OFF:
+            return
+
+        if mode == MODE_DIGEST:
+            self.pending.append({
+                'user_id': user.id,
+                'first_name': user.first_name,
+                'username': user.username,
+                'file_name': file_name,
+                'success': success,
+                'file_id': file_id,
+                'time': datetime.now()
+            })
+            return
+
+        status = "✅ Successfully Hosted" if success else "❌ Validation Failed"
+
+        notification = f"""
+{E['bell']} **New Bot Upload**
+
+{status}
+
+{E['user']} **User Details:**
+├ ID: `{user.id}`
+├ Name: {escape_markdown(user.first_name, version=1)}
+└ Username: {'@' + escape_markdown(user.username, version=1) if user.username else 'No username'}
+
+{E['file']} **File Details:**
+├ Name: {escape_markdown(file_name, version=1)}
+└ Status: {status}
+
+{validation_result if validation_result and not success else ''}
+        """
+
+        outbox.send(Config.OWNER_ID, notification, priority=PRIORITY_NORMAL)
+
+        # Forward the already-uploaded document by file_id
+        if success and file_id:
+            outbox.send(
+                Config.OWNER_ID,
+                document=file_id,
+                caption=f"📦 Uploaded by: {user.first_name} (@{user.username or user.id})",
+                priority=PRIORITY_NORMAL
+            )
+
+    async def flush_digest(self):
+        """Send everything collected since the last digest as one summary"""
+        if not self.pending:
+            return
+
+        uploads, self.pending = self.pending, []
+        hosted = [upload for upload in uploads if upload['success']]
+
+        digest_text = f"{E['bell']} **Upload Digest** ({len(uploads)})\n\n"
+        digest_text += f"✅ Hosted: {len(hosted)}\n"
+        digest_text += f"❌ Failed: {len(uploads) - len(hosted)}\n\n"
+
+        for upload in uploads[:50]:
+            digest_text += (
+                f"{'✅' if upload['success'] else '❌'} {escape_markdown(upload['file_name'], version=1)} — "
+                f"{escape_markdown(upload['first_name'] or '', version=1)} (`{upload['user_id']}`) "
+                f"{upload['time'].strftime('%H:%M')}\n"
+            )
+        if len(uploads) > 50:
+            digest_text += f"\n…and {len(uploads) - 50} more"
+
+        outbox.send(Config.OWNER_ID, digest_text, priority=PRIORITY_LOW, coalesce=False)
+
+        # Media groups hold up to 10 documents each
+        documents = [upload for upload in hosted if upload['file_id']]
+        for i in range(0, len(documents), 10):
+            group = documents[i:i + 10]
+            if len(group) == 1:
+                outbox.send(Config.OWNER_ID, document=group[0]['file_id'], priority=PRIORITY_LOW)
+            else:
+                outbox.send(
+                    Config.OWNER_ID,
+                    media=[InputMediaDocument(upload['file_id']) for upload in group],
+                    priority=PRIORITY_LOW
+                )
+
+# Global upload notifier
+upload_notifier = UploadNotifier()
@@ -0,0 +1,50 @@
+from typing import Optional, Dict
+from config import Config
+from database import db
+from utils.code_validator import CodeValidator
+
+class ValidationCache:
+    """Persistent cache of validation results keyed by content hash and validator version"""
+
+    def __init__(self, max_entries: int = Config.VALIDATION_CACHE_MAX_ENTRIES,
+                 max_age_days: int = Config.VALIDATION_CACHE_MAX_AGE_DAYS):
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def get(self, content_hash: str) -> Optional[Dict]:
+        """Cached result for this content, or None"""
+        result = db.get_validation_result(content_hash, CodeValidator.VERSION)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def put(self, content_hash: str, result: Dict):
+        db.save_validation_result(content_hash, CodeValidator.VERSION, result)
+
+    def evict(self) -> int:
+        """Apply the eviction policy: old validator versions, expired and LRU overflow"""
+        removed = db.evict_validation_results(CodeValidator.VERSION, self.max_entries, self.max_age_days)
+        self.evicted += removed
+        return removed
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return (self.hits / lookups * 100) if lookups else 0.0
+
+    def get_stats(self) -> Dict:
+        stats = db.get_validation_cache_stats()
+        stats.update({
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate(),
+            'evicted': self.evicted
+        })
+        return stats
+
+# Global validation cache
+validation_cache = ValidationCache()
@@ -0,0 +1,184 @@
+import os
+import signal
+import asyncio
+import itertools
+import multiprocessing
+import resource
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Dict
+from config import Config
+from utils.code_validator import CodeValidator
+
+# Job priorities (lower runs first)
+PRIORITY_PREMIUM = 0
+PRIORITY_FREE = 1
+
+def _init_worker(memory_bytes: int, pid_queue):
+    """Worker initializer: report our PID to the pool, cap address space so huge inputs fail with MemoryError"""
+    pid_queue.put(os.getpid())
+    # Soft limit only, so helper processes (node) can lift it again
+    hard = resource.getrlimit(resource.RLIMIT_AS)[1]
+    if hard != resource.RLIM_INFINITY:
+        memory_bytes = min(memory_bytes, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, hard))
+
+def _limit_cpu(cpu_seconds: int):
+    """Give this job cpu_seconds more CPU time; SIGXCPU kills the worker past that"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime)
+    hard = resource.getrlimit(resource.RLIMIT_CPU)[1]
+    soft = used + cpu_seconds
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+def _validate_source_job(data: bytes, file_type: str, cpu_seconds: int) -> Dict:
+    _limit_cpu(cpu_seconds)
+    try:
+        code = data.decode('utf-8')
+    except UnicodeDecodeError:
+        return {'is_valid': False, 'errors': ["File is not valid UTF-8 text"], 'imports': [], 'file_type': file_type}
+    except MemoryError:
+        return {'is_valid': False, 'errors': ["File is too large to validate"], 'imports': [], 'file_type': file_type}
+
+    try:
+        result = CodeValidator.validate(code, file_type)
+    except MemoryError:
+        result = {'is_valid': False, 'errors': ["Validation ran out of memory"], 'imports': [], 'file_type': file_type}
+    result['entry_point'] = None
+    return result
+
+def _validate_zip_job(data: bytes, cpu_seconds: int) -> Dict:
+    from utils.zip_inspector import zip_inspector
+
+    _limit_cpu(cpu_seconds)
+    success, message, info = zip_inspector.inspect(data)
+    if not success:
+        return {'is_valid': False, 'errors': [], 'imports': [], 'file_type': None, 'entry_point': None, 'report': message}
+
+    try:
+        result = CodeValidator.validate(info['code'], info['file_type'])
+    except MemoryError:
+        result = {'is_valid': False, 'errors': ["Validation ran out of memory"], 'imports': [], 'file_type': info['file_type']}
+    result['entry_point'] = info['main_file']
+    return result
+
+class ValidationPool:
+    """Run code validation in a bounded process pool, premium jobs first"""
+
+    def __init__(self, workers: int = Config.VALIDATION_WORKERS,
+                 timeout: int = Config.VALIDATION_TIMEOUT,
+                 cpu_seconds: int = Config.VALIDATION_CPU_SECONDS,
+                 memory_bytes: int = Config.VALIDATION_MEMORY_LIMIT):
+        self.workers = workers
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_bytes
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.pid_queue = None  # Workers of the current executor put their PIDs here
+        self.queue: Optional[asyncio.PriorityQueue] = None
+        self.dispatchers = []
+        self.counter = itertools.count()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        context = multiprocessing.get_context('spawn')
+        self.pid_queue = context.SimpleQueue()
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.memory_bytes, self.pid_queue)
+        )
+
+    @staticmethod
+    def _worker_pids(pid_queue) -> set:
+        pids = set()
+        while not pid_queue.empty():
+            pids.add(pid_queue.get())
+        return pids
+
+    def _restart_executor(self):
+        """Replace a broken or stuck pool; in-flight jobs fail and are reported as such"""
+        executor, pid_queue = self.executor, self.pid_queue
+        self.executor = self._new_executor()
+        # Killed before shutdown() joins them, so none of these PIDs can have been reused yet
+        for pid in self._worker_pids(pid_queue):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        executor.shutdown(wait=False, cancel_futures=True)
+        pid_queue.close()
+
+    def _ensure_started(self):
+        if self.queue is not None:
+            return
+        self.executor = self._new_executor()
+        self.queue = asyncio.PriorityQueue()
+        # One dispatcher per worker, so priority ordering happens here and not in the pool
+        self.dispatchers = [
+            asyncio.create_task(self._dispatch()) for _ in range(self.workers)
+        ]
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            priority, _, func, args, future = await self.queue.get()
+            if future.cancelled():
+                continue
+
+            try:
+                executor = self.executor
+                job = loop.run_in_executor(executor, func, *args, self.cpu_seconds)
+                result = await asyncio.wait_for(job, timeout=self.timeout)
+                if not future.done():
+                    future.set_result(result)
+            except asyncio.TimeoutError:
+                self._restart_executor()
+                # The caller may have been cancelled meanwhile; set_result would raise and end this loop
+                if not future.done():
+                    future.set_result(self._failure(f"Validation timed out after {self.timeout}s"))
+            except BrokenProcessPool:
+                if executor is not self.executor:
+                    # Pool was restarted under us because of another job, try again
+                    await self.queue.put((priority, next(self.counter), func, args, future))
+                    continue
+                self._restart_executor()
+                if not future.done():
+                    future.set_result(self._failure("Validation crashed (CPU or memory limit exceeded)"))
+            except Exception as e:
+                if not future.done():
+                    future.set_result(self._failure(f"Unexpected Error: {str(e)}"))
+
+    @staticmethod
+    def _failure(message: str) -> Dict:
+        return {'is_valid': False, 'errors': [message], 'imports': [], 'file_type': None,
+                'entry_point': None, 'report': f"❌ **Code Validation Failed!**\n\n{message}"}
+
+    async def _submit(self, priority: int, func, *args) -> Dict:
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((priority, next(self.counter), func, args, future))
+        return await future
+
+    async def validate_source(self, data: bytes, file_type: str, priority: int = PRIORITY_FREE) -> Dict:
+        """Validate a single .py/.js file (raw bytes) in a worker process"""
+        return await self._submit(priority, _validate_source_job, data, file_type)
+
+    async def validate_zip(self, data: bytes, priority: int = PRIORITY_FREE) -> Dict:
+        """Inspect and validate a ZIP project (raw bytes) in a worker process"""
+        return await self._submit(priority, _validate_zip_job, data)
+
+    def pending(self) -> int:
+        return self.queue.qsize() if self.queue else 0
+
+    def shutdown(self):
+        for task in self.dispatchers:
+            task.cancel()
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        self.queue = None
+
+# Global validation pool
+validation_pool = ValidationPool()
@@ -0,0 +1,53 @@
+from collections import OrderedDict
+from typing import Dict, Optional
+from config import Config
+from database import db
+
+class BotsViewCache:
+    """Rendered /mybots views per user, dropped whenever that user's bots change
+
+    Every change bumps the user's version, so a handler can tell whether the
+    message on screen already shows the latest state.
+    """
+
+    def __init__(self, max_users: int = Config.VIEW_CACHE_MAX_USERS):
+        self.max_users = max_users
+        self.views: OrderedDict = OrderedDict()
+        self.versions: Dict[int, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.skipped_edits = 0
+
+    def version(self, user_id: int) -> int:
+        return self.versions.get(user_id, 0)
+
+    def invalidate(self, user_id: int):
+        self.versions[user_id] = self.version(user_id) + 1
+        self.views.pop(user_id, None)
+
+    def get(self, user_id: int) -> Optional[Dict]:
+        view = self.views.get(user_id)
+        if view is None:
+            self.misses += 1
+            return None
+        self.views.move_to_end(user_id)
+        self.hits += 1
+        return view
+
+    def put(self, user_id: int, view: Dict):
+        self.views[user_id] = view
+        self.views.move_to_end(user_id)
+        while len(self.views) > self.max_users:
+            self.views.popitem(last=False)
+
+    def get_stats(self) -> Dict:
+        return {
+            'cached_views': len(self.views),
+            'hits': self.hits,
+            'misses': self.misses,
+            'skipped_edits': self.skipped_edits
+        }
+
+# Global /mybots view cache
+bots_view_cache = BotsViewCache()
+db.add_bots_listener(bots_view_cache.invalidate)
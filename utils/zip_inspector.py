@@ -0,0 +1,124 @@
+import io
+import zipfile
+import posixpath
+from typing import Optional, Dict, List, Union
+from config import Config
+
+class ZipInspector:
+    """Inspect ZIP archives from the central directory without extracting to disk"""
+
+    MAIN_FILES = ['main.py', 'bot.py', 'index.js', 'main.js']
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, max_total_size: int = Config.MAX_ZIP_UNCOMPRESSED_SIZE,
+                 max_ratio: int = Config.MAX_ZIP_RATIO,
+                 max_files: int = Config.MAX_ZIP_FILES):
+        self.max_total_size = max_total_size
+        self.max_ratio = max_ratio
+        self.max_files = max_files
+
+    def inspect(self, source: Union[str, bytes]) -> tuple[bool, str, Optional[Dict]]:
+        """
+        Check archive limits, find the entry point and read it into memory
+        source is a path or the archive bytes already in memory
+        Returns: (success, message, info)
+        info = {'main_file', 'file_type', 'code', 'total_size', 'file_count'}
+        """
+        try:
+            if isinstance(source, bytes):
+                source = io.BytesIO(source)
+            with zipfile.ZipFile(source, 'r') as zip_ref:
+                entries = [info for info in zip_ref.infolist() if not info.is_dir()]
+
+                success, message = self.check_limits(entries)
+                if not success:
+                    return False, message, None
+
+                main_entry = self.find_main_entry(entries)
+                if not main_entry:
+                    return False, "❌ **No main file found!**\n\nPlease include main.py or index.js in your ZIP.", None
+
+                code = self.read_entry(zip_ref, main_entry).decode('utf-8')
+
+                return True, "✅ ZIP archive looks good", {
+                    'main_file': main_entry.filename,
+                    'file_type': 'python' if main_entry.filename.endswith('.py') else 'javascript',
+                    'code': code,
+                    'total_size': sum(info.file_size for info in entries),
+                    'file_count': len(entries)
+                }
+
+        except zipfile.BadZipFile:
+            return False, "❌ **Invalid ZIP file!**\n\nThe archive is corrupted or not a ZIP.", None
+        except UnicodeDecodeError:
+            return False, "❌ **Main file is not valid UTF-8 text!**", None
+        except ValueError as e:
+            return False, f"❌ **Unsafe ZIP archive!**\n\n{str(e)}", None
+        except Exception as e:
+            return False, f"❌ **Error reading ZIP:**\n\n`{str(e)}`", None
+
+    def check_limits(self, entries: List[zipfile.ZipInfo]) -> tuple[bool, str]:
+        """Enforce file count, total size, ratio and path safety from the central directory"""
+        if len(entries) > self.max_files:
+            return False, (f"❌ **Too many files in ZIP!**\n\n"
+                           f"Files: {len(entries)}\n"
+                           f"Limit: {self.max_files}")
+
+        total_size = 0
+        for info in entries:
+            if not self.is_safe_path(info.filename):
+                return False, f"❌ **Unsafe path in ZIP:** `{info.filename}`"
+
+            if info.compress_size and info.file_size / info.compress_size > self.max_ratio:
+                return False, (f"❌ **Suspicious compression ratio!**\n\n"
+                               f"File: `{info.filename}`\n"
+                               f"Ratio limit: {self.max_ratio}:1")
+
+            total_size += info.file_size
+            if total_size > self.max_total_size:
+                return False, (f"❌ **ZIP too large when extracted!**\n\n"
+                               f"Limit: {self.max_total_size // (1024*1024)}MB")
+
+        return True, ""
+
+    def find_main_entry(self, entries: List[zipfile.ZipInfo]) -> Optional[zipfile.ZipInfo]:
+        """Pick the shallowest entry point, preferring names in MAIN_FILES order"""
+        candidates = [
+            info for info in entries
+            if posixpath.basename(info.filename) in self.MAIN_FILES
+        ]
+        if not candidates:
+            return None
+
+        return min(candidates, key=lambda info: (
+            info.filename.count('/'),
+            self.MAIN_FILES.index(posixpath.basename(info.filename))
+        ))
+
+    def read_entry(self, zip_ref: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytes:
+        """Stream one entry into memory, never trusting the declared size"""
+        chunks = []
+        read_size = 0
+
+        with zip_ref.open(info) as f:
+            while True:
+                chunk = f.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                read_size += len(chunk)
+                if read_size > info.file_size or read_size > self.max_total_size:
+                    raise ValueError(f"Entry `{info.filename}` is larger than declared")
+                chunks.append(chunk)
+
+        return b''.join(chunks)
+
+    @staticmethod
+    def is_safe_path(name: str) -> bool:
+        """Reject absolute paths and parent directory traversal"""
+        name = name.replace('\\', '/')
+        if name.startswith('/') or (len(name) > 1 and name[1] == ':'):
+            return False
+        return '..' not in name.split('/')
+
+# Global zip inspector
+zip_inspector = ZipInspector()